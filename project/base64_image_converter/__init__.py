@@ -45,17 +45,41 @@ __description__ = "Bidirectional converter for images and base64-encoded HTML fo
 
 # Import main functions for easy access
 try:
-    from .convertIMAGE_script import main as convert_main, process_image, process_base64_file
-    from .web_bridge import main as web_main
-    from .launch_gui import main as gui_main
+    from .convertIMAGE_script import (
+        main as convert_main,
+        process_image,
+        process_base64_file,
+        iter_embedded_images,
+        encode_bytes,
+        decode_document,
+        ConversionResult,
+    )
     
     __all__ = [
         'convert_main',
         'process_image', 
         'process_base64_file',
+        'iter_embedded_images',
+        'encode_bytes',
+        'decode_document',
+        'ConversionResult',
         'web_main',
         'gui_main',
     ]
 except ImportError:
     # Handle case where modules might not be available during setup
     __all__ = []
+
+
+# The web server and GUI launcher are imported on first use so that the
+# command-line converter does not pay their import cost at startup
+def web_main(*args, **kwargs):
+    """Start the web interface server (see web_bridge.main)."""
+    from .web_bridge import main
+    return main(*args, **kwargs)
+
+
+def gui_main(*args, **kwargs):
+    """Launch the web-based GUI (see launch_gui.main)."""
+    from .launch_gui import main
+    return main(*args, **kwargs)
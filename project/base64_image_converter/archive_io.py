@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+=====================================================================================
+                    ZIP AND TAR ARCHIVE SUPPORT
+=====================================================================================
+
+Base64 Image Converter - Convert images to Base64 and vice versa
+Copyright (C) 2025 Kyle J. Coder
+Advanced Analytics & Informatics, Edward Hines Jr. VA Hospital (v12/578)
+Veterans Health Administration, Department of Veterans Affairs
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+Contact: HinClinicalAnalytics@va.gov
+=====================================================================================
+
+Batch output into a single zip or tar archive.
+
+With --archive, every converted file is added to one archive as soon as
+its conversion completes, instead of being left in the output directory.
+Members are copied in chunks from the converter's output files, which are
+deleted once added, so neither the archive entries nor the staged outputs
+accumulate in memory or on disk.
+
+The last member, INDEX_MEMBER, is a JSON Lines file with one record per
+member: its name, the source file, MIME type, byte counts and dimensions.
+The index is spooled to a temporary file while the batch runs.
+
+The archive type follows the file name: .zip (deflated), .tar, .tar.gz /
+.tgz, .tar.bz2 / .tbz2 or .tar.xz / .txz. It is written to a temporary
+name ('<archive>.part') and renamed into place when complete.
+
+Archives are also accepted as inputs. A member is addressed by joining
+the archive path and the member name, e.g. 'bundle.zip/scans/a.png';
+open_input() opens such a path as a stream straight from the archive,
+so members are converted without being extracted to disk first. Open
+archives are kept in a small per-process cache, so a batch that walks
+an archive's members in order reads a compressed tar only once or twice
+rather than once per member.
+"""
+
+import collections
+import contextlib
+import json
+import os
+import tempfile
+import time
+
+# zipfile and tarfile are imported by the methods that open archives, so
+# runs over plain files (and the CLI's startup) do not pay for loading them
+
+# Name of the index member written at the end of every archive
+INDEX_MEMBER = "index.jsonl"
+
+# Index data kept in memory before spilling to a temporary file
+INDEX_SPOOL_SIZE = 1024 * 1024
+
+# Archive file name suffixes and the tarfile mode for each tar variant
+TAR_MODES = (
+    (('.tar.gz', '.tgz'), 'w:gz'),
+    (('.tar.bz2', '.tbz2'), 'w:bz2'),
+    (('.tar.xz', '.txz'), 'w:xz'),
+    (('.tar',), 'w'),
+)
+
+# Bytes copied per step when adding a member
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Input archives kept open per process for reading members
+MAX_OPEN_ARCHIVES = 8
+
+
+def archive_kind(path):
+    """
+    Determine the archive type from a file name.
+
+    Args:
+        path (str): Archive file name
+
+    Returns:
+        str: 'zip', or a tarfile write mode such as 'w:gz'; None if the name
+        has no supported archive suffix
+    """
+    name = path.lower()
+    if name.endswith('.zip'):
+        return 'zip'
+    for suffixes, mode in TAR_MODES:
+        if name.endswith(suffixes):
+            return mode
+    return None
+
+
+class ArchiveWriter:
+    """
+    Streams conversion outputs into a single zip or tar archive.
+
+    Typical use:
+
+        with ArchiveWriter(path) as archive:
+            archive.add_file(output_path, member_name, result)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.kind = archive_kind(path)
+        if self.kind is None:
+            raise ValueError(f"unsupported archive type: {path!r} "
+                             "(use .zip, .tar, .tar.gz, .tar.bz2 or .tar.xz)")
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._temp_path = path + '.part'
+        import tarfile
+        import zipfile
+        if self.kind == 'zip':
+            self._archive = zipfile.ZipFile(self._temp_path, 'w', compression=zipfile.ZIP_DEFLATED)
+        else:
+            self._archive = tarfile.open(self._temp_path, self.kind)
+        self._index = tempfile.SpooledTemporaryFile(max_size=INDEX_SPOOL_SIZE, mode='w+b')
+        self._names = set()
+        self.member_count = 0
+
+    def add_file(self, file_path, member_name, result=None):
+        """
+        Copy a file into the archive and record it in the index.
+
+        A name already used in the archive gets a numeric suffix
+        (e.g. 'photo_2.txt') so no member is shadowed.
+
+        Args:
+            file_path (str): File to add
+            member_name (str): Path of the member inside the archive
+            result (ConversionResult): Conversion that produced the file
+
+        Returns:
+            str: Member name actually used
+        """
+        import zipfile
+        member_name = self._unique_name(member_name.replace(os.sep, '/'))
+        size = os.path.getsize(file_path)
+        if self.kind == 'zip':
+            info = zipfile.ZipInfo.from_file(file_path, member_name)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with open(file_path, 'rb') as source, self._archive.open(info, 'w', force_zip64=True) as target:
+                _copy(source, target)
+        else:
+            info = self._archive.gettarinfo(file_path, arcname=member_name)
+            with open(file_path, 'rb') as source:
+                self._archive.addfile(info, source)
+
+        entry = {"member": member_name, "bytes": size}
+        if result is not None:
+            entry.update(
+                source=result.input_path,
+                mime_type=result.mime_type,
+                source_bytes=result.input_bytes,
+                width=result.width,
+                height=result.height,
+            )
+        self._index.write(json.dumps(entry).encode('utf-8') + b'\n')
+        self.member_count += 1
+        return member_name
+
+    def _unique_name(self, member_name):
+        """Return member_name, or a numbered variant if it is taken."""
+        candidate = member_name
+        stem, ext = os.path.splitext(member_name)
+        counter = 1
+        while candidate in self._names or candidate == INDEX_MEMBER:
+            counter += 1
+            candidate = f"{stem}_{counter}{ext}"
+        self._names.add(candidate)
+        return candidate
+
+    def close(self):
+        """Append the index member and move the finished archive into place."""
+        if self._archive is None:
+            return
+        import tarfile
+        import zipfile
+        try:
+            index_size = self._index.tell()
+            self._index.seek(0)
+            if self.kind == 'zip':
+                info = zipfile.ZipInfo(INDEX_MEMBER, time.localtime()[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with self._archive.open(info, 'w') as target:
+                    _copy(self._index, target)
+            else:
+                info = tarfile.TarInfo(INDEX_MEMBER)
+                info.size = index_size
+                info.mtime = int(time.time())
+                self._archive.addfile(info, self._index)
+            self._archive.close()
+        except BaseException:
+            self.abort()
+            raise
+        self._archive = None
+        self._index.close()
+        os.replace(self._temp_path, self.path)
+
+    def abort(self):
+        """Discard a partially written archive."""
+        import tarfile
+        import zipfile
+        if self._archive is not None:
+            try:
+                self._archive.close()
+            except (OSError, ValueError, zipfile.BadZipFile, tarfile.TarError):
+                pass
+            self._archive = None
+        self._index.close()
+        try:
+            os.remove(self._temp_path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def _copy(source, target):
+    """Copy a binary file object to another in bounded chunks."""
+    while True:
+        chunk = source.read(COPY_CHUNK_SIZE)
+        if not chunk:
+            break
+        target.write(chunk)
+
+
+# =============================================================================
+# READING ARCHIVE INPUTS
+# =============================================================================
+
+def is_archive(path):
+    """Check whether a path names an existing zip or tar archive file."""
+    return archive_kind(path) is not None and os.path.isfile(path)
+
+
+def split_archive_path(path):
+    """
+    Split an archive member path into the archive and the member name.
+
+    Args:
+        path (str): Path such as 'bundle.tar.gz/scans/a.png'
+
+    Returns:
+        tuple: (archive_path, member_name) with '/' separators in the member
+        name, or None if path is not inside an archive
+    """
+    if os.path.exists(path):
+        return None
+    head = path
+    parts = []
+    while True:
+        head, tail = os.path.split(head)
+        if not tail:
+            return None
+        parts.append(tail)
+        if os.path.isfile(head):
+            # A regular file can only be a parent if it is an archive
+            if archive_kind(head) is None:
+                return None
+            return head, '/'.join(reversed(parts))
+
+
+def input_exists(path):
+    """Check whether a file or the archive containing a member exists."""
+    if os.path.exists(path):
+        return True
+    return split_archive_path(path) is not None
+
+
+# An archive member offered for conversion; 'name' uses '/' separators
+ArchiveMember = collections.namedtuple('ArchiveMember', ['name', 'size', 'mtime_ns'])
+
+
+class ArchiveReader:
+    """
+    Read-only access to the regular-file members of a zip or tar archive.
+
+    Use get_reader() to share open archives within a process.
+    """
+
+    def __init__(self, path):
+        import tarfile
+        import zipfile
+        self.path = path
+        if zipfile.is_zipfile(path):
+            self._zip = zipfile.ZipFile(path)
+            self._tar = None
+        else:
+            self._zip = None
+            self._tar = tarfile.open(path, 'r:*')
+
+    def members(self):
+        """
+        Yield the regular files stored in the archive, in archive order.
+
+        Yields:
+            ArchiveMember: Name, uncompressed size and modification time
+        """
+        if self._zip is not None:
+            for info in self._zip.infolist():
+                if info.is_dir():
+                    continue
+                mtime = time.mktime(info.date_time + (0, 0, -1))
+                yield ArchiveMember(info.filename, info.file_size, int(mtime) * 1_000_000_000)
+        else:
+            for info in self._tar:
+                if info.isfile():
+                    yield ArchiveMember(info.name, info.size, int(info.mtime) * 1_000_000_000)
+
+    def open(self, member_name):
+        """
+        Open a member for streaming.
+
+        Args:
+            member_name (str): Member path inside the archive
+
+        Returns:
+            tuple: (file object, uncompressed size in bytes)
+
+        Raises:
+            FileNotFoundError: If the archive has no such regular file
+        """
+        try:
+            if self._zip is not None:
+                info = self._zip.getinfo(member_name)
+                return self._zip.open(info), info.file_size
+            info = self._tar.getmember(member_name)
+        except KeyError:
+            raise FileNotFoundError(f"no member {member_name!r} in archive '{self.path}'") from None
+        if not info.isfile():
+            raise FileNotFoundError(f"member {member_name!r} in archive '{self.path}' is not a file")
+        return self._tar.extractfile(info), info.size
+
+    def close(self):
+        """Close the archive file."""
+        (self._zip or self._tar).close()
+
+
+# Archives opened by get_reader in this process, least recently used first
+_readers = collections.OrderedDict()
+
+
+def _forget_readers():
+    """Drop archives inherited from the parent, whose file offsets it shares."""
+    _readers.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_readers)
+
+
+def get_reader(archive_path):
+    """
+    Return an open ArchiveReader, reusing one opened earlier in this process.
+
+    Args:
+        archive_path (str): Path of the zip or tar archive
+
+    Returns:
+        ArchiveReader: Reader for the archive
+    """
+    key = os.path.abspath(archive_path)
+    reader = _readers.get(key)
+    if reader is not None:
+        _readers.move_to_end(key)
+        return reader
+    reader = _readers[key] = ArchiveReader(archive_path)
+    while len(_readers) > MAX_OPEN_ARCHIVES:
+        _readers.popitem(last=False)[1].close()
+    return reader
+
+
+def iter_archive_members(archive_path):
+    """
+    List the regular-file members of an archive input.
+
+    Args:
+        archive_path (str): Path of the zip or tar archive
+
+    Yields:
+        ArchiveMember: One entry per regular file, in archive order
+    """
+    yield from get_reader(archive_path).members()
+
+
+@contextlib.contextmanager
+def open_input(path):
+    """
+    Open a conversion input for binary reading.
+
+    The path may be a regular file or a member inside an archive (see
+    split_archive_path). Members are decompressed as they are read and
+    never written to disk.
+
+    Args:
+        path (str): File path or archive member path
+
+    Yields:
+        tuple: (binary file object, size in bytes)
+    """
+    location = split_archive_path(path)
+    if location is None:
+        with open(path, 'rb') as f:
+            yield f, os.fstat(f.fileno()).st_size
+        return
+    member, size = get_reader(location[0]).open(location[1])
+    with member:
+        yield member, size
@@ -142,12 +142,46 @@ Employee Recognition App Development Team
 =====================================================================================
 """
 
+import argparse
 import base64
+import binascii
+import collections
+import contextlib
+import fnmatch
+import glob
+import io
+import itertools
 import os
 import mimetypes
 import re
-import tkinter as tk
-from tkinter import filedialog
+import shutil
+import signal
+import stat
+import struct
+import sys
+import tempfile
+import time
+
+# profiling, optimize, validate and watch are imported by the functions that
+# use them, like tkinter, so that plain conversions start up without them
+try:
+    from .manifest import ConversionManifest, HashingReader, MANIFEST_FILENAME, file_digest
+    from .encode_cache import EncodeCache, DEFAULT_CACHE_SIZE, parse_size
+    from .renderers import OUTPUT_FORMATS, DEFAULT_OUTPUT_FORMAT, get_renderer
+    from .archive_io import ArchiveWriter, INDEX_MEMBER, archive_kind, is_archive, iter_archive_members, open_input
+except ImportError:
+    from manifest import ConversionManifest, HashingReader, MANIFEST_FILENAME, file_digest
+    from encode_cache import EncodeCache, DEFAULT_CACHE_SIZE, parse_size
+    from renderers import OUTPUT_FORMATS, DEFAULT_OUTPUT_FORMAT, get_renderer
+    from archive_io import ArchiveWriter, INDEX_MEMBER, archive_kind, is_archive, iter_archive_members, open_input
+
+# Clock for the per-stage timings; time.perf_counter_ns needs Python 3.7
+try:
+    perf_counter_ns = time.perf_counter_ns
+except AttributeError:
+    def perf_counter_ns():
+        """Return the performance counter value in integer nanoseconds."""
+        return int(time.perf_counter() * 1e9)
 
 # =============================================================================
 # CONFIGURATION CONSTANTS
@@ -161,347 +195,2556 @@ default_input_dir = os.path.join(script_dir, "Inputs")
 default_output_dir = os.path.join(script_dir, "Outputs")
 
 # Supported image file extensions for processing
-image_extensions = ('.png', '.jpg', '.jpeg', '.gif', '.bmp')
+image_extensions = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp', '.tif', '.tiff', '.ico', '.svg')
 
 # Supported text file extensions that may contain base64 data
 text_extensions = ('.txt', '.html', '.htm')
 
+# Conversion directions accepted by process_file and the command line
+CONVERSION_DIRECTIONS = ('auto', 'encode', 'decode')
+
+# File extensions for decoded images, keyed by data URI MIME type
+extension_map = {
+    'image/png': '.png',
+    'image/jpeg': '.jpg',
+    'image/jpg': '.jpg',
+    'image/gif': '.gif',
+    'image/bmp': '.bmp',
+    'image/webp': '.webp',
+    'image/tiff': '.tiff',
+    'image/svg+xml': '.svg',
+    'image/x-icon': '.ico',
+    'image/vnd.microsoft.icon': '.ico',
+}
+
+# Number of image bytes read and encoded per step when streaming to Base64.
+# Must be a multiple of 3 so that each encoded chunk ends without padding and
+# the chunks concatenate into a single valid Base64 string.
+ENCODE_CHUNK_SIZE = 3 * 256 * 1024
+
+# Number of leading bytes read by try_read_dimensions_from_header
+PROBE_HEADER_SIZE = 64 * 1024
+
+# Optimized image data kept in memory before spilling to a temporary file
+OPTIMIZE_SPOOL_SIZE = 16 * 1024 * 1024
+
+# Suffix distinguishing cached encodings of optimized images in the encode
+# cache; changed whenever optimize.py changes what it writes, so encodings
+# made by an older optimizer are not reused
+OPTIMIZED_CACHE_SUFFIX = '.optimized2'
+
+# Number of text bytes read per step when scanning files for Base64 data
+DECODE_CHUNK_SIZE = 256 * 1024
+
+# Maximum number of batch conversions queued per worker process. Bounds the
+# memory used by pending tasks independently of the size of the input list.
+MAX_IN_FLIGHT_PER_WORKER = 4
+
+# Number of recorded conversions between intermediate manifest saves, so an
+# interrupted incremental run keeps most of its progress
+MANIFEST_SAVE_INTERVAL = 500
+
+# Failed files listed by name in the final summary
+MAX_LISTED_FAILURES = 20
+
+# Longest MIME type accepted between "data:" and ";base64," in a data URI.
+# Bounds the look-ahead the streaming scanner has to buffer.
+MAX_MIME_TYPE_LENGTH = 255
+
+
+# =============================================================================
+# IMAGE DIMENSION EXTRACTION FUNCTIONS
+# =============================================================================
+
+def probe_image(header, file=None):
+    """
+    Identify an image format and its dimensions from an already-read buffer.
+
+    The format is sniffed from magic bytes rather than the file name, and
+    dimensions are parsed directly from the buffer (bytes or memoryview)
+    without copying it. Only when the information lies beyond the buffer
+    (a JPEG with very large metadata segments, or a TIFF whose first IFD is
+    stored at the end of the file) is the optional open file consulted; it
+    is read with seeks past the skipped data and its position is restored.
+
+    Args:
+        header (bytes or memoryview): Leading bytes of the image file
+        file (file): Optional binary file object the header was read from
+
+    Returns:
+        tuple: (mime_type, width, height); mime_type is None if the format is
+        not recognized, width and height are None if they cannot be read
+
+    Supported Formats:
+        • PNG: Reads IHDR chunk for dimensions
+        • JPEG: Walks segment markers to the SOF (Start of Frame) segment
+        • GIF: Reads logical screen descriptor
+        • BMP: Extracts from DIB header
+        • WebP: Reads the VP8, VP8L or VP8X chunk header
+        • TIFF: Reads ImageWidth/ImageLength tags of the first IFD
+        • ICO: Reads the first directory entry
+        • SVG: Reads width/height (or viewBox) of the root <svg> element
+    """
+    view = memoryview(header)
+    try:
+        if view[:8] == b'\x89PNG\r\n\x1a\n':
+            if view[12:16] == b'IHDR':
+                width, height = struct.unpack_from('>II', view, 16)
+                return "image/png", width, height
+            return "image/png", None, None
+
+        if view[:3] == b'\xFF\xD8\xFF':
+            return ("image/jpeg",) + _jpeg_dimensions(view, file)
+
+        if view[:6] in (b'GIF87a', b'GIF89a'):
+            width, height = struct.unpack_from('<HH', view, 6)
+            return "image/gif", width, height
+
+        if view[:2] == b'BM':
+            dib_size = struct.unpack_from('<I', view, 14)[0]
+            if dib_size == 12:
+                # BITMAPCOREHEADER stores unsigned 16-bit dimensions
+                width, height = struct.unpack_from('<HH', view, 18)
+            else:
+                # Negative height marks a top-down bitmap
+                width, height = struct.unpack_from('<ii', view, 18)
+            return "image/bmp", abs(width), abs(height)
+
+        if view[:4] == b'RIFF' and view[8:12] == b'WEBP':
+            return ("image/webp",) + _webp_dimensions(view)
+
+        if view[:4] in (b'II*\x00', b'MM\x00*'):
+            return ("image/tiff",) + _tiff_dimensions(view, file)
+
+        if view[:4] == b'\x00\x00\x01\x00' and len(view) >= 8:
+            # A stored value of 0 means 256 pixels
+            return "image/x-icon", view[6] or 256, view[7] or 256
+
+        if _looks_like_svg(view):
+            return ("image/svg+xml",) + _svg_dimensions(view)
+
+    except (struct.error, IndexError, ValueError, OSError):
+        pass
+    return None, None, None
+
+
+# JPEG Start of Frame markers (excluding DHT 0xC4, JPG 0xC8 and DAC 0xCC)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _jpeg_dimensions(view, file=None):
+    """Walk JPEG segments in a buffer (then the file, if needed) to the SOF."""
+    position = 2
+    size = len(view)
+    while position + 4 <= size:
+        if view[position] != 0xFF:
+            return None, None
+        marker = view[position + 1]
+        if marker == 0xFF:
+            position += 1  # Fill byte
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            position += 2  # Standalone marker without a length
+            continue
+        if marker in (0xD9, 0xDA):
+            return None, None  # End of image or scan data before any SOF
+        if marker in _JPEG_SOF_MARKERS:
+            if position + 9 > size:
+                break
+            height, width = struct.unpack_from('>HH', view, position + 5)
+            return width, height
+        # Skip the whole segment without touching its contents
+        position += 2 + ((view[position + 2] << 8) | view[position + 3])
+
+    if file is None:
+        return None, None
+    return _jpeg_dimensions_from_file(file, position)
+
+
+def _jpeg_dimensions_from_file(file, position):
+    """Continue a JPEG segment walk in a file, seeking over segment data."""
+    saved_position = file.tell()
+    try:
+        file.seek(position)
+        while True:
+            marker = file.read(2)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                return None, None
+            code = marker[1]
+            while code == 0xFF:
+                next_byte = file.read(1)
+                if not next_byte:
+                    return None, None
+                code = next_byte[0]
+            if code == 0x01 or 0xD0 <= code <= 0xD8:
+                continue
+            if code in (0xD9, 0xDA):
+                return None, None
+            if code in _JPEG_SOF_MARKERS:
+                frame = file.read(7)
+                if len(frame) < 7:
+                    return None, None
+                height, width = struct.unpack_from('>HH', frame, 3)
+                return width, height
+            segment = file.read(2)
+            if len(segment) < 2:
+                return None, None
+            file.seek(((segment[0] << 8) | segment[1]) - 2, os.SEEK_CUR)
+    finally:
+        file.seek(saved_position)
+
+
+def _webp_dimensions(view):
+    """Read WebP canvas dimensions from the first chunk header."""
+    chunk_type = view[12:16].tobytes()
+    if chunk_type == b'VP8 ':
+        # Lossy: 3-byte frame tag and start code, then 14-bit dimensions
+        width, height = struct.unpack_from('<HH', view, 26)
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk_type == b'VP8L':
+        # Lossless: signature byte, then packed 14-bit (size - 1) fields
+        bits = struct.unpack_from('<I', view, 21)[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk_type == b'VP8X':
+        # Extended: 24-bit (canvas size - 1) fields
+        width = int.from_bytes(view[24:27], 'little') + 1
+        height = int.from_bytes(view[27:30], 'little') + 1
+        return width, height
+    return None, None
+
+
+def _tiff_dimensions(view, file=None):
+    """Read ImageWidth (256) and ImageLength (257) from the first TIFF IFD."""
+    endian = '<' if view[:2] == b'II' else '>'
+    ifd_offset = struct.unpack_from(endian + 'I', view, 4)[0]
+
+    count_field = _read_range(view, file, ifd_offset, 2)
+    if count_field is None:
+        return None, None
+    entry_count = struct.unpack_from(endian + 'H', count_field)[0]
+    entries = _read_range(view, file, ifd_offset + 2, 12 * entry_count)
+    if entries is None:
+        return None, None
+
+    dimensions = {}
+    for index in range(entry_count):
+        tag, field_type = struct.unpack_from(endian + 'HH', entries, index * 12)
+        if tag in (256, 257):
+            if field_type == 3:  # SHORT
+                dimensions[tag] = struct.unpack_from(endian + 'H', entries, index * 12 + 8)[0]
+            elif field_type == 4:  # LONG
+                dimensions[tag] = struct.unpack_from(endian + 'I', entries, index * 12 + 8)[0]
+            if len(dimensions) == 2:
+                break
+    return dimensions.get(256), dimensions.get(257)
+
+
+def _read_range(view, file, offset, length):
+    """Return bytes at an offset from the buffer, or from the file if beyond it."""
+    if offset + length <= len(view):
+        return view[offset:offset + length]
+    if file is None:
+        return None
+    saved_position = file.tell()
+    try:
+        file.seek(offset)
+        data = file.read(length)
+    finally:
+        file.seek(saved_position)
+    return data if len(data) == length else None
+
+
+# Bytes of an SVG document searched for the root element
+_SVG_PROBE_SIZE = 64 * 1024
+_SVG_ROOT_TAG = re.compile(rb'<svg\b[^>]*>', re.IGNORECASE)
+_SVG_ATTRIBUTE = re.compile(rb'\s(width|height|viewBox)\s*=\s*["\']([^"\']*)["\']')
+_SVG_LENGTH = re.compile(rb'^\s*([0-9]*\.?[0-9]+)\s*(?:px)?\s*$')
+
+
+def _looks_like_svg(view):
+    """Check whether a buffer starts like an SVG document."""
+    start = view[:256].tobytes().lstrip(b'\xef\xbb\xbf \t\r\n').lower()
+    if not start.startswith((b'<?xml', b'<svg', b'<!--', b'<!doctype svg')):
+        return False
+    return b'<svg' in view[:_SVG_PROBE_SIZE].tobytes().lower()
+
+
+def _svg_dimensions(view):
+    """Read the root <svg> width and height, falling back to its viewBox."""
+    match = _SVG_ROOT_TAG.search(view[:_SVG_PROBE_SIZE].tobytes())
+    if not match:
+        return None, None
+    attributes = dict(_SVG_ATTRIBUTE.findall(match.group(0)))
+
+    width = _SVG_LENGTH.match(attributes.get(b'width', b''))
+    height = _SVG_LENGTH.match(attributes.get(b'height', b''))
+    if width and height:
+        return round(float(width.group(1))), round(float(height.group(1)))
+
+    view_box = attributes.get(b'viewBox', b'').replace(b',', b' ').split()
+    if len(view_box) == 4:
+        return round(float(view_box[2])), round(float(view_box[3]))
+    return None, None
+
+
+def try_read_dimensions_from_header(image_path, mime_type=None):
+    """
+    Extract image dimensions directly from file headers without loading the entire image.
+
+    Reads the first PROBE_HEADER_SIZE bytes of the file and passes them to
+    probe_image. The format is sniffed from the file contents; mime_type is
+    accepted for compatibility and no longer needs to be known.
+
+    Args:
+        image_path (str): Full path to the image file
+        mime_type (str): Unused; kept for backwards compatibility
+
+    Returns:
+        tuple: (width, height) as integers, or (None, None) if extraction fails
+    """
+    try:
+        with open_input(image_path) as (f, _):
+            _, width, height = probe_image(f.read(PROBE_HEADER_SIZE), f)
+            return width, height
+    except OSError:
+        return None, None
+
+
+# =============================================================================
+# FILE UTILITY FUNCTIONS
+# =============================================================================
+
+def format_size(size_bytes):
+    """
+    Convert a byte count to human-readable format.
+    
+    Args:
+        size_bytes (int): Size in bytes
+    
+    Returns:
+        str: Formatted size string (e.g., "1.25 MB", "500.00 bytes")
+    """
+    for unit in ['bytes', 'KB', 'MB', 'GB', 'TB']:
+        if size_bytes < 1024.0:
+            return f"{size_bytes:.2f} {unit}"
+        size_bytes /= 1024.0
+    return f"{size_bytes:.2f} PB"  # Fallback for extremely large files
+
+
+def file_size_str(file_path):
+    """
+    Convert file size in bytes to human-readable format.
+    
+    Takes a file path and returns the file size formatted in appropriate units
+    (bytes, KB, MB, GB, TB, PB) with 2 decimal places for readability.
+    
+    Args:
+        file_path (str): Full path to the file
+    
+    Returns:
+        str: Formatted file size string (e.g., "1.25 MB", "500 bytes")
+    """
+    try:
+        return format_size(os.path.getsize(file_path))
+    except Exception:
+        return "Unknown"
+
+
+def base64_encoded_length(size_bytes):
+    """
+    Calculate the length of the padded Base64 encoding of a byte count.
+    
+    Every started group of 3 input bytes produces 4 output characters, so the
+    encoded size can be known before any data has been read.
+    
+    Args:
+        size_bytes (int): Number of raw bytes to be encoded
+    
+    Returns:
+        int: Number of Base64 characters (equal to bytes, as Base64 is ASCII)
+    """
+    return 4 * ((size_bytes + 2) // 3)
+
+
+# =============================================================================
+# CONVERSION RESULTS
+# =============================================================================
+
+class ConversionResult:
+    """
+    Outcome of converting one file, with byte counts and per-stage timings.
+    
+    Returned by process_image, process_base64_file and process_file so that
+    callers can aggregate results without parsing console output. A result
+    is truthy when the conversion succeeded, so existing checks such as
+    'if process_file(...)' keep working; the written files are listed in
+    'output_paths', and 'output_path' is the first of them.
+    
+    The in-memory conversions (encode_bytes, decode_document) return their
+    outputs in 'output_data', one bytes object per entry of 'output_paths',
+    which then holds output file names rather than paths.
+    
+    With optimization enabled, 'bytes_saved' is how much smaller the
+    encoded image was than the source file.
+    
+    When asked to hash the source (see process_file), 'source_digest' is
+    its SHA-256 digest, computed while the conversion read it; it stays
+    None if the conversion did not read the whole source.
+    
+    Timings are in nanoseconds and accumulate over all chunks of a file:
+    
+        read_ns     reading the source file
+        optimize_ns lossless optimization of the image (see optimize.py)
+        probe_ns    sniffing the image format and dimensions
+        codec_ns    Base64 encoding or decoding
+        validate_ns integrity checks of decoded images (see validate.py)
+        render_ns   rendering the output template
+        write_ns    writing output files
+    """
+
+    __slots__ = (
+        'input_path', 'output_paths', 'output_data', 'mime_type', 'input_bytes', 'output_bytes',
+        'width', 'height', 'cached', 'bytes_saved', 'source_digest', 'error',
+        'read_ns', 'optimize_ns', 'probe_ns', 'codec_ns', 'validate_ns', 'render_ns', 'write_ns',
+    )
+
+    # Names of the per-stage timing attributes
+    TIMING_FIELDS = ('read_ns', 'optimize_ns', 'probe_ns', 'codec_ns', 'validate_ns', 'render_ns', 'write_ns')
+
+    def __init__(self, input_path, output_paths=None, mime_type=None, input_bytes=0,
+                 output_bytes=0, width=None, height=None, cached=False, error=None):
+        self.input_path = input_path
+        self.output_paths = output_paths if output_paths is not None else []
+        self.output_data = None
+        self.mime_type = mime_type
+        self.input_bytes = input_bytes
+        self.output_bytes = output_bytes
+        self.width = width
+        self.height = height
+        self.cached = cached
+        self.bytes_saved = 0
+        self.source_digest = None
+        self.error = error
+        self.read_ns = self.optimize_ns = self.probe_ns = self.codec_ns = self.validate_ns = 0
+        self.render_ns = self.write_ns = 0
+
+    @property
+    def output_path(self):
+        """Path of the first output file, or None if nothing was written."""
+        return self.output_paths[0] if self.output_paths else None
+
+    @property
+    def total_ns(self):
+        """Sum of all stage timings in nanoseconds."""
+        return (self.read_ns + self.optimize_ns + self.probe_ns + self.codec_ns
+                + self.validate_ns + self.render_ns + self.write_ns)
+
+    def __bool__(self):
+        return self.error is None and bool(self.output_paths)
+
+    def __repr__(self):
+        status = 'ok' if self else f'failed: {self.error}' if self.error else 'no output'
+        return (f"<ConversionResult {os.path.basename(self.input_path)!r} {status}, "
+                f"{self.input_bytes} → {self.output_bytes} bytes, {self.total_ns / 1e6:.2f} ms>")
+
+    def as_dict(self):
+        """Return the result as a JSON-serializable dictionary (without output_data)."""
+        return {name: getattr(self, name) for name in self.__slots__ if name != 'output_data'}
+
+
+# =============================================================================
+# CORE IMAGE PROCESSING FUNCTION
+# =============================================================================
+
+def process_image(image_path, output_dir, cache=None, output_format=DEFAULT_OUTPUT_FORMAT,
+                  optimize=False, hash_source=False):
+    """
+    Convert a single image file to base64-encoded HTML format.
+    
+    This is the main processing function that handles the complete conversion workflow:
+    1. Reads the first chunk and sniffs the format and dimensions from it
+    2. Precomputes the Base64 payload size from the source file size
+    3. Writes the rendered output up to the Base64 payload
+    4. Streams the image through the Base64 encoder in fixed-size chunks
+    5. Writes the remainder of the rendered output
+    
+    Peak memory is bounded by ENCODE_CHUNK_SIZE regardless of the image size,
+    so very large scans can be converted without loading them into memory.
+    
+    With an EncodeCache, images whose contents were encoded before reuse the
+    cached payload, MIME type and dimensions; only the wrapper is rendered
+    again. New contents are added to the cache while encoding.
+    
+    With optimize, PNG, JPEG and GIF images are first rewritten losslessly
+    (metadata removed, PNG data re-compressed; see optimize.py) and the
+    smaller of the two versions is encoded.
+    
+    Args:
+        image_path (str): Full path to the source image file, or to an image
+            inside a zip or tar archive (e.g. 'bundle.zip/scans/a.png')
+        output_dir (str): Directory where the output file will be saved
+        cache (EncodeCache): Optional content-addressed cache of encodings
+        output_format (str): Output renderer name from OUTPUT_FORMATS
+            ('html', 'raw', 'datauri', 'css' or 'json')
+        optimize (bool): Shrink the image losslessly before encoding
+        hash_source (bool): Record the source's SHA-256 digest in the result
+    
+    Output File Contents (default 'html' format):
+        • Complete HTML5 document
+        • Detailed conversion metadata in HTML comments
+        • Optimized <img> tag with proper attributes
+        • Base64-encoded image data
+    
+    Returns:
+        ConversionResult: Output path, MIME type, dimensions, byte counts and
+        stage timings of the conversion
+    """
+    clock = perf_counter_ns
+    renderer = get_renderer(output_format)
+
+    # Extract filename components for processing
+    filename = os.path.basename(image_path)
+    base_name = os.path.splitext(filename)[0]
+    output_filename = f"{base_name}{renderer.extension}"
+    output_path = os.path.join(output_dir, output_filename)
+    result = ConversionResult(image_path)
+
+    # Look up identical content in the encode cache
+    digest = None
+    cached = None
+    if cache is not None:
+        started = clock()
+        digest = file_digest(image_path)
+        result.source_digest = digest
+        if optimize:
+            digest += OPTIMIZED_CACHE_SUFFIX
+        cached = cache.lookup(digest)
+        result.read_ns += clock() - started
+
+    if cached is not None:
+        result.cached = True
+        result.mime_type, result.width, result.height = cached.mime_type, cached.width, cached.height
+        with open_input(image_path) as (_, img_size):
+            result.input_bytes = img_size
+        if cached.size is not None:
+            # Size of the image that was encoded, which optimization may have reduced
+            result.bytes_saved = img_size - cached.size
+            img_size = cached.size
+
+        started = clock()
+        document_head, document_tail = renderer.render(_render_fields(
+            image_path, output_path, result.mime_type, img_size, result.width, result.height
+        ))
+        result.render_ns += clock() - started
+
+        started = clock()
+        with open(output_path, "w", encoding="utf-8") as out_file, \
+                open(cached.payload_path, "r", encoding="ascii") as payload_file:
+            out_file.write(document_head)
+            shutil.copyfileobj(payload_file, out_file, ENCODE_CHUNK_SIZE)
+            out_file.write(document_tail)
+        result.write_ns += clock() - started
+
+        result.output_paths.append(output_path)
+        result.output_bytes = _encoded_output_size(document_head, cached.length, document_tail)
+        print(f"Converted '{filename}' to Base64 (reused cached encoding) and saved as '{output_path}'"
+              f"{_saved_note(result)}")
+        return result
+
+    source = None
+    with open_input(image_path) as (img_file, img_size), contextlib.ExitStack() as stack:
+        result.input_bytes = img_size
+        if hash_source and digest is None:
+            img_file = source = HashingReader(img_file, img_size)
+        if optimize:
+            img_file, img_size = _optimized_source(img_file, img_size, result, stack)
+        first_chunk, document_head, document_tail = _start_document(
+            img_file, img_size, image_path, output_path, renderer, result
+        )
+
+        # Stream the document to the output file, encoding one chunk at a time
+        with open(output_path, "w", encoding="utf-8") as out_file:
+            out_file.write(document_head)
+            if cache is not None:
+                with cache.store(digest, result.mime_type, result.width, result.height, img_size) as cache_file:
+                    _encode_stream(img_file, first_chunk, result, out_file, cache_file)
+            else:
+                _encode_stream(img_file, first_chunk, result, out_file)
+            out_file.write(document_tail)
+
+    if source is not None:
+        result.source_digest = source.hexdigest()
+    result.output_paths.append(output_path)
+    result.output_bytes = _encoded_output_size(document_head, base64_encoded_length(img_size), document_tail)
+
+    # Provide user feedback on successful conversion
+    print(f"Converted '{filename}' to Base64 and saved as '{output_path}'{_saved_note(result)}")
+
+    return result
+
+
+def _optimized_source(img_file, img_size, result, stack):
+    """
+    Swap an image stream for a losslessly optimized copy if that is smaller.
+    
+    The copy is spooled in memory up to OPTIMIZE_SPOOL_SIZE and on disk
+    beyond; its lifetime is tied to the given ExitStack. The bytes saved and
+    the time taken are recorded in the ConversionResult.
+    
+    Returns:
+        tuple: (file object, size) of the image to encode
+    """
+    # Only needed with --optimize
+    try:
+        from .optimize import optimize_image
+    except ImportError:
+        from optimize import optimize_image
+    clock = perf_counter_ns
+    started = clock()
+    optimized = stack.enter_context(tempfile.SpooledTemporaryFile(max_size=OPTIMIZE_SPOOL_SIZE))
+    if optimize_image(img_file, optimized) and optimized.tell() < img_size:
+        result.bytes_saved = img_size - optimized.tell()
+        img_file, img_size = optimized, optimized.tell()
+    # Otherwise the format is not supported or nothing was saved: encode the original
+    img_file.seek(0)
+    result.optimize_ns += clock() - started
+    return img_file, img_size
+
+
+def _saved_note(result):
+    """Describe the bytes saved by optimization for console messages."""
+    if result.bytes_saved <= 0:
+        return ""
+    return f" (optimized, {format_size(result.bytes_saved)} smaller)"
+
+
+def _start_document(img_file, img_size, image_path, output_path, renderer, result, seekable=True):
+    """
+    Read the first chunk of an image, identify it and render its wrapper.
+
+    The first chunk serves both the header probe and the encoder, so each
+    image is opened and read exactly once. The MIME type, dimensions, size
+    and stage timings are stored in the ConversionResult.
+
+    Args:
+        img_file: Binary file object positioned at the start of the image
+        img_size (int): Image size in bytes, or None if it is not known
+        image_path (str): Source path, or a display name for streams
+        output_path (str): Destination path shown in the rendered output
+        renderer (OutputRenderer): Output format
+        result (ConversionResult): Record to fill in
+        seekable (bool): Whether the header probe may seek in img_file to
+            find dimensions beyond the first chunk
+
+    Returns:
+        tuple: (first_chunk, document_head, document_tail)
+    """
+    clock = perf_counter_ns
+    started = clock()
+    first_chunk = img_file.read(ENCODE_CHUNK_SIZE)
+    result.read_ns += clock() - started
+
+    document_head, document_tail = _describe_image(
+        first_chunk, img_file if seekable else None, img_size, image_path, output_path, renderer, result
+    )
+    return first_chunk, document_head, document_tail
+
+
+def _describe_image(header, img_file, img_size, image_path, output_path, renderer, result):
+    """
+    Identify an image from its leading bytes and render its output wrapper.
+    
+    Shared by the file, pipe and in-memory encoders. The MIME type,
+    dimensions, size and probe/render timings are stored in the
+    ConversionResult.
+    
+    Returns:
+        tuple: (document_head, document_tail) strings around the payload
+    """
+    clock = perf_counter_ns
+
+    # Identify the format from magic bytes; fall back to the extension
+    started = clock()
+    mime_type, img_width, img_height = probe_image(header, img_file)
+    result.probe_ns += clock() - started
+    if not mime_type:
+        mime_type, _ = mimetypes.guess_type(os.path.basename(image_path))
+    if not mime_type:
+        mime_type = "image/png"  # Default to PNG if MIME type cannot be determined
+    result.mime_type, result.width, result.height = mime_type, img_width, img_height
+
+    # Base64 output size is fully determined by the input size, so the
+    # metadata can be written before any image data has been encoded
+    started = clock()
+    document_head, document_tail = renderer.render(_render_fields(
+        image_path, output_path, mime_type, img_size, img_width, img_height
+    ))
+    result.render_ns += clock() - started
+    return document_head, document_tail
+
+
+def _encode_stream(img_file, chunk, result, *targets):
+    """
+    Base64-encode a binary file chunk by chunk into one or more text files.
+
+    The first chunk has already been read by the caller and must be a
+    multiple of 3 bytes long unless it is the last one. Time spent reading,
+    encoding and writing is added to the ConversionResult.
+
+    Returns:
+        int: Number of image bytes encoded
+    """
+    clock = perf_counter_ns
+    encoded_bytes = 0
+    while chunk:
+        started = clock()
+        encoded = base64.b64encode(chunk).decode('ascii')
+        encoded_at = clock()
+        for target in targets:
+            target.write(encoded)
+        written_at = clock()
+        encoded_bytes += len(chunk)
+        chunk = img_file.read(ENCODE_CHUNK_SIZE)
+        result.codec_ns += encoded_at - started
+        result.write_ns += written_at - encoded_at
+        result.read_ns += clock() - written_at
+    return encoded_bytes
+
+
+def _encoded_output_size(document_head, payload_length, document_tail):
+    """Return the size in bytes of a rendered output written as UTF-8."""
+    return len(document_head.encode('utf-8')) + payload_length + len(document_tail.encode('utf-8'))
+
+
+def _render_fields(image_path, output_path, mime_type, img_size, img_width, img_height):
+    """
+    Collect the conversion details available to output renderers.
+    
+    img_size may be None for streams of unknown length; the size fields
+    are then None as well.
+    
+    Returns:
+        dict: Template fields for OutputRenderer.render
+    """
+    filename = os.path.basename(image_path)
+    base_name, ext = os.path.splitext(filename)
+    return {
+        'filename': filename,
+        'base_name': base_name,
+        'extension': ext,
+        'image_path': image_path,
+        'output_filename': os.path.basename(output_path),
+        'output_path': output_path,
+        'mime_type': mime_type,
+        'image_size': img_size,
+        'image_file_size': format_size(img_size) if img_size is not None else None,
+        'payload_length': base64_encoded_length(img_size) if img_size is not None else None,
+        'width': img_width,
+        'height': img_height,
+    }
+
+
+# =============================================================================
+# STREAMING BASE64 DATA URI SCANNER
+# =============================================================================
+
+# Byte patterns used by the streaming data URI scanner
+_DATA_URI_PREFIX = b'data:'
+_BASE64_MARKER = b';base64,'
+_BASE64_ALPHABET = frozenset(
+    b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/='
+)
+_NON_BASE64_BYTE = re.compile(rb'[^A-Za-z0-9+/=]')
+
+# Bytes that may end a data URI payload in HTML, CSS, JSON or plain text;
+# in strict mode any other byte after a payload is reported as corrupt data
+_PAYLOAD_TERMINATORS = frozenset(b'"\'`()<>[]{},;& \t\r\n\f')
+
+
+class DataURIScanner:
+    """
+    Incremental scanner that locates base64 data URIs in a stream of bytes.
+    
+    The scanner is fed raw chunks of a text/HTML document and reports what it
+    finds as a list of events, decoding the Base64 payload in 4-character
+    aligned blocks as it arrives. Only a bounded look-ahead (the "data:"
+    prefix and MIME type) and at most 3 undecoded characters are buffered
+    between chunks, so memory use is bounded by the chunk size.
+    
+    Matching follows the pattern 'data:([^;]+);base64,([A-Za-z0-9+/=]+)':
+    the payload ends at the first byte outside the Base64 alphabet, and, as
+    with base64.b64decode, decoding stops after the first padded block while
+    stray '=' characters are ignored.
+    
+    In strict mode the payload must be valid as a whole, as with
+    b64decode(validate=True): its length must be a multiple of 4, '='
+    may only appear as final padding, and it must end at a delimiter such
+    as a quote, bracket or whitespace rather than at some other byte.
+    
+    Events:
+        ('start', mime_type): A data URI payload begins
+        ('data', bytes): Decoded image bytes for the current payload
+        ('end', None): The current payload is complete
+    
+    Raises:
+        binascii.Error: From feed() or finish() if the payload cannot be decoded
+    """
+
+    def __init__(self, strict=False):
+        self.strict = strict
+        self._state = 'search'
+        self._buffer = b''
+        self._carry = b''
+        self._pads = 0
+        self._padded = False
+
+    def feed(self, data):
+        """
+        Scan the next chunk of the document.
+        
+        Args:
+            data (bytes): Next chunk of raw document bytes
+        
+        Returns:
+            list: Events found in this chunk, in document order
+        """
+        events = []
+        self._buffer += data
+        while self._step(events, final=False):
+            pass
+        return events
+
+    def finish(self):
+        """
+        Signal the end of the document and flush any pending payload.
+        
+        Returns:
+            list: Remaining events, in document order
+        """
+        events = []
+        while self._step(events, final=True):
+            pass
+        if self._state == 'payload':
+            self._end_payload(events)
+        self._buffer = b''
+        return events
+
+    def _step(self, events, final):
+        """Advance the state machine once; return True if it should run again."""
+        buffer = self._buffer
+
+        if self._state == 'search':
+            index = buffer.find(_DATA_URI_PREFIX)
+            if index < 0:
+                # Keep just enough bytes to match a prefix split across chunks
+                self._buffer = buffer[-(len(_DATA_URI_PREFIX) - 1):]
+                return False
+            self._buffer = buffer[index + len(_DATA_URI_PREFIX):]
+            self._state = 'mime'
+            return True
+
+        if self._state == 'mime':
+            semicolon = buffer.find(b';', 0, MAX_MIME_TYPE_LENGTH + 1)
+            if semicolon < 0:
+                if final or len(buffer) > MAX_MIME_TYPE_LENGTH:
+                    self._state = 'search'
+                    return True
+                return False
+            if semicolon == 0:
+                self._state = 'search'
+                return True
+            # Need the marker plus one payload character to decide
+            needed = semicolon + len(_BASE64_MARKER) + 1
+            if len(buffer) < needed:
+                if final:
+                    self._state = 'search'
+                    return True
+                return False
+            if (buffer[semicolon:needed - 1] == _BASE64_MARKER
+                    and buffer[needed - 1] in _BASE64_ALPHABET):
+                mime_type = buffer[:semicolon].decode('utf-8', 'replace')
+                events.append(('start', mime_type))
+                self._buffer = buffer[needed - 1:]
+                self._carry = b''
+                self._pads = 0
+                self._padded = False
+                self._state = 'payload'
+                return True
+            # Not a base64 data URI; resume searching after this "data:"
+            self._state = 'search'
+            return True
+
+        # Payload state: consume Base64 characters up to the first other byte
+        match = _NON_BASE64_BYTE.search(buffer)
+        if match is None:
+            self._consume(buffer, events)
+            self._buffer = b''
+            return False
+        self._consume(buffer[:match.start()], events)
+        if self.strict and buffer[match.start()] not in _PAYLOAD_TERMINATORS:
+            raise binascii.Error(f"invalid Base64 payload: unexpected byte "
+                                 f"{buffer[match.start():match.start() + 1]!r}")
+        self._buffer = buffer[match.start():]
+        self._end_payload(events)
+        return True
+
+    def _consume(self, run, events):
+        """Decode all complete 4-character blocks of a payload run."""
+        if self._padded and run and self.strict:
+            raise binascii.Error("invalid Base64 payload: excess data after padding")
+        if self._padded or not run:
+            return
+        pending = self._carry
+        pads = self._pads
+        position = 0
+        while position < len(run):
+            pad_index = run.find(b'=', position)
+            segment = run[position:] if pad_index < 0 else run[position:pad_index]
+            if segment:
+                if pads and self.strict:
+                    raise binascii.Error("invalid Base64 payload: '=' inside the data")
+                pending += segment
+                pads = 0
+            if pad_index < 0:
+                break
+            pad_end = pad_index + 1
+            while pad_end < len(run) and run[pad_end] == 0x3D:  # '='
+                pad_end += 1
+            pads += pad_end - pad_index
+            position = pad_end
+            # Same rule as binascii: padding that completes a block ends the
+            # payload, any other '=' is ignored
+            quad_pos = len(pending) % 4
+            if self.strict and (quad_pos < 2 or quad_pos + pads > 4):
+                raise binascii.Error("invalid Base64 payload: misplaced '=' padding")
+            if quad_pos >= 2 and quad_pos + pads >= 4:
+                if self.strict and pad_end < len(run):
+                    raise binascii.Error("invalid Base64 payload: excess data after padding")
+                events.append(('data', base64.b64decode(pending + b'=' * (4 - quad_pos))))
+                self._carry = b''
+                self._padded = True
+                return
+        aligned = len(pending) // 4 * 4
+        if aligned:
+            events.append(('data', base64.b64decode(pending[:aligned])))
+        self._carry = pending[aligned:]
+        self._pads = pads
+
+    def _end_payload(self, events):
+        """Flush the trailing partial block and close the current payload."""
+        if self.strict and not self._padded and (self._carry or self._pads):
+            raise binascii.Error(f"invalid Base64 payload: truncated, length is not a multiple of 4 "
+                                 f"({len(self._carry)} character(s) left over)")
+        if self._carry and not self._padded:
+            events.append(('data', base64.b64decode(self._carry)))
+        self._carry = b''
+        self._pads = 0
+        self._state = 'search'
+        events.append(('end', None))
+
+
+# =============================================================================
+# REVERSE CONVERSION FUNCTION (BASE64 → IMAGE)
+# =============================================================================
+
+def iter_embedded_images(text_file_path, output_dir, extract_all=True, result=None, validate=True,
+                         hash_source=False):
+    """
+    Extract base64 data URI images from a text/HTML file in a single pass.
+    
+    The file is streamed once through a DataURIScanner and every embedded
+    image is decoded straight to its own output file as the scan reaches it,
+    so documents with many inline images are never re-read per image.
+    
+    Output names are derived from the source file name and the MIME type
+    (via extension_map, defaulting to .png). When extracting every image the
+    names are numbered in document order, e.g. 'page_001.png', 'page_002.gif'.
+    
+    Args:
+        text_file_path (str): Full path to the source text/HTML file
+        output_dir (str): Directory where the output image files will be saved
+        extract_all (bool): Extract every data URI with numbered output names,
+            or stop after the first one and name it after the source file
+        result (ConversionResult): Optional record to which byte counts,
+            stage timings and the first image's format and dimensions are added
+        validate (bool): Decode strictly and check each image's integrity
+            while it is written (see validate.py)
+        hash_source (bool): Record the source's SHA-256 digest in the result
+            if the whole file is read
+    
+    Yields:
+        tuple: (output_path, mime_type) for each image once it is fully written
+    
+    Raises:
+        binascii.Error: If an embedded payload cannot be decoded
+        ImageValidationError: If validating and a decoded image is corrupt
+    """
+    if result is None:
+        result = ConversionResult(text_file_path)
+    clock = perf_counter_ns
+    base_name = os.path.splitext(os.path.basename(text_file_path))[0]
+    image_count = 0
+    mime_type = None
+    output_path = None
+    img_file = None
+
+    try:
+        with open_input(text_file_path) as (file, size):
+            source = None
+            if hash_source:
+                file = source = HashingReader(file, size)
+            for event, value in _scan_data_uris(file, result, validate):
+                if event == 'start':
+                    # Generate output filename from the detected MIME type
+                    image_count += 1
+                    mime_type = value
+                    file_extension = extension_map.get(mime_type, '.png')  # Default to PNG
+                    if extract_all:
+                        output_filename = f"{base_name}_{image_count:03d}{file_extension}"
+                    else:
+                        output_filename = f"{base_name}{file_extension}"
+                    output_path = os.path.join(output_dir, output_filename)
+                    img_file = open(output_path, "wb")
+                    if result.mime_type is None:
+                        result.mime_type = mime_type
+                elif event == 'data':
+                    if image_count == 1 and img_file.tell() == 0:
+                        # Read dimensions from the start of the first image
+                        started = clock()
+                        _, result.width, result.height = probe_image(value)
+                        result.probe_ns += clock() - started
+                    # Write decoded binary data as it arrives
+                    started = clock()
+                    img_file.write(value)
+                    result.write_ns += clock() - started
+                    result.output_bytes += len(value)
+                else:
+                    img_file.close()
+                    img_file = None
+                    yield output_path, mime_type
+                    if not extract_all:
+                        break
+            if source is not None:
+                result.source_digest = source.hexdigest()
+    finally:
+        # Never leave a half-written image behind
+        _discard_partial_output(img_file, output_path)
+
+
+def _scan_data_uris(file, result, validate=False):
+    """
+    Stream a binary text file through a DataURIScanner.
+    
+    Reads DECODE_CHUNK_SIZE bytes at a time; read and scan time and the
+    number of bytes read are added to the ConversionResult.
+    
+    With validate, payloads are decoded strictly and every decoded image
+    is checked by an ImageValidator as it streams past. Errors are raised
+    at the first corrupt chunk, and a truncated image fails before its
+    'end' event, so callers never see a bad image as complete.
+    
+    Yields:
+        tuple: Scanner events ('start', mime_type), ('data', bytes) and
+        ('end', None) in document order
+    
+    Raises:
+        binascii.Error: If a payload is not valid Base64
+        ImageValidationError: If a decoded image is corrupt or truncated
+    """
+    clock = perf_counter_ns
+    scanner = DataURIScanner(strict=validate)
+    validator = None
+    if validate:
+        # Only needed when decoded images are checked
+        try:
+            from .validate import ImageValidator
+        except ImportError:
+            from validate import ImageValidator
+    while True:
+        started = clock()
+        chunk = file.read(DECODE_CHUNK_SIZE)
+        read_at = clock()
+        events = scanner.feed(chunk) if chunk else scanner.finish()
+        result.read_ns += read_at - started
+        result.codec_ns += clock() - read_at
+        result.input_bytes += len(chunk)
+        for event in events:
+            if validate:
+                started = clock()
+                if event[0] == 'start':
+                    validator = ImageValidator()
+                elif event[0] == 'data':
+                    validator.feed(event[1])
+                else:
+                    validator.finish()
+                result.validate_ns += clock() - started
+            yield event
+        if not chunk:
+            break
+
+
+def process_base64_file(text_file_path, output_dir, extract_all=False, validate=True, hash_source=False):
+    """
+    Convert a base64-encoded HTML/text file back to its original image format.
+    
+    This function handles the reverse conversion workflow:
+    1. Streams the text/HTML file through iter_embedded_images
+    2. Detects each base64 data URI and its MIME type
+    3. Determines the appropriate file extension
+    4. Decodes the Base64 payload block by block as it streams in
+    5. Writes the reconstructed image file as it goes
+    
+    Memory use is bounded by DECODE_CHUNK_SIZE, so multi-hundred-MB HTML
+    exports can be decoded without holding them in memory.
+    
+    With validate, invalid Base64 and corrupt or truncated PNG, JPEG and
+    GIF data fail the conversion as soon as they are detected. A failed
+    conversion leaves no output behind: the partly written image and,
+    with extract_all, the images already written from the document are
+    removed.
+    
+    Args:
+        text_file_path (str): Full path to the source text/HTML file, or to
+            a member of a zip or tar archive
+        output_dir (str): Directory where the output image file will be saved
+        extract_all (bool): Extract every embedded image instead of only the first
+        validate (bool): Check payloads and decoded images for corruption
+        hash_source (bool): Record the source's SHA-256 digest in the result
+    
+    Returns:
+        ConversionResult: Written image paths, byte counts and stage timings;
+        truthy if at least one image was decoded
+    """
+    try:
+        from .validate import ImageValidationError
+    except ImportError:
+        from validate import ImageValidationError
+    text_filename = os.path.basename(text_file_path)
+    result = ConversionResult(text_file_path)
+
+    try:
+        for output_path, mime_type in iter_embedded_images(text_file_path, output_dir, extract_all, result,
+                                                           validate, hash_source):
+            result.output_paths.append(output_path)
+
+            # Calculate file size for reporting
+            new_size = file_size_str(output_path)
+
+            # Provide user feedback
+            print(f"✓ Decoded '{text_filename}' → '{os.path.basename(output_path)}' ({mime_type}, {new_size})")
+
+    except binascii.Error as e:
+        print(f"❌ Failed to decode base64 data in '{text_filename}': {e}")
+        _discard_written_outputs(result)
+        return _failed(result, e)
+    except ImageValidationError as e:
+        print(f"❌ Corrupt image data in '{text_filename}': {e}")
+        _discard_written_outputs(result)
+        return _failed(result, e)
+    except Exception as e:
+        print(f"❌ Error processing '{text_filename}': {e}")
+        _discard_written_outputs(result)
+        return _failed(result, e)
+
+    if not result.output_paths:
+        print(f"❌ No valid base64 data found in '{text_filename}'")
+        result.error = "no base64 data found"
+
+    return result
+
+
+def _failed(result, error):
+    """Mark a conversion result as failed, discarding outputs already listed."""
+    result.error = str(error) or type(error).__name__
+    result.output_paths = []
+    return result
+
+
+def _discard_written_outputs(result):
+    """Remove the output files a failed conversion had already completed."""
+    for output_path in result.output_paths:
+        try:
+            os.remove(output_path)
+        except OSError:
+            pass
+
+
+def _discard_partial_output(out_file, output_path):
+    """Close and remove an output file left incomplete by a failed conversion."""
+    if out_file is None:
+        return
+    out_file.close()
+    try:
+        os.remove(output_path)
+    except OSError:
+        pass
+
+
+# =============================================================================
+# UNIFIED FILE PROCESSING FUNCTION
+# =============================================================================
+
+def process_file(file_path, output_dir, extract_all=False, direction='auto', cache=None,
+                 output_format=DEFAULT_OUTPUT_FORMAT, optimize=False, validate=True, hash_source=False):
+    """
+    Intelligently process a file based on its type - either convert image to base64 
+    or convert base64 back to image.
+    
+    A zip or tar archive is processed member by member (see
+    _process_archive), and a path inside an archive such as
+    'bundle.zip/scans/a.png' converts that single member. Members are read
+    straight from the archive without being extracted first.
+    
+    Args:
+        file_path (str): Full path to the source file, archive or archive member
+        output_dir (str): Directory where the output file will be saved
+        extract_all (bool): For text files, extract every embedded image
+        direction (str): 'auto' to choose by file extension, or 'encode' /
+            'decode' to force Image → Base64 or Base64 → Image conversion
+        cache (EncodeCache): Optional cache of encodings for image files
+        output_format (str): Output renderer for image files (see OUTPUT_FORMATS)
+        optimize (bool): Losslessly shrink images before encoding them
+        validate (bool): For text files, check decoded images for corruption
+        hash_source (bool): Hash the source while converting it, for the
+            manifest of incremental runs (see ConversionResult.source_digest)
+    
+    Returns:
+        ConversionResult: Outcome of the conversion; truthy if it succeeded,
+        otherwise its 'error' attribute describes the failure
+    """
+    if is_archive(file_path):
+        return _process_archive(file_path, output_dir, extract_all, direction, cache, output_format,
+                                optimize, validate)
+
+    filename = os.path.basename(file_path)
+    direction = conversion_direction(filename, direction)
+    
+    if direction == 'encode':
+        # Convert image to base64 HTML
+        try:
+            return process_image(file_path, output_dir, cache, output_format, optimize, hash_source)
+        except Exception as e:
+            print(f"❌ Failed to convert image '{filename}': {e}")
+            return _failed(ConversionResult(file_path), e)
+    
+    elif direction == 'decode':
+        # Convert base64 HTML back to image
+        return process_base64_file(file_path, output_dir, extract_all, validate, hash_source)
+    
+    else:
+        print(f"⚠️  Unsupported file type: '{filename}' (skipping)")
+        return ConversionResult(file_path, error="unsupported file type")
+
+
+def conversion_direction(filename, direction='auto'):
+    """
+    Resolve the conversion direction for a file name.
+    
+    Args:
+        filename (str): File name or path
+        direction (str): 'auto', 'encode' or 'decode'
+    
+    Returns:
+        str: 'encode' or 'decode', or None if 'auto' does not recognise the
+        file extension
+    """
+    if direction != 'auto':
+        return direction
+    file_ext = os.path.splitext(filename)[1].lower()
+    if file_ext in image_extensions:
+        return 'encode'
+    if file_ext in text_extensions:
+        return 'decode'
+    return None
+
+
+def _process_archive(archive_path, output_dir, extract_all, direction, cache, output_format, optimize,
+                     validate):
+    """
+    Convert every convertible member of a zip or tar archive.
+    
+    Members are streamed from the archive one at a time and their
+    directories inside the archive are mirrored below output_dir.
+    
+    Returns:
+        ConversionResult: Combined outputs, byte counts and stage timings of
+        the converted members; failed only if no member could be converted
+    """
+    result = ConversionResult(archive_path)
+    failures = 0
+    first_error = None
+    for item in iter_archive_inputs(archive_path, direction):
+        member_output_dir = os.path.join(output_dir, item.relative_dir)
+        os.makedirs(member_output_dir, exist_ok=True)
+        member_result = process_file(item.path, member_output_dir, extract_all, direction, cache,
+                                     output_format, optimize, validate)
+        if not member_result:
+            failures += 1
+            if first_error is None:
+                first_error = f"{os.path.basename(item.path)}: {member_result.error}"
+            continue
+        result.output_paths.extend(member_result.output_paths)
+        result.input_bytes += member_result.input_bytes
+        result.output_bytes += member_result.output_bytes
+        result.bytes_saved += member_result.bytes_saved
+        for field in ConversionResult.TIMING_FIELDS:
+            setattr(result, field, getattr(result, field) + getattr(member_result, field))
+
+    if not result.output_paths:
+        result.error = (f"{failures} member(s) failed, first {first_error}" if failures
+                        else "no convertible members in archive")
+    return result
+
+
+# =============================================================================
+# IN-MEMORY CONVERSION FUNCTIONS
+# =============================================================================
+
+def encode_bytes(data, name='image', output_format=DEFAULT_OUTPUT_FORMAT):
+    """
+    Convert an image held in memory to a Base64 document in memory.
+    
+    Uses the same header probe and renderers as process_image, but encodes
+    the whole buffer in a single call since the result is held in memory
+    anyway. Nothing is written to disk.
+    
+    Args:
+        data (bytes, bytearray or memoryview): Image file contents
+        name (str): Image file name, shown in the output and used to guess
+            the MIME type if the header is not recognised
+        output_format (str): Output renderer name from OUTPUT_FORMATS
+    
+    Returns:
+        ConversionResult: output_paths holds the output file name (e.g.
+        'logo.txt') and output_data the rendered document as UTF-8 bytes
+    """
+    clock = perf_counter_ns
+    renderer = get_renderer(output_format)
+    view = memoryview(data).cast('B')
+    output_filename = f"{os.path.splitext(os.path.basename(name))[0]}{renderer.extension}"
+    result = ConversionResult(name)
+
+    result.input_bytes = view.nbytes
+    document_head, document_tail = _describe_image(
+        view, None, view.nbytes, name, output_filename, renderer, result
+    )
+    started = clock()
+    payload = base64.b64encode(view)
+    result.codec_ns += clock() - started
+
+    document = b''.join((document_head.encode('utf-8'), payload, document_tail.encode('utf-8')))
+    result.output_paths.append(output_filename)
+    result.output_data = [document]
+    result.output_bytes = len(document)
+    return result
+
+
+def decode_document(data, name='document', extract_all=False, validate=True):
+    """
+    Extract Base64 data URI images from a text/HTML document in memory.
+    
+    The document is scanned with the same streaming DataURIScanner as
+    process_base64_file, and output names follow the same rules: the
+    first image is named after the document, or with extract_all every
+    image is numbered (e.g. 'page_001.png').
+    
+    Args:
+        data (bytes, bytearray or memoryview): Document contents
+        name (str): Document file name used to derive output names
+        extract_all (bool): Extract every embedded image instead of only the first
+        validate (bool): Decode strictly and check the integrity of each image
+    
+    Returns:
+        ConversionResult: output_paths holds the image file names and
+        output_data the decoded images. Like process_base64_file, failures
+        are reported in 'error' rather than raised: 'no base64 data found'
+        if the document contains no data URI, or the reason a payload could
+        not be decoded or a decoded image is corrupt.
+    """
+    clock = perf_counter_ns
+    base_name = os.path.splitext(os.path.basename(name))[0]
+    result = ConversionResult(name)
+    result.output_data = []
+    image_parts = []
+
+    try:
+        for event, value in _scan_data_uris(io.BytesIO(data), result, validate):
+            if event == 'start':
+                file_extension = extension_map.get(value, '.png')
+                if extract_all:
+                    output_filename = f"{base_name}_{len(result.output_paths) + 1:03d}{file_extension}"
+                else:
+                    output_filename = f"{base_name}{file_extension}"
+                if result.mime_type is None:
+                    result.mime_type = value
+            elif event == 'data':
+                image_parts.append(value)
+            else:
+                started = clock()
+                image = b''.join(image_parts)
+                image_parts = []
+                result.write_ns += clock() - started
+                if not result.output_paths:
+                    started = clock()
+                    _, result.width, result.height = probe_image(image)
+                    result.probe_ns += clock() - started
+                result.output_paths.append(output_filename)
+                result.output_data.append(image)
+                result.output_bytes += len(image)
+                if not extract_all:
+                    break
+    except ValueError as e:  # binascii.Error or ImageValidationError
+        result.output_data = []
+        return _failed(result, e)
+
+    if not result.output_paths:
+        result.error = "no base64 data found"
+    return result
+
+
+# =============================================================================
+# PIPE MODE (STDIN → STDOUT)
+# =============================================================================
+
+# Commands that convert a single stream, e.g. 'base64-converter encode - -'
+PIPE_COMMANDS = ('encode', 'decode')
+
+# Source or target path meaning standard input / standard output
+STDIO_PATH = '-'
+
+# Bytes of piped input kept in memory before spilling to a temporary file,
+# when the output format needs the image size before the payload
+PIPE_SPOOL_SIZE = 8 * 1024 * 1024
+
+
+def encode_pipe(source=STDIO_PATH, target=STDIO_PATH, output_format=DEFAULT_OUTPUT_FORMAT, name=None):
+    """
+    Encode a single image from a stream into a Base64 document on a stream.
+    
+    Data is read and encoded ENCODE_CHUNK_SIZE bytes at a time. Input of
+    unknown length (a pipe) is streamed straight through for formats that
+    do not show the image size ('raw', 'datauri', 'css'); for the others it
+    is first spooled, in memory up to PIPE_SPOOL_SIZE and on disk beyond,
+    because the size is rendered before the payload.
+    
+    Args:
+        source (str): Image path, archive member path, or '-' for stdin
+        target (str): Output path, or '-' for stdout
+        output_format (str): Output renderer name from OUTPUT_FORMATS
+        name (str): File name shown in the output and used to guess the
+            MIME type if the header is not recognised (default: the
+            source file name, or 'stdin')
+    
+    Returns:
+        ConversionResult: Outcome with the MIME type, dimensions, byte
+        counts and stage timings; output_paths holds the target
+    """
+    renderer = get_renderer(output_format)
+    if name is None:
+        name = 'stdin' if source == STDIO_PATH else os.path.basename(source)
+    output_name = '<stdout>' if target == STDIO_PATH else target
+    result = ConversionResult(source)
+
+    with contextlib.ExitStack() as stack:
+        img_file, img_size = stack.enter_context(_open_pipe_source(source))
+        seekable = img_size is not None
+        if img_size is None and renderer.needs_size:
+            spool = stack.enter_context(tempfile.SpooledTemporaryFile(max_size=PIPE_SPOOL_SIZE))
+            shutil.copyfileobj(img_file, spool, ENCODE_CHUNK_SIZE)
+            img_file, img_size, seekable = spool, spool.tell(), True
+            spool.seek(0)
+
+        out_file = io.TextIOWrapper(stack.enter_context(_open_pipe_target(target)), encoding='utf-8')
+        stack.callback(out_file.detach)  # Flush without closing stdout
+        first_chunk, document_head, document_tail = _start_document(
+            img_file, img_size, name, output_name, renderer, result, seekable
+        )
+        out_file.write(document_head)
+        result.input_bytes = _encode_stream(img_file, first_chunk, result, out_file)
+        out_file.write(document_tail)
+
+    result.output_paths.append(target)
+    result.output_bytes = _encoded_output_size(
+        document_head, base64_encoded_length(result.input_bytes), document_tail
+    )
+    return result
+
+
+def decode_pipe(source=STDIO_PATH, target=STDIO_PATH, validate=True):
+    """
+    Decode the first embedded Base64 image of a stream to a stream.
+    
+    The input is scanned DECODE_CHUNK_SIZE bytes at a time and the image
+    is written as it is decoded, so memory use does not grow with the
+    document or image size.
+    
+    Args:
+        source (str): Text/HTML path, archive member path, or '-' for stdin
+        target (str): Image output path, or '-' for stdout
+        validate (bool): Decode strictly and check the image's integrity
+    
+    Returns:
+        ConversionResult: Outcome with the MIME type and byte counts; failed
+        with 'no base64 data found' if the input has no data URI, or with
+        the reason the payload could not be decoded or the decoded image is
+        corrupt. An output file is then removed, but data already written
+        to stdout cannot be taken back.
+    
+    Raises:
+        OSError: If the source or target cannot be opened
+    """
+    result = ConversionResult(source)
+    clock = perf_counter_ns
+    try:
+        with contextlib.ExitStack() as stack:
+            text_file, _ = stack.enter_context(_open_pipe_source(source))
+            out_file = None
+            for event, value in _scan_data_uris(text_file, result, validate):
+                if event == 'start':
+                    result.mime_type = value
+                    out_file = stack.enter_context(_open_pipe_target(target))
+                elif event == 'data':
+                    started = clock()
+                    out_file.write(value)
+                    result.write_ns += clock() - started
+                    result.output_bytes += len(value)
+                else:
+                    result.output_paths.append(target)
+                    break
+    except ValueError as e:  # binascii.Error or ImageValidationError
+        return _failed(result, e)
+
+    if not result.output_paths:
+        result.error = "no base64 data found"
+    return result
+
+
+@contextlib.contextmanager
+def _open_pipe_source(source):
+    """Open stdin or an input path; yields (binary file, size or None)."""
+    if source != STDIO_PATH:
+        with open_input(source) as opened:
+            yield opened
+        return
+    stdin = sys.stdin.buffer
+    size = None
+    try:
+        # Redirected from a regular file: the size is known up front
+        stdin_stat = os.fstat(stdin.fileno())
+        if stat.S_ISREG(stdin_stat.st_mode):
+            size = stdin_stat.st_size - stdin.tell()
+    except (OSError, ValueError, io.UnsupportedOperation):
+        pass
+    yield stdin, size
+
+
+@contextlib.contextmanager
+def _open_pipe_target(target):
+    """Open stdout or an output path for binary writing."""
+    if target == STDIO_PATH:
+        sys.stdout.flush()
+        yield sys.stdout.buffer
+        sys.stdout.buffer.flush()
+        return
+    out_file = open(target, 'wb')
+    try:
+        yield out_file
+    except BaseException:
+        # Never leave a half-written output behind
+        _discard_partial_output(out_file, target)
+        raise
+    out_file.close()
+
+
+def parse_pipe_arguments(command, argv):
+    """
+    Parse the options of the 'encode' and 'decode' pipe commands.
+    
+    Args:
+        command (str): One of PIPE_COMMANDS
+        argv (list): Arguments following the command
+    
+    Returns:
+        argparse.Namespace: Parsed options
+    """
+    if command == 'encode':
+        description = "Encode one image to a Base64 document, e.g. 'base64-converter encode - -'."
+        source_help = "image file or '-' for stdin (default: -)"
+    else:
+        description = "Decode the first Base64 image in a document, e.g. 'base64-converter decode - -'."
+        source_help = "text/HTML file or '-' for stdin (default: -)"
+    parser = argparse.ArgumentParser(prog=f"base64-converter {command}", description=description)
+    parser.add_argument("source", nargs="?", default=STDIO_PATH, metavar="INPUT", help=source_help)
+    parser.add_argument("target", nargs="?", default=STDIO_PATH, metavar="OUTPUT",
+                        help="output file or '-' for stdout (default: -)")
+    if command == 'encode':
+        parser.add_argument(
+            "-f", "--format", choices=sorted(OUTPUT_FORMATS), default=DEFAULT_OUTPUT_FORMAT,
+            help=f"output format (default: {DEFAULT_OUTPUT_FORMAT}); 'raw', 'datauri' and 'css' "
+                 "stream piped input without buffering it",
+        )
+        parser.add_argument(
+            "--name", metavar="FILENAME",
+            help="image file name shown in the output for stdin input; its "
+                 "extension is the MIME type fallback",
+        )
+    else:
+        parser.add_argument(
+            "--no-validate", dest="validate", action="store_false",
+            help="skip strict Base64 and image integrity checks",
+        )
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="only report errors (messages always go to stderr)")
+    return parser.parse_args(argv)
+
+
+def run_pipe(command, argv):
+    """
+    Run the 'encode' or 'decode' pipe command.
+    
+    The converted data is the only thing written to stdout; status and
+    error messages go to stderr.
+    
+    Args:
+        command (str): One of PIPE_COMMANDS
+        argv (list): Arguments following the command
+    
+    Returns:
+        int: Process exit status (0 on success)
+    """
+    args = parse_pipe_arguments(command, argv)
+    try:
+        if command == 'encode':
+            result = encode_pipe(args.source, args.target, args.format, args.name)
+        else:
+            result = decode_pipe(args.source, args.target, args.validate)
+    except BrokenPipeError:
+        # The reader went away (e.g. '| head'); silence the final flush at exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    except (OSError, ValueError, binascii.Error) as e:
+        print(f"❌ Failed to {command} '{args.source}': {e}", file=sys.stderr)
+        return 1
+
+    source_name = '<stdin>' if args.source == STDIO_PATH else args.source
+    if not result:
+        print(f"❌ Failed to {command} '{source_name}': {result.error}", file=sys.stderr)
+        return 1
+    if not args.quiet:
+        output_name = '<stdout>' if args.target == STDIO_PATH else args.target
+        print(f"✓ {command.capitalize()}d '{source_name}' → '{output_name}' "
+              f"({result.mime_type}, {format_size(result.output_bytes)})", file=sys.stderr)
+    return 0
+
+
+# =============================================================================
+# INPUT DISCOVERY FUNCTIONS
+# =============================================================================
+
+def convertible_extensions(direction='auto'):
+    """
+    Get the file extensions that are picked up for a conversion direction.
+    
+    Args:
+        direction (str): 'auto', 'encode' or 'decode'
+    
+    Returns:
+        tuple: Lower-case file extensions including the leading dot
+    """
+    if direction == 'encode':
+        return image_extensions
+    if direction == 'decode':
+        return text_extensions
+    return image_extensions + text_extensions
+
+
+# A file queued for conversion. 'relative_dir' is the sub-directory (relative
+# to the scanned input root) that is mirrored into the output directory;
+# 'size' and 'mtime_ns' come from the directory scan when available.
+WorkItem = collections.namedtuple('WorkItem', ['path', 'relative_dir', 'size', 'mtime_ns'])
+
+
+def make_work_item(path, relative_dir=''):
+    """
+    Create a WorkItem for a path that was not produced by a directory scan.
+    
+    Args:
+        path (str): Full path to the source file
+        relative_dir (str): Output sub-directory to mirror
+    
+    Returns:
+        WorkItem: Work item with size and mtime filled in if the file exists
+    """
+    try:
+        stat = os.stat(path)
+        return WorkItem(path, relative_dir, stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        return WorkItem(path, relative_dir, None, None)
+
+
+def iter_archive_inputs(archive_path, direction='auto', include=None, exclude=None, relative_dir=''):
+    """
+    Lazily list the convertible members of a zip or tar archive.
+    
+    Members are selected like files in a recursive directory scan: by
+    extension, or by include/exclude patterns matched against the member
+    path inside the archive. Nothing is extracted; the work items point
+    into the archive (e.g. 'bundle.zip/scans/a.png') and are opened with
+    open_input when converted.
+    
+    Args:
+        archive_path (str): Path of the zip or tar archive
+        direction (str): 'auto', 'encode' or 'decode'
+        include (list): Only yield members matching one of these patterns
+        exclude (list): Skip members matching these patterns
+        relative_dir (str): Directory the archive was found in, relative to
+            a scanned input directory; prefixed to each member's directory
+    
+    Yields:
+        WorkItem: One item per member, with 'relative_dir' set to the
+        member's directory inside the archive
+    """
+    extensions = convertible_extensions(direction)
+    include = include or []
+    exclude = exclude or []
+
+    for member in iter_archive_members(archive_path):
+        if include:
+            if not _matches_any(member.name, include):
+                continue
+        elif not member.name.lower().endswith(extensions):
+            continue
+        if exclude and _matches_any(member.name, exclude):
+            continue
+
+        # Never let '..' or absolute member names escape the output directory
+        parts = [part for part in member.name.split('/')[:-1] if part not in ('', '.', '..')]
+        yield WorkItem(
+            archive_path + os.sep + member.name.replace('/', os.sep),
+            os.path.join(relative_dir, *parts),
+            member.size,
+            member.mtime_ns,
+        )
+
+
+def _is_convertible(relative_path, extensions, include, exclude):
+    """Select a file by include/exclude patterns, or by extension without includes."""
+    if include:
+        if not _matches_any(relative_path, include):
+            return False
+    elif not relative_path.lower().endswith(extensions):
+        return False
+    return not (exclude and _matches_any(relative_path, exclude))
+
+
+def _matches_any(relative_path, patterns):
+    """Check a relative path (or its base name) against fnmatch patterns."""
+    name = relative_path.rsplit('/', 1)[-1]
+    return any(
+        fnmatch.fnmatch(relative_path, pattern) or fnmatch.fnmatch(name, pattern)
+        for pattern in patterns
+    )
+
+
+def iter_input_files(root_dir, direction='auto', recursive=False, include=None, exclude=None):
+    """
+    Lazily discover convertible files below a directory using os.scandir.
+    
+    Directories are walked iteratively and files are yielded as soon as
+    they are seen, so discovery of very large trees starts producing work
+    immediately and never builds a full listing in memory. File size and
+    modification time are taken from the DirEntry stat data gathered during
+    the scan, so later stages do not need to stat the files again.
+    
+    Patterns are matched with fnmatch against both the base name and the
+    path relative to root_dir (using '/' separators), e.g. '*.png',
+    'archive/*' or '*/thumbs/*'. Excluded directories are not descended into.
+    Zip and tar archives found during the scan are expanded into their
+    convertible members (see iter_archive_inputs) unless excluded.
+    
+    Args:
+        root_dir (str): Directory to scan
+        direction (str): 'auto', 'encode' or 'decode'; selects the default
+            file extensions when no include patterns are given
+        recursive (bool): Descend into sub-directories
+        include (list): Only yield files matching one of these patterns
+        exclude (list): Skip files and directories matching these patterns
+    
+    Yields:
+        WorkItem: One item per convertible file, with 'relative_dir' set to
+        the file's directory relative to root_dir
+    """
+    extensions = convertible_extensions(direction)
+    include = include or []
+    exclude = exclude or []
+    pending_dirs = ['']
+
+    while pending_dirs:
+        relative_dir = pending_dirs.pop()
+        current_dir = os.path.join(root_dir, relative_dir) if relative_dir else root_dir
+        subdirs = []
+        try:
+            with os.scandir(current_dir) as entries:
+                for entry in entries:
+                    relative_path = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive and not _matches_any(relative_path, exclude):
+                                subdirs.append(relative_path)
+                            continue
+                        if not entry.is_file():
+                            continue
+                    except OSError:
+                        continue
+
+                    if archive_kind(entry.name) is not None:
+                        if not _matches_any(relative_path, exclude):
+                            yield from iter_archive_inputs(entry.path, direction, include, exclude,
+                                                           relative_dir.replace('/', os.sep))
+                        continue
+                    if not _is_convertible(relative_path, extensions, include, exclude):
+                        continue
+
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    yield WorkItem(
+                        entry.path,
+                        relative_dir.replace('/', os.sep),
+                        stat.st_size,
+                        stat.st_mtime_ns,
+                    )
+        except OSError as e:
+            print(f"⚠️  Unable to scan directory '{current_dir}': {e}")
+            continue
+
+        # Visit sub-directories in listing order
+        pending_dirs.extend(reversed(subdirs))
+
+
+def _glob_root(pattern):
+    """Return the leading part of a glob pattern that contains no wildcards."""
+    parts = []
+    for part in pattern.replace('\\', '/').split('/'):
+        if any(c in part for c in '*?['):
+            break
+        parts.append(part)
+    return '/'.join(parts)
+
+
+def expand_input_paths(inputs, direction='auto', recursive=False, include=None, exclude=None):
+    """
+    Lazily expand command-line inputs into work items.
+    
+    Each input may be a file path, a directory (scanned with
+    iter_input_files) or a glob pattern such as 'scans/*.png' or
+    'exports/**/*.html'. Directory and glob matches keep their
+    sub-directory relative to the directory or the pattern's fixed prefix,
+    so the input structure is mirrored into the output directory.
+    Explicitly named files are always kept so that unsupported or missing
+    files are reported as failures instead of being silently ignored.
+    Zip and tar archives, whether named, matched by a glob or found in a
+    scanned directory, are expanded into their convertible members (see
+    iter_archive_inputs), which are read without extraction.
+    
+    Args:
+        inputs (list): File paths, archives, directories or glob patterns
+        direction (str): Conversion direction used to filter by extension
+        recursive (bool): Descend into sub-directories of directory inputs
+        include (list): fnmatch patterns a discovered file must match
+        exclude (list): fnmatch patterns for files and directories to skip
+    
+    Yields:
+        WorkItem: One item per file to convert
+    """
+    extensions = convertible_extensions(direction)
+    include = include or []
+    exclude = exclude or []
+
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            yield from iter_input_files(pattern, direction, recursive, include, exclude)
+        elif any(c in pattern for c in '*?['):
+            root = _glob_root(pattern)
+            for path in glob.iglob(pattern, recursive=True):
+                relative_path = os.path.relpath(path, root or os.curdir).replace(os.sep, '/')
+                if is_archive(path):
+                    if not _matches_any(relative_path, exclude):
+                        yield from iter_archive_inputs(path, direction, include, exclude,
+                                                       os.path.dirname(relative_path).replace('/', os.sep))
+                    continue
+                if include:
+                    if not _matches_any(relative_path, include):
+                        continue
+                elif not path.lower().endswith(extensions):
+                    continue
+                if exclude and _matches_any(relative_path, exclude):
+                    continue
+                if os.path.isfile(path):
+                    yield make_work_item(path, os.path.dirname(relative_path).replace('/', os.sep))
+        elif is_archive(pattern):
+            yield from iter_archive_inputs(pattern, direction, include, exclude)
+        else:
+            yield make_work_item(pattern)
+
 
 # =============================================================================
-# IMAGE DIMENSION EXTRACTION FUNCTIONS
+# BATCH PROCESSING ENGINE
 # =============================================================================
 
-def try_read_dimensions_from_header(image_path, mime_type):
+def conversion_type_label(file_path, direction='auto'):
     """
-    Extract image dimensions directly from file headers without loading the entire image.
-    
-    This function reads the binary header of image files to extract width and height
-    information efficiently. It supports PNG, JPEG, GIF, and BMP formats using
-    format-specific header parsing techniques.
+    Describe the conversion direction that process_file will use for a file.
     
     Args:
-        image_path (str): Full path to the image file
-        mime_type (str): MIME type of the image (e.g., 'image/png', 'image/jpeg')
+        file_path (str): Full path to the source file
+        direction (str): 'auto', 'encode' or 'decode'
     
     Returns:
-        tuple: (width, height) as integers, or (None, None) if extraction fails
+        str: Human-readable conversion direction for progress output
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if direction == 'encode' or (direction == 'auto' and file_ext in image_extensions):
+        return "Image → Base64 HTML"
+    elif direction == 'decode' or (direction == 'auto' and file_ext in text_extensions):
+        return "Base64 HTML → Image"
+    return "Unknown"
+
+
+# Outcome counts of a batch run; 'failures' lists (input path, reason) per failed file
+BatchSummary = collections.namedtuple(
+    'BatchSummary', ['successful', 'failed', 'skipped', 'bytes_saved', 'failures']
+)
+
+
+def _batch_worker(file_path, output_dir, convert_options, hash_source=False):
+    """
+    Convert one file with its console output captured.
     
-    Supported Formats:
-        • PNG: Reads IHDR chunk for dimensions
-        • JPEG: Parses SOF (Start of Frame) markers
-        • GIF: Reads logical screen descriptor
-        • BMP: Extracts from DIB header
+    Used inside worker processes, and in-process for quiet runs, so that
+    the caller decides what to print and in which order.
+    
+    Returns:
+        tuple: (result, source_digest, captured_output); the digest is only
+        computed when hash_source is set and the conversion succeeded
     """
-    try:
-        with open(image_path, "rb") as f:
-            # PNG format: Read IHDR chunk
-            if mime_type == "image/png":
-                f.read(8)  # Skip PNG signature (8 bytes)
-                chunk = f.read(25)  # Read chunk length, type, and IHDR data
-                if chunk[12:16] == b'IHDR':  # Verify IHDR chunk type
-                    width = int.from_bytes(chunk[16:20], "big")
-                    height = int.from_bytes(chunk[20:24], "big")
-                    return width, height
-            
-            # JPEG format: Parse markers to find SOF (Start of Frame)
-            elif mime_type == "image/jpeg":
-                f.read(2)  # Skip JPEG signature (FF D8)
-                while True:
-                    marker, code = f.read(1), f.read(1)
-                    if marker != b'\xFF':
-                        break
-                    # Skip any additional 0xFF bytes
-                    while code == b'\xFF':
-                        code = f.read(1)
-                    # Check for SOF markers (Start of Frame)
-                    if 0xC0 <= code[0] <= 0xCF and code[0] != 0xC4 and code[0] != 0xCC:
-                        f.read(3)  # Skip segment length and precision
-                        height = int.from_bytes(f.read(2), "big")
-                        width = int.from_bytes(f.read(2), "big")
-                        return width, height
-                    else:
-                        # Skip to next marker
-                        size = int.from_bytes(f.read(2), "big")
-                        f.read(size-2)
-            
-            # GIF format: Read logical screen descriptor
-            elif mime_type == "image/gif":
-                header = f.read(10)  # Read GIF header (6 bytes signature + 4 bytes dimensions)
-                width = int.from_bytes(header[6:8], "little")
-                height = int.from_bytes(header[8:10], "little")
-                return width, height
-            
-            # BMP format: Read DIB header
-            elif mime_type == "image/bmp":
-                f.read(18)  # Skip BMP file header and DIB header size
-                width = int.from_bytes(f.read(4), "little")
-                height = int.from_bytes(f.read(4), "little")
-                return width, height
-                
-    except Exception:
-        # Return None values if any error occurs during header parsing
-        pass
-    return None, None
+    captured = io.StringIO()
+    with contextlib.redirect_stdout(captured):
+        result = process_file(file_path, output_dir, hash_source=hash_source, **convert_options)
+    digest = _source_digest(result) if hash_source else None
+    return result, digest, captured.getvalue()
 
 
-# =============================================================================
-# FILE UTILITY FUNCTIONS
-# =============================================================================
+def _source_digest(result):
+    """
+    Return the SHA-256 digest of a successfully converted source.
+    
+    The digest computed while converting is used when the conversion read
+    the whole source; otherwise (e.g. decoding stopped after the first
+    image) the rest of the file has to be hashed separately.
+    """
+    if not result:
+        return None
+    if result.source_digest is not None:
+        return result.source_digest
+    try:
+        return file_digest(result.input_path)
+    except OSError:
+        return None
 
-def file_size_str(file_path):
+
+def run_batch(work_items, output_dir, workers=1, quiet=False, total=None,
+              manifest=None, on_result=None, archive=None, **convert_options):
     """
-    Convert file size in bytes to human-readable format.
+    Convert a stream of files, optionally in parallel across worker processes.
     
-    Takes a file path and returns the file size formatted in appropriate units
-    (bytes, KB, MB, GB, TB, PB) with 2 decimal places for readability.
+    Work items are consumed lazily, so discovery and conversion overlap and
+    the input list never has to be built up front. Each file is written to
+    output_dir joined with its 'relative_dir', mirroring the input tree.
+    
+    With more than one worker, files are dispatched to a process pool while
+    at most MAX_IN_FLIGHT_PER_WORKER tasks per worker are outstanding, and
+    each file's progress line and output are printed in input order as its
+    result comes back.
+    
+    When a ConversionManifest is given, inputs it reports as up to date are
+    skipped, and each successful conversion is recorded with the source's
+    size, mtime and content hash. The manifest is saved every
+    MANIFEST_SAVE_INTERVAL conversions and when the batch ends.
+    
+    Each file's ConversionResult is passed to on_result, in input order, so
+    callers can aggregate byte counts and timings across the batch.
+    
+    With an ArchiveWriter, each file's outputs are moved into the archive
+    (named by their path relative to output_dir) as soon as the file is
+    done, so output_dir only ever holds the files still being converted.
     
     Args:
-        file_path (str): Full path to the file
+        work_items (iterable): WorkItem objects or plain file paths
+        output_dir (str): Directory where converted files will be saved
+        workers (int): Number of worker processes (1 converts in-process)
+        quiet (bool): Only print progress and output for failed files
+        total (int): Number of items, if known, for "[i/total]" progress
+        manifest (ConversionManifest): Manifest for incremental runs
+        on_result (callable): Optional callback taking each ConversionResult
+        archive (ArchiveWriter): Optional archive receiving all outputs
+        **convert_options: Keyword arguments passed on to process_file
+            (extract_all, direction, cache, output_format, optimize, validate)
     
     Returns:
-        str: Formatted file size string (e.g., "1.25 MB", "500 bytes")
+        BatchSummary: Counts of successful, failed and skipped files, the
+        bytes saved by optimization and the reason each failed file failed
     """
+    direction = convert_options.get('direction', 'auto')
+    hash_source = manifest is not None
+    created_dirs = set()
+    counts = {'successful': 0, 'failed': 0, 'skipped': 0, 'recorded': 0, 'bytes_saved': 0}
+    failures = []
+
+    def prepare(item):
+        # Resolve the output directory for an item, creating it on first use
+        target_dir = os.path.join(output_dir, item.relative_dir) if item.relative_dir else output_dir
+        if target_dir not in created_dirs:
+            os.makedirs(target_dir, exist_ok=True)
+            created_dirs.add(target_dir)
+        return target_dir
+
+    def pending_items():
+        # Normalize inputs and drop the ones the manifest reports as unchanged
+        for item in work_items:
+            if isinstance(item, str):
+                item = make_work_item(item)
+            if manifest is not None and manifest.is_up_to_date(item):
+                counts['skipped'] += 1
+                continue
+            yield item
+
+    def progress_line(index, file_path):
+        counter = f"[{index}/{total}]" if total else f"[{index}]"
+        return f"{counter} {conversion_type_label(file_path, direction)}: {os.path.basename(file_path)}"
+
+    def report(index, file_path, success, output):
+        if quiet and success:
+            return
+        print(progress_line(index, file_path))
+        print(output, end="")
+        print()  # Add spacing between files
+
+    def complete(item, result, digest):
+        if on_result is not None:
+            on_result(result)
+        if not result:
+            counts['failed'] += 1
+            failures.append((item.path, result.error or "no output"))
+            return
+        counts['successful'] += 1
+        counts['bytes_saved'] += result.bytes_saved
+        if archive is not None:
+            for output_path in result.output_paths:
+                archive.add_file(output_path, os.path.relpath(output_path, output_dir), result)
+                os.remove(output_path)
+        if manifest is not None and digest is not None:
+            manifest.record(item, digest, result.output_paths)
+            counts['recorded'] += 1
+            if counts['recorded'] % MANIFEST_SAVE_INTERVAL == 0:
+                manifest.save()
+
     try:
-        size_bytes = os.path.getsize(file_path)
-        
-        # Convert bytes to human-readable format
-        for unit in ['bytes', 'KB', 'MB', 'GB', 'TB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.2f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.2f} PB"  # Fallback for extremely large files
-        
-    except Exception:
-        return "Unknown"
+        if workers <= 1:
+            for i, item in enumerate(pending_items(), 1):
+                target_dir = prepare(item)
+                if quiet:
+                    result, digest, output = _batch_worker(
+                        item.path, target_dir, convert_options, hash_source
+                    )
+                    report(i, item.path, bool(result), output)
+                else:
+                    print(progress_line(i, item.path))
+                    result = process_file(item.path, target_dir, hash_source=hash_source, **convert_options)
+                    digest = _source_digest(result) if hash_source else None
+                    print()  # Add spacing between files
+                complete(item, result, digest)
+        else:
+            _run_parallel(pending_items(), prepare, workers, convert_options,
+                          hash_source, report, complete)
+    finally:
+        if manifest is not None:
+            manifest.save()
 
+    return BatchSummary(counts['successful'], counts['failed'], counts['skipped'], counts['bytes_saved'],
+                        failures)
 
-# =============================================================================
-# CORE IMAGE PROCESSING FUNCTION
-# =============================================================================
 
-def process_image(image_path, output_dir):
+def create_process_pool(workers, initializer=None, mp_context=None):
     """
-    Convert a single image file to base64-encoded HTML format.
+    Create an executor that runs functions in worker processes.
     
-    This is the main processing function that handles the complete conversion workflow:
-    1. Reads the source image file
-    2. Encodes it as base64
-    3. Extracts metadata and dimensions
-    4. Generates a complete HTML document with embedded image
-    5. Saves the result as a .txt file
+    ProcessPoolExecutor only accepts an initializer and a multiprocessing
+    context from Python 3.7. On Python 3.6 a multiprocessing.Pool, which
+    supports both, stands in behind the same submit/shutdown interface.
     
     Args:
-        image_path (str): Full path to the source image file
-        output_dir (str): Directory where the output .txt file will be saved
+        workers (int): Number of worker processes
+        initializer (callable): Optional function run in each new worker
+        mp_context: multiprocessing context used to start the workers
+            (default: the platform's default start method)
     
-    Output File Contents:
-        • Complete HTML5 document
-        • Detailed conversion metadata in HTML comments
-        • Optimized <img> tag with proper attributes
-        • Base64-encoded image data
+    Returns:
+        Executor with submit(), shutdown() and context manager support
     """
-    # Extract filename components for processing
-    filename = os.path.basename(image_path)
-    base_name, ext = os.path.splitext(filename)
-    output_filename = f"{base_name}.txt"
-    output_path = os.path.join(output_dir, output_filename)
+    if sys.version_info >= (3, 7):
+        from concurrent.futures import ProcessPoolExecutor
+        return ProcessPoolExecutor(max_workers=workers, initializer=initializer, mp_context=mp_context)
+    return _PoolExecutor(workers, initializer, mp_context)
 
-    # Determine MIME type based on file extension
-    mime_type, _ = mimetypes.guess_type(filename)
-    if not mime_type:
-        mime_type = "image/png"  # Default to PNG if MIME type cannot be determined
 
-    # Read image file and encode as Base64
-    with open(image_path, "rb") as img_file:
-        img_bytes = img_file.read()
-        b64_string = base64.b64encode(img_bytes).decode('utf-8')
-
-    # Attempt to extract image dimensions from file header
-    img_width, img_height = try_read_dimensions_from_header(image_path, mime_type)
-
-    # Prepare metadata for output documentation
-    display_file_type = ext.lstrip(".").lower() if ext else "png"
-    alt_str = f"{base_name}.{display_file_type}"
-    image_file_size = file_size_str(image_path)
-    b64_file_size = f"{len(b64_string.encode('utf-8')):.2f} bytes"
-    b64_string_length = len(b64_string)
-
-    # Generate dimension information blocks (conditional on successful extraction)
-    dimensions_block = ""
-    img_size_info = ""
-    if img_width is not None and img_height is not None:
-        dimensions_block = f"""\n               Image file dimensions:
-                    Height: {img_height}
-                    Width: {img_width}"""
-        img_size_info = f'\n        width="{img_width}"\n        height="{img_height}"'
-
-    # Generate complete HTML document with embedded base64 image
-    output_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{filename}</title>
-</head>
-<body>
-
-    <!-- 
-    Source image file has been encoded/converted into a base64 format ready for HTML embedding, with the following conversion information:
-        INPUT (source) image file details:     
-            Image file name: {filename}
-            Image file type: {mime_type}
-            Image file size: {image_file_size}
-            Image file location: {image_path}{dimensions_block}
-        OUTPUT Encoded Base64 file:
-            Base64 file name: {output_filename}
-            Base64 file type: text/plain
-            Base64 file location: {output_path}
-            Base64 file size: {b64_file_size}
-            Base64 individual string length: {b64_string_length}
-    -->
-    
-    <img 
-        src="data:{mime_type};base64,{b64_string}" 
-        alt="{alt_str}" 
-        class="{mime_type}"
-        loading="lazy"
-        decoding="async"{img_size_info}
-    />
-
-</body>
-</html>
-"""
+class _PoolExecutor:
+    """
+    Executor interface over multiprocessing.Pool, for Python 3.6.
+    
+    Futures are marked as running when submitted, so cancel() never stops
+    a call that is still queued; shutdown() waits for every call instead.
+    """
 
-    # Write the generated HTML content to output file
-    with open(output_path, "w", encoding="utf-8") as out_file:
-        out_file.write(output_content)
+    def __init__(self, workers, initializer=None, mp_context=None):
+        import multiprocessing
+        context = mp_context or multiprocessing.get_context()
+        self._pool = context.Pool(workers, initializer)
+
+    def submit(self, function, *args):
+        from concurrent.futures import Future
+        future = Future()
+        future.set_running_or_notify_cancel()
+        self._pool.apply_async(function, args, callback=future.set_result,
+                               error_callback=future.set_exception)
+        return future
+
+    def shutdown(self, wait=True):
+        self._pool.close()
+        if wait:
+            self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+        return False
 
-    # Provide user feedback on successful conversion
-    print(f"Converted '{filename}' to Base64 and saved as '{output_path}'")
+
+def _run_parallel(items, prepare, workers, convert_options, hash_source, report, complete):
+    """
+    Dispatch work items to a process pool with bounded, in-order reporting.
+    
+    At most MAX_IN_FLIGHT_PER_WORKER tasks per worker are outstanding; the
+    oldest task is always reported first so output stays in input order.
+    """
+    # Imported here as multiprocessing is only needed for parallel runs
+    from concurrent.futures import ProcessPoolExecutor
+
+    max_in_flight = workers * MAX_IN_FLIGHT_PER_WORKER
+    in_flight = collections.deque()
+
+    def report_oldest():
+        index, item, future = in_flight.popleft()
+        try:
+            result, digest, output = future.result()
+        except Exception as e:
+            result, digest = _failed(ConversionResult(item.path), e), None
+            output = f"❌ Worker failed while converting '{os.path.basename(item.path)}': {e}\n"
+        report(index, item.path, bool(result), output)
+        complete(item, result, digest)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for i, item in enumerate(items, 1):
+            future = executor.submit(
+                _batch_worker, item.path, prepare(item), convert_options, hash_source
+            )
+            in_flight.append((i, item, future))
+            if len(in_flight) >= max_in_flight:
+                report_oldest()
+
+        while in_flight:
+            report_oldest()
 
 
 # =============================================================================
-# REVERSE CONVERSION FUNCTION (BASE64 → IMAGE)
+# WATCH MODE
 # =============================================================================
 
-def process_base64_file(text_file_path, output_dir):
+# Seconds between manifest saves while conversions complete in watch mode
+WATCH_SAVE_INTERVAL = 2.0
+
+
+def watch_inputs(roots, output_dir, manifest, workers=1, quiet=False, recursive=False,
+                 include=None, exclude=None, settle_time=None, poll_interval=None,
+                 use_inotify=True, should_stop=None,
+                 **convert_options):
     """
-    Convert a base64-encoded HTML/text file back to its original image format.
+    Convert files as they arrive in watched directories, until stopped.
     
-    This function handles the reverse conversion workflow:
-    1. Reads the text/HTML file containing base64 data
-    2. Extracts the base64 string and MIME type information
-    3. Decodes the base64 data back to binary image data
-    4. Determines the appropriate file extension
-    5. Saves the reconstructed image file
+    Files already in the directories are picked up first; after that new
+    and changed files are noticed through inotify where available (see
+    watch.py), or by polling the directories every poll_interval seconds.
+    A file is converted once its size and modification time have not
+    changed for settle_time seconds, so files still being copied in are
+    never converted half-written.
+    
+    Progress is kept in the ConversionManifest: every conversion is
+    recorded and the manifest is saved every WATCH_SAVE_INTERVAL seconds
+    and on exit, so after a restart only new or changed files are
+    converted. A failed file is retried only once it changes again.
+    Files that are deleted or moved away are forgotten, so a long-running
+    watch over a busy drop folder does not keep state for every file it
+    has ever seen. With an EncodeCache, the cache is trimmed to its size
+    cap whenever a burst of conversions has finished.
+    
+    With more than one worker, files go to a long-lived process pool, so
+    a large file does not hold up the ones arriving after it; at most
+    MAX_IN_FLIGHT_PER_WORKER files per worker are queued there, and results
+    are reported as they complete. When stopped, conversions already
+    running are finished and the rest are left for the next start.
     
     Args:
-        text_file_path (str): Full path to the source text/HTML file
-        output_dir (str): Directory where the output image file will be saved
+        roots (list): Directories to watch
+        output_dir (str): Directory where converted files will be saved;
+            must not be one of the watched directories
+        manifest (ConversionManifest): Manifest recording converted files
+        workers (int): Number of worker processes (1 converts in-process)
+        quiet (bool): Only print progress and output for failed files
+        recursive (bool): Also watch sub-directories, mirroring them in the output
+        include (list): Only convert files matching one of these patterns
+        exclude (list): Skip files and directories matching these patterns
+        settle_time (float): Seconds a file must stay unchanged
+            (default: watch.DEFAULT_SETTLE_TIME)
+        poll_interval (float): Seconds between polls without inotify
+            (default: watch.DEFAULT_POLL_INTERVAL)
+        use_inotify (bool): Use inotify where available
+        should_stop (callable): Optional function returning True to stop;
+            otherwise the watch runs until interrupted (Ctrl+C)
+        **convert_options: Keyword arguments passed on to process_file
     
     Returns:
-        bool: True if conversion successful, False otherwise
+        BatchSummary: Counts and failures of the conversions while watching
+    
+    Raises:
+        ValueError: If output_dir is one of the watched directories
     """
+    # Imported here so that runs without --watch do not load the watchers
     try:
-        # Read the content of the text file
-        with open(text_file_path, "r", encoding="utf-8") as file:
-            content = file.read()
-        
-        # Extract base64 data using regex pattern matching
-        # Pattern to match data URI with base64 content
-        pattern = r'data:([^;]+);base64,([A-Za-z0-9+/=]+)'
-        match = re.search(pattern, content)
-        
-        if not match:
-            print(f"❌ No valid base64 data found in '{os.path.basename(text_file_path)}'")
-            return False
-        
-        # Extract MIME type and base64 string
-        mime_type = match.group(1)
-        b64_string = match.group(2)
-        
-        # Determine file extension from MIME type
-        extension_map = {
-            'image/png': '.png',
-            'image/jpeg': '.jpg',
-            'image/jpg': '.jpg',
-            'image/gif': '.gif',
-            'image/bmp': '.bmp'
-        }
-        
-        file_extension = extension_map.get(mime_type, '.png')  # Default to PNG
-        
-        # Generate output filename
-        base_name = os.path.splitext(os.path.basename(text_file_path))[0]
-        output_filename = f"{base_name}{file_extension}"
-        output_path = os.path.join(output_dir, output_filename)
-        
-        # Decode base64 data to binary
-        try:
-            img_bytes = base64.b64decode(b64_string)
-        except Exception as e:
-            print(f"❌ Failed to decode base64 data in '{os.path.basename(text_file_path)}': {e}")
+        from .watch import DEFAULT_POLL_INTERVAL, DEFAULT_SETTLE_TIME, SettleTracker, open_watcher
+    except ImportError:
+        from watch import DEFAULT_POLL_INTERVAL, DEFAULT_SETTLE_TIME, SettleTracker, open_watcher
+    if settle_time is None:
+        settle_time = DEFAULT_SETTLE_TIME
+    if poll_interval is None:
+        poll_interval = DEFAULT_POLL_INTERVAL
+    clock = time.monotonic
+    direction = convert_options.get('direction', 'auto')
+    extensions = convertible_extensions(direction)
+    include = include or []
+    exclude = exclude or []
+    output_root = os.path.realpath(output_dir)
+    if any(os.path.realpath(root) == output_root for root in roots):
+        raise ValueError(f"the output directory '{output_dir}' cannot be a watched directory")
+
+    def include_dir(root, relative_dir):
+        # Never watch the output directory, or outputs would be converted back
+        if exclude and _matches_any(relative_dir.replace(os.sep, '/'), exclude):
             return False
-        
-        # Write binary data to image file
-        with open(output_path, "wb") as img_file:
-            img_file.write(img_bytes)
-        
-        # Calculate file sizes for reporting
-        original_size = file_size_str(text_file_path)
-        new_size = file_size_str(output_path)
-        
-        # Provide user feedback
-        print(f"✓ Decoded '{os.path.basename(text_file_path)}' → '{output_filename}' ({mime_type}, {new_size})")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error processing '{os.path.basename(text_file_path)}': {e}")
-        return False
-
+        return os.path.realpath(os.path.join(root, relative_dir)) != output_root
+
+    counts = {'successful': 0, 'failed': 0, 'skipped': 0, 'bytes_saved': 0, 'started': 0}
+    failures = []
+    # directory -> {path: (size, mtime_ns)} of the versions last converted or skipped
+    known = collections.defaultdict(dict)
+    cache = convert_options.get('cache')
+    trim_pending = False  # conversions finished since the cache was last trimmed
+    busy = set()  # paths queued or being converted
+    ready = collections.deque()  # settled files waiting for a free worker
+    in_flight = []  # (index, item, future), oldest first
+    tracker = SettleTracker(settle_time)
+    created_dirs = set()
+    next_save = clock() + WATCH_SAVE_INTERVAL
+
+    def target_dir(item):
+        directory = os.path.join(output_dir, item.relative_dir) if item.relative_dir else output_dir
+        if directory not in created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            created_dirs.add(directory)
+        return directory
+
+    def report(index, item, result, output):
+        if quiet and result:
+            return
+        print(f"[{index}] {conversion_type_label(item.path, direction)}: {os.path.basename(item.path)}")
+        print(output, end="")
+        print()  # Add spacing between files
 
-# =============================================================================
-# UNIFIED FILE PROCESSING FUNCTION
-# =============================================================================
+    def complete(item, result, digest):
+        busy.discard(item.path)
+        if not result:
+            counts['failed'] += 1
+            failures.append((item.path, result.error or "no output"))
+            return
+        counts['successful'] += 1
+        counts['bytes_saved'] += result.bytes_saved
+        if digest is not None:
+            manifest.record(item, digest, result.output_paths)
+
+    def forget_removed(change, seen):
+        # Drop files that are gone from the directory rescanned or the file reported
+        root, relative_path, is_dir = change
+        path = os.path.join(root, relative_path) if relative_path else root
+        directory = os.path.normpath(path if is_dir else os.path.dirname(path))
+        entries = known.get(directory)
+        if not entries:
+            return
+        for gone in [p for p in entries if p not in seen and (is_dir or p == path)]:
+            del entries[gone]
+        if not entries:
+            del known[directory]
+
+    def collect(block=False):
+        # Report finished conversions, in completion order
+        for entry in list(in_flight):
+            index, item, future = entry
+            if not (block or future.done()):
+                continue
+            in_flight.remove(entry)
+            if future.cancelled():
+                continue  # Stopped before it started; converted on the next start
+            try:
+                result, digest, output = future.result()
+            except Exception as e:
+                result, digest = _failed(ConversionResult(item.path), e), None
+                output = f"❌ Worker failed while converting '{os.path.basename(item.path)}': {e}\n"
+            report(index, item, result, output)
+            complete(item, result, digest)
+
+    watcher = open_watcher(roots, recursive, include_dir, poll_interval, use_inotify)
+    executor = None
+    max_in_flight = workers * MAX_IN_FLIGHT_PER_WORKER
+    if workers > 1:
+        executor = create_process_pool(workers, initializer=_ignore_interrupts)
 
-def process_file(file_path, output_dir):
+    try:
+        while should_stop is None or not should_stop():
+            timeout = poll_interval
+            deadline = tracker.next_deadline()
+            if deadline is not None:
+                timeout = min(timeout, deadline)
+            for change in watcher.wait(timeout):
+                seen = set()
+                for item in _changed_inputs(change, extensions, include, exclude):
+                    seen.add(item.path)
+                    entries = known.get(os.path.normpath(os.path.dirname(item.path)), {})
+                    if entries.get(item.path) != (item.size, item.mtime_ns):
+                        tracker.observe(item)
+                forget_removed(change, seen)
+
+            for item in tracker.pop_ready():
+                if item.path in busy:
+                    tracker.observe(item)  # Changed while converting: convert again afterwards
+                    continue
+                known[os.path.normpath(os.path.dirname(item.path))][item.path] = (item.size, item.mtime_ns)
+                if manifest.is_up_to_date(item):
+                    counts['skipped'] += 1
+                    continue
+                busy.add(item.path)
+                ready.append(item)
+
+            collect()
+            while ready and (executor is None or len(in_flight) < max_in_flight):
+                item = ready.popleft()
+                counts['started'] += 1
+                if executor is None:
+                    result, digest, output = _batch_worker(item.path, target_dir(item), convert_options, True)
+                    report(counts['started'], item, result, output)
+                    complete(item, result, digest)
+                    if should_stop is not None and should_stop():
+                        break
+                else:
+                    future = executor.submit(_batch_worker, item.path, target_dir(item), convert_options, True)
+                    in_flight.append((counts['started'], item, future))
+                trim_pending = True
+
+            if cache is not None and trim_pending and not (ready or in_flight or len(tracker)):
+                # A burst of arrivals has been converted: keep the cache within its cap
+                cache.trim()
+                trim_pending = False
+
+            if clock() >= next_save:
+                manifest.save()
+                next_save = clock() + WATCH_SAVE_INTERVAL
+    except KeyboardInterrupt:
+        print("\n⏹️  Stopping watch mode; finishing conversions in progress...")
+    finally:
+        watcher.close()
+        if executor is not None:
+            try:
+                for _, _, future in in_flight:
+                    future.cancel()  # Only succeeds for conversions not yet started
+                collect(block=True)
+            finally:
+                executor.shutdown()
+        manifest.save()
+
+    return BatchSummary(counts['successful'], counts['failed'], counts['skipped'], counts['bytes_saved'],
+                        failures)
+
+
+def _ignore_interrupts():
+    """Let watch-mode workers finish their file when Ctrl+C stops the watch."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _changed_inputs(change, extensions, include, exclude):
     """
-    Intelligently process a file based on its type - either convert image to base64 
-    or convert base64 back to image.
+    List the convertible files behind a watcher Change.
     
-    Args:
-        file_path (str): Full path to the source file
-        output_dir (str): Directory where the output file will be saved
+    A directory is rescanned (without descending); a single file is
+    stat'ed. Patterns are matched as in iter_input_files.
     
-    Returns:
-        bool: True if conversion successful, False otherwise
+    Yields:
+        WorkItem: Convertible files with their current size and mtime
     """
-    filename = os.path.basename(file_path)
-    file_ext = os.path.splitext(filename)[1].lower()
+    root, relative_path, is_dir = change
+    if not is_dir:
+        if not _is_convertible(relative_path.replace(os.sep, '/'), extensions, include, exclude):
+            return
+        item = make_work_item(os.path.join(root, relative_path), os.path.dirname(relative_path))
+        if item.size is not None:
+            yield item
+        return
+
+    directory = os.path.join(root, relative_path) if relative_path else root
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                matched_path = os.path.join(relative_path, entry.name) if relative_path else entry.name
+                if not _is_convertible(matched_path.replace(os.sep, '/'), extensions, include, exclude):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat_result = entry.stat()
+                except OSError:
+                    continue
+                yield WorkItem(entry.path, relative_path, stat_result.st_size, stat_result.st_mtime_ns)
+    except OSError:
+        pass  # Removed since the change was reported
+
+
+def run_watch(args, echo=print):
+    """
+    Run watch mode from parsed command-line arguments.
     
-    if file_ext in image_extensions:
-        # Convert image to base64 HTML
-        try:
-            process_image(file_path, output_dir)
-            return True
-        except Exception as e:
-            print(f"❌ Failed to convert image '{filename}': {e}")
-            return False
+    Watches the input directories given on the command line (default: the
+    Inputs folder) and writes to --output (default: the Outputs folder).
+    SIGTERM stops the watch like Ctrl+C, after the conversions in progress.
     
-    elif file_ext in text_extensions:
-        # Convert base64 HTML back to image
-        return process_base64_file(file_path, output_dir)
+    Args:
+        args (argparse.Namespace): Options from parse_arguments
+        echo (callable): Function printing non-essential messages
     
-    else:
-        print(f"⚠️  Unsupported file type: '{filename}' (skipping)")
-        return False
+    Returns:
+        int: Process exit status (0 if every conversion succeeded)
+    """
+    roots = args.inputs or [default_input_dir]
+    for root in roots:
+        if not os.path.isdir(root):
+            print(f"❌ Watch mode needs directories to watch; '{root}' is not a directory.")
+            return 1
+    output_dir = args.output or default_output_dir
+    os.makedirs(output_dir, exist_ok=True)
+
+    manifest = ConversionManifest.load(
+        args.manifest or os.path.join(output_dir, MANIFEST_FILENAME),
+        options=_manifest_options(args),
+    )
+    cache = EncodeCache(args.cache, args.cache_size) if args.cache else None
+
+    echo("WATCH MODE: Converting files as they arrive (press Ctrl+C to stop).")
+    for root in roots:
+        echo(f"  • Watching: {root}")
+    echo(f"Output directory: {output_dir}")
+    echo("-" * 70)
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    previous_handler = signal.signal(signal.SIGTERM, stop)
+    try:
+        summary = watch_inputs(
+            roots,
+            output_dir,
+            manifest,
+            workers=args.workers,
+            quiet=args.quiet,
+            recursive=args.recursive,
+            include=args.include,
+            exclude=args.exclude,
+            settle_time=args.settle,
+            poll_interval=args.poll_interval,
+            use_inotify=not args.no_inotify,
+            extract_all=args.all_images,
+            direction=args.direction,
+            cache=cache,
+            output_format=args.format,
+            optimize=args.optimize,
+            validate=args.validate,
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
+
+    if cache is not None:
+        cache.trim()
+
+    echo("-" * 70)
+    echo("WATCH SUMMARY:")
+    echo(f"✓ Successfully converted: {summary.successful} file(s)")
+    if summary.skipped > 0:
+        echo(f"⏭️  Already converted earlier (skipped): {summary.skipped} file(s)")
+    _print_failures(summary)
+    return 0 if summary.failed == 0 else 1
 
 
 # =============================================================================
 # USER INTERFACE FUNCTIONS
 # =============================================================================
 
+def _open_dialog_root():
+    """
+    Create the hidden tkinter root window used by the file dialogs.
+    
+    tkinter is imported here rather than at module load so that headless
+    runs (cron jobs, containers, servers) neither need it nor pay for it.
+    
+    Returns:
+        tkinter.Tk: Withdrawn root window, or None if no GUI is available
+    """
+    try:
+        import tkinter as tk
+    except ImportError:
+        print("⚠️  tkinter is not available; file dialogs are disabled.")
+        return None
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"⚠️  Unable to open a file dialog: {e}")
+        return None
+
+    root.withdraw()  # Hide the main tkinter window
+    return root
+
+
 def select_input_file(initial_dir):
     """
     Open a file dialog for user to select an input file (image or text with base64).
@@ -516,15 +2759,18 @@ def select_input_file(initial_dir):
     Returns:
         str: Full path to selected file, or empty string if cancelled
     """
-    root = tk.Tk()
-    root.withdraw()  # Hide the main tkinter window
-    
+    root = _open_dialog_root()
+    if root is None:
+        return ""
+
+    from tkinter import filedialog
+
     file_path = filedialog.askopenfilename(
         title="Select a file for conversion (Image → Base64 or Base64 → Image)",
         initialdir=initial_dir,
         filetypes=[
-            ("All supported files", "*.png *.jpg *.jpeg *.gif *.bmp *.txt *.html *.htm"),
-            ("Image files", "*.png *.jpg *.jpeg *.gif *.bmp"), 
+            ("All supported files", "*.png *.jpg *.jpeg *.gif *.bmp *.webp *.tif *.tiff *.ico *.svg *.txt *.html *.htm"),
+            ("Image files", "*.png *.jpg *.jpeg *.gif *.bmp *.webp *.tif *.tiff *.ico *.svg"), 
             ("Text files", "*.txt *.html *.htm"),
             ("All files", "*.*")
         ]
@@ -547,9 +2793,12 @@ def select_output_directory(initial_dir):
     Returns:
         str: Full path to selected directory, or empty string if cancelled
     """
-    root = tk.Tk()
-    root.withdraw()  # Hide the main tkinter window
-    
+    root = _open_dialog_root()
+    if root is None:
+        return ""
+
+    from tkinter import filedialog
+
     folder_selected = filedialog.askdirectory(
         title="Select Output Folder for Base64 .txt Files",
         initialdir=initial_dir
@@ -563,145 +2812,432 @@ def select_output_directory(initial_dir):
 # MAIN EXECUTION LOGIC
 # =============================================================================
 
-def main():
+def parse_arguments(argv=None):
+    """
+    Parse command-line options for the converter.
+    
+    Args:
+        argv (list): Argument list to parse (defaults to sys.argv[1:])
+    
+    Returns:
+        argparse.Namespace: Parsed options
+    """
+    parser = argparse.ArgumentParser(
+        prog="base64-converter",
+        description="Bidirectional converter between image files and Base64 HTML. "
+                    "With no inputs, files in the Inputs folder are converted, or a "
+                    "file dialog is shown if it is empty.",
+        epilog="Pipe mode: 'base64-converter encode [INPUT] [OUTPUT]' and "
+               "'base64-converter decode [INPUT] [OUTPUT]' convert a single "
+               "stream; '-' means stdin/stdout. Run them with --help for options.",
+    )
+    parser.add_argument(
+        "inputs", nargs="*", metavar="INPUT",
+        help="files, directories, zip/tar archives or glob patterns to "
+             "convert; giving any input runs headless without file dialogs",
+    )
+    parser.add_argument(
+        "-o", "--output", metavar="DIR",
+        help="output directory (default: the Outputs folder)",
+    )
+    parser.add_argument(
+        "--archive", metavar="FILE",
+        help="write all outputs into this single .zip or .tar[.gz|.bz2|.xz] "
+             f"archive, with an {INDEX_MEMBER} member listing them, instead of "
+             "an output directory",
+    )
+    parser.add_argument(
+        "-d", "--direction", choices=CONVERSION_DIRECTIONS, default="auto",
+        help="'encode' images to Base64, 'decode' Base64 files to images, or "
+             "'auto' to choose by file extension (default: auto)",
+    )
+    parser.add_argument(
+        "-r", "--recursive", action="store_true",
+        help="descend into sub-directories and mirror their structure in the output",
+    )
+    parser.add_argument(
+        "--include", action="append", default=[], metavar="PATTERN",
+        help="only convert discovered files matching this glob pattern "
+             "(name or relative path; repeatable)",
+    )
+    parser.add_argument(
+        "--exclude", action="append", default=[], metavar="PATTERN",
+        help="skip discovered files and directories matching this glob "
+             "pattern (repeatable)",
+    )
+    parser.add_argument(
+        "-f", "--format", choices=sorted(OUTPUT_FORMATS), default=DEFAULT_OUTPUT_FORMAT,
+        help="output format for encoded images: a full 'html' document, 'raw' "
+             "Base64, a bare 'datauri', a 'css' rule or a 'json' record "
+             f"(default: {DEFAULT_OUTPUT_FORMAT})",
+    )
+    parser.add_argument(
+        "--optimize", action="store_true",
+        help="losslessly shrink PNG, JPEG and GIF images before encoding "
+             "(strip metadata, re-compress PNG data); pixels are never changed",
+    )
+    parser.add_argument(
+        "-a", "--all-images", action="store_true",
+        help="extract every embedded image from text files, not just the first",
+    )
+    parser.add_argument(
+        "--no-validate", dest="validate", action="store_false",
+        help="decode without strict Base64 checks and without verifying PNG "
+             "CRCs and JPEG/GIF end markers",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=1, metavar="N",
+        help="number of worker processes for batch conversion "
+             "(default: 1, 0 = one per CPU core)",
+    )
+    parser.add_argument(
+        "-i", "--incremental", action="store_true",
+        help="skip inputs unchanged since the last run, using a manifest "
+             f"stored in the output directory ({MANIFEST_FILENAME})",
+    )
+    parser.add_argument(
+        "--manifest", metavar="FILE",
+        help="manifest file for incremental runs (implies --incremental)",
+    )
+    parser.add_argument(
+        "--prune", action="store_true",
+        help="with --incremental, delete outputs whose source files no longer exist",
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="keep running and convert new or changed files in the input "
+             "directories as they arrive (implies --incremental)",
+    )
+    # The defaults live in watch.py, which only watch mode imports
+    parser.add_argument(
+        "--settle", type=float, metavar="SECONDS",
+        help="with --watch, wait until a file has been unchanged this long "
+             "before converting it (default: 0.5)",
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, metavar="SECONDS",
+        help="with --watch, seconds between directory checks when inotify "
+             "is not used (default: 0.25)",
+    )
+    parser.add_argument(
+        "--no-inotify", action="store_true",
+        help="with --watch, poll the directories even where inotify is available",
+    )
+    parser.add_argument(
+        "--cache", metavar="DIR",
+        help="reuse Base64 encodings of identical images from this cache directory",
+    )
+    parser.add_argument(
+        "--cache-size", type=parse_size, default=DEFAULT_CACHE_SIZE, metavar="SIZE",
+        help="size cap for --cache, e.g. 500M or 2G; least recently used "
+             "entries are evicted after each run (default: 1G)",
+    )
+    parser.add_argument(
+        "--profile", metavar="REPORT",
+        help="write a JSON profiling report (stage latency percentiles, "
+             "throughput, slowest files, peak memory) to this file, or '-' for "
+             "stdout (best combined with --quiet)",
+    )
+    parser.add_argument(
+        "--profile-stats", metavar="FILE",
+        help="also run under cProfile and dump pstats data to this file "
+             "(profiles the main process only)",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true",
+        help="only report failed conversions",
+    )
+    parser.add_argument(
+        "--no-dialogs", action="store_true",
+        help="never open file dialogs, even when no inputs are given",
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 0:
+        parser.error("--workers must be 0 or a positive integer")
+    if args.workers == 0:
+        args.workers = os.cpu_count() or 1
+    if args.manifest or args.watch:
+        args.incremental = True
+    if args.watch:
+        for option, given in (("--archive", args.archive), ("--prune", args.prune),
+                              ("--profile", args.profile), ("--profile-stats", args.profile_stats)):
+            if given:
+                parser.error(f"--watch cannot be combined with {option}")
+        if (args.settle is not None and args.settle < 0
+                or args.poll_interval is not None and args.poll_interval <= 0):
+            parser.error("--settle must not be negative and --poll-interval must be positive")
+    if args.prune and not args.incremental:
+        parser.error("--prune requires --incremental or --manifest")
+    if args.archive:
+        if archive_kind(args.archive) is None:
+            parser.error("--archive must end in .zip, .tar, .tar.gz, .tgz, .tar.bz2 or .tar.xz")
+        if args.output:
+            parser.error("--archive cannot be combined with --output")
+        if args.incremental:
+            parser.error("--archive cannot be combined with --incremental")
+    return args
+
+
+def main(argv=None):
     """
     Main execution function that orchestrates the bidirectional conversion workflow.
     
     This function implements the complete conversion process:
-    1. Scans default input directory for files (batch mode)
-    2. Falls back to file dialog if no files found (interactive mode)  
-    3. Prompts user for output directory selection
-    4. Intelligently processes all selected files based on their type
-    5. Provides detailed user feedback throughout the process
+    1. Uses files given on the command line (headless mode), or
+    2. Scans default input directory for files (batch mode), discovering
+       them lazily so conversion starts before the scan has finished
+    3. Falls back to file dialog if no files found (interactive mode)  
+    4. Prompts user for output directory selection unless one was given
+    5. Intelligently processes all selected files based on their type
+    6. Provides detailed user feedback throughout the process
     
     Processing Modes:
+        • Headless Mode: Converts the inputs given on the command line
         • Batch Mode: Automatically processes all files in 'Inputs' folder
         • Interactive Mode: User selects individual file via file dialog
+        • Pipe Mode: 'encode' / 'decode' convert one stream (see run_pipe)
+        • Watch Mode: --watch converts files as they arrive (see watch_inputs)
     
     Conversion Types:
         • Image files → Base64 HTML text files
         • Text files with Base64 → Original image files
+    
+    Args:
+        argv (list): Command-line arguments (defaults to sys.argv[1:])
+    
+    Returns:
+        int: Process exit status (0 if every conversion succeeded)
     """
-    print("=" * 80)
-    print("          BIDIRECTIONAL BASE64 IMAGE CONVERTER UTILITY")
-    print("=" * 80)
-    print("Converting files between image and base64-encoded HTML formats...")
-    print()
-
-    # Step 1: Search for convertible files in the default input directory
-    if os.path.isdir(default_input_dir):
-        all_files = os.listdir(default_input_dir)
-        
-        # Find image files for encoding
-        found_images = [
-            os.path.join(default_input_dir, f)
-            for f in all_files
-            if f.lower().endswith(image_extensions)
-        ]
-        
-        # Find text files for potential decoding
-        found_text_files = [
-            os.path.join(default_input_dir, f)
-            for f in all_files
-            if f.lower().endswith(text_extensions)
-        ]
-        
-        # Combine all convertible files
-        found_files = found_images + found_text_files
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in PIPE_COMMANDS:
+        return run_pipe(argv[0], argv[1:])
+
+    args = parse_arguments(argv)
+    headless = bool(args.inputs) or args.no_dialogs
+
+    def echo(*values, **kwargs):
+        if not args.quiet:
+            print(*values, **kwargs)
+
+    echo("=" * 80)
+    echo("          BIDIRECTIONAL BASE64 IMAGE CONVERTER UTILITY")
+    echo("=" * 80)
+    echo("Converting files between image and base64-encoded HTML formats...")
+    echo()
+
+    if args.watch:
+        return run_watch(args, echo)
+
+    # Step 1: Collect the files to convert (discovered lazily as they are converted)
+    discovery_options = dict(
+        direction=args.direction,
+        recursive=args.recursive,
+        include=args.include,
+        exclude=args.exclude,
+    )
+    if args.inputs:
+        # Headless Mode: Process the inputs given on the command line
+        work_items = expand_input_paths(args.inputs, **discovery_options)
+        first_item = next(work_items, None)
+        if first_item is None:
+            print("❌ No convertible files matched the given inputs.")
+            return 1
+        echo("HEADLESS MODE: Converting the files selected on the command line.")
+        echo()
     else:
-        found_files = []
-
-    # Determine processing mode based on found files
-    if found_files:
-        # Batch Mode: Process all files found in input directory
-        selected_files = found_files
-        print(f"BATCH MODE: Found {len(selected_files)} convertible file(s) in the input folder:")
-        
-        # Categorize and display found files
-        image_count = len(found_images)
-        text_count = len(found_text_files)
-        
-        if image_count > 0:
-            print(f"  • {image_count} image file(s) → will convert to Base64 HTML")
-        if text_count > 0:
-            print(f"  • {text_count} text file(s) → will attempt Base64 → Image conversion")
+        # Search for convertible files in the default input directory
+        if os.path.isdir(default_input_dir):
+            work_items = expand_input_paths([default_input_dir], **discovery_options)
+        else:
+            work_items = iter(())
+        first_item = next(work_items, None)
+
+        if first_item is not None:
+            # Batch Mode: Process all files found in input directory
+            echo("BATCH MODE: Found convertible files in the input folder.")
+            echo("  • Image files → will convert to Base64 HTML")
+            echo("  • Text files → will attempt Base64 → Image conversion")
+            echo("Proceeding with automatic batch conversion...")
+            echo()
+        elif headless:
+            print("❌ No convertible files found in the input folder and file dialogs are disabled.")
+            return 1
+        else:
+            # Interactive Mode: Prompt user to select individual file
+            echo("INTERACTIVE MODE: No convertible files found in the input folder.")
+            echo("Please select a file using the file picker dialog.")
+            echo("(Supports: Images → Base64 HTML, or Text files with Base64 → Images)")
+            echo()
             
-        print("Proceeding with automatic batch conversion...")
-        print()
+            selected_file = select_input_file(default_input_dir)
+            if selected_file:
+                first_item = make_work_item(selected_file)
+                echo(f"Selected: {os.path.basename(selected_file)}")
+                echo()
+            else:
+                print("No source file selected. Exiting program.")
+                return 1
+
+    work_items = itertools.chain([first_item], work_items)
+
+    # Step 2: Get output directory (archive, command line, dialog, or default)
+    archive = None
+    if args.archive:
+        # Outputs are staged next to the archive and moved into it file by file
+        archive = ArchiveWriter(args.archive)
+        output_dir = tempfile.mkdtemp(
+            prefix='.staging_', dir=os.path.dirname(os.path.abspath(args.archive))
+        )
+        echo(f"Output archive: {args.archive}")
+    elif args.output:
+        output_dir = args.output
+        echo(f"Output directory: {output_dir}")
+    elif headless:
+        output_dir = default_output_dir
+        echo(f"Output directory: {output_dir} (default)")
     else:
-        # Interactive Mode: Prompt user to select individual file
-        print("INTERACTIVE MODE: No convertible files found in the input folder.")
-        print("Please select a file using the file picker dialog.")
-        print("(Supports: Images → Base64 HTML, or Text files with Base64 → Images)")
-        print()
+        echo("Please select the output folder where converted files will be saved.")
+        output_dir = select_output_directory(default_output_dir)
         
-        selected_file = select_input_file(default_input_dir)
-        if selected_file:
-            selected_files = [selected_file]
-            print(f"Selected: {os.path.basename(selected_file)}")
-            print()
+        if not output_dir:
+            output_dir = default_output_dir
+            echo(f"No output folder selected. Using default: {default_output_dir}")
         else:
-            print("No source file selected. Exiting program.")
-            return
-
-    # Step 2: Get output directory from user (with fallback to default)
-    print("Please select the output folder where converted files will be saved.")
-    output_dir = select_output_directory(default_output_dir)
+            echo(f"Output directory: {output_dir}")
     
-    if not output_dir:
-        output_dir = default_output_dir
-        print(f"No output folder selected. Using default: {default_output_dir}")
-    else:
-        print(f"Output directory: {output_dir}")
-    
-    print()
+    echo()
 
     # Ensure output directory exists
     os.makedirs(output_dir, exist_ok=True)
 
     # Step 3: Process all selected files with intelligent conversion
-    print("Processing files...")
-    print("-" * 70)
-    
-    successful_conversions = 0
-    failed_conversions = 0
+    echo("Processing files...")
+    echo("-" * 70)
     
-    for i, file_path in enumerate(selected_files, 1):
-        filename = os.path.basename(file_path)
-        file_ext = os.path.splitext(filename)[1].lower()
-        
-        # Determine conversion direction
-        if file_ext in image_extensions:
-            conversion_type = "Image → Base64 HTML"
-        elif file_ext in text_extensions:
-            conversion_type = "Base64 HTML → Image"
-        else:
-            conversion_type = "Unknown"
-        
-        print(f"[{i}/{len(selected_files)}] {conversion_type}: {filename}")
-        
-        # Process the file
-        success = process_file(file_path, output_dir)
-        if success:
-            successful_conversions += 1
-        else:
-            failed_conversions += 1
-        
-        print()  # Add spacing between files
+    manifest = None
+    if args.incremental:
+        manifest = ConversionManifest.load(
+            args.manifest or os.path.join(output_dir, MANIFEST_FILENAME),
+            options=_manifest_options(args),
+        )
+
+    cache = EncodeCache(args.cache, args.cache_size) if args.cache else None
+
+    profiler = None
+    if args.profile or args.profile_stats:
+        # tracemalloc and cProfile are only loaded when profiling
+        try:
+            from .profiling import BatchProfiler, cprofile_to
+        except ImportError:
+            from profiling import BatchProfiler, cprofile_to
+    if args.profile:
+        profiler = BatchProfiler()
+        profiler.start()
+
+    with contextlib.ExitStack() as stack:
+        if archive is not None:
+            # Unwound in reverse: finish (or discard) the archive, then the staging area
+            stack.callback(shutil.rmtree, output_dir, ignore_errors=True)
+            stack.enter_context(archive)
+        if args.profile_stats:
+            stack.enter_context(cprofile_to(args.profile_stats))
+        summary = run_batch(
+            work_items,
+            output_dir,
+            workers=args.workers,
+            quiet=args.quiet,
+            manifest=manifest,
+            on_result=profiler.add if profiler is not None else None,
+            archive=archive,
+            extract_all=args.all_images,
+            direction=args.direction,
+            cache=cache,
+            output_format=args.format,
+            optimize=args.optimize,
+            validate=args.validate,
+        )
+
+    if profiler is not None:
+        profiler.stop()
+        profiler.write(
+            args.profile,
+            workers=args.workers,
+            direction=args.direction,
+            output_format=args.format,
+            cache=bool(cache),
+            optimize=args.optimize,
+            validate=args.validate,
+        )
+
+    if cache is not None:
+        cache.trim()
+
+    pruned_outputs = []
+    if args.prune:
+        pruned_outputs = manifest.prune()
+        manifest.save()
     
     # Final summary
-    print("-" * 70)
-    print("CONVERSION SUMMARY:")
-    print(f"✓ Successfully converted: {successful_conversions} file(s)")
-    if failed_conversions > 0:
-        print(f"❌ Failed conversions: {failed_conversions} file(s)")
-    print(f"📁 Output location: {output_dir}")
-    print()
-    
-    if successful_conversions > 0:
-        print("🎉 Conversion process completed successfully!")
+    echo("-" * 70)
+    echo("CONVERSION SUMMARY:")
+    echo(f"✓ Successfully converted: {summary.successful} file(s)")
+    if summary.skipped > 0:
+        echo(f"⏭️  Unchanged since last run (skipped): {summary.skipped} file(s)")
+    if summary.bytes_saved > 0:
+        echo(f"🗜️  Optimization saved: {format_size(summary.bytes_saved)} before encoding")
+    if pruned_outputs:
+        echo(f"🧹 Removed outputs of deleted sources: {len(pruned_outputs)} file(s)")
+    _print_failures(summary)
+    if archive is not None:
+        echo(f"📦 Output archive: {args.archive} ({archive.member_count} file(s) + {INDEX_MEMBER})")
     else:
-        print("⚠️  No files were successfully converted.")
+        echo(f"📁 Output location: {output_dir}")
+    if args.profile and args.profile != '-':
+        echo(f"📊 Profile report: {args.profile}")
+    if args.profile_stats:
+        echo(f"📊 cProfile stats: {args.profile_stats}")
+    echo()
+    
+    if summary.successful > 0:
+        echo("🎉 Conversion process completed successfully!")
+    elif summary.skipped > 0 and summary.failed == 0:
+        echo("✅ All files are already up to date.")
+    else:
+        echo("⚠️  No files were successfully converted.")
+
+    return 0 if summary.failed == 0 else 1
+
+
+def _manifest_options(args):
+    """
+    Options stored in the manifest; a change makes every input convert again.
+    
+    Every option that changes which outputs are written or what they
+    contain is included. Options left at their defaults are omitted, so
+    manifests written before an option existed stay valid.
+    """
+    options = {'output_format': args.format}
+    if args.direction != 'auto':
+        options['direction'] = args.direction
+    if args.all_images:
+        options['extract_all'] = True
+    if args.optimize:
+        options['optimize'] = True
+    if not args.validate:
+        options['validate'] = False
+    return options
+
+
+def _print_failures(summary):
+    """Print the failed-conversion count and each failed file with its reason."""
+    if summary.failed == 0:
+        return
+    print(f"❌ Failed conversions: {summary.failed} file(s)")
+    for failed_path, reason in summary.failures[:MAX_LISTED_FAILURES]:
+        print(f"   • {failed_path}: {reason}")
+    if summary.failed > MAX_LISTED_FAILURES:
+        print(f"   … and {summary.failed - MAX_LISTED_FAILURES} more")
 
 
 # =============================================================================
@@ -710,4 +3246,4 @@ def main():
 
 if __name__ == "__main__":
     # Execute main function when script is run directly
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+=====================================================================================
+                    DOWNLOAD STORE FOR THE WEB INTERFACE
+=====================================================================================
+
+Base64 Image Converter - Convert images to Base64 and vice versa
+Copyright (C) 2025 Kyle J. Coder
+Advanced Analytics & Informatics, Edward Hines Jr. VA Hospital (v12/578)
+Veterans Health Administration, Department of Veterans Affairs
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+Contact: HinClinicalAnalytics@va.gov
+=====================================================================================
+
+Converted files kept by the web server until the browser downloads them.
+
+Each result is stored under a random, URL-safe download ID. Small results
+are held in memory; results of SPILL_SIZE bytes or more, and any result
+that would take the in-memory total past the memory limit, are kept as
+files in a spill directory instead. Outputs that already exist as files
+(such as uploads converted by a worker) are moved into the spill
+directory rather than read back.
+
+The store has a cap on the total bytes it holds, in memory and on disk.
+Adding a result evicts the least recently used entries until the new one
+fits. Entries also expire a fixed time after they were added. Expired
+entries are dropped when they are next looked up or when a result is
+added, so no background thread is needed.
+
+All methods are thread-safe.
+"""
+
+import collections
+import contextlib
+import io
+import os
+import secrets
+import tempfile
+import threading
+import time
+
+# Default cap on the bytes held for download, in memory and on disk
+DEFAULT_STORE_SIZE = 1024 * 1024 * 1024  # 1 GiB
+
+# Default cap on the bytes held in memory
+DEFAULT_MEMORY_SIZE = 64 * 1024 * 1024  # 64 MiB
+
+# Results at least this large are always kept on disk
+SPILL_SIZE = 1024 * 1024
+
+# Default time a result stays available after it was added
+DEFAULT_TTL = 60 * 60  # seconds
+
+# Random bytes in a download ID
+ID_BYTES = 16
+
+# A stored result: contents in 'data', or in the file at 'path' when spilled.
+# Entries never change and IDs are never reused, so the quoted download ID
+# serves as a strong entity tag.
+DownloadEntry = collections.namedtuple(
+    'DownloadEntry', ['download_id', 'filename', 'size', 'data', 'path', 'created', 'etag']
+)
+
+
+class DownloadTooLargeError(ValueError):
+    """A result is larger than the whole download store."""
+
+
+class DownloadStore:
+    """
+    Byte-capped store of converted files with LRU eviction and disk spill.
+
+    Typical use:
+
+        store = DownloadStore(spill_dir)
+        download_id = store.add_bytes(data, 'logo.txt')
+        opened = store.open(download_id)
+        if opened is not None:
+            entry, download_file = opened
+            with download_file:
+                ...
+    """
+
+    def __init__(self, spill_dir, max_bytes=DEFAULT_STORE_SIZE, memory_bytes=DEFAULT_MEMORY_SIZE,
+                 ttl=DEFAULT_TTL):
+        self.spill_dir = spill_dir
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self.ttl = ttl
+        os.makedirs(spill_dir, exist_ok=True)
+        self._entries = collections.OrderedDict()  # Least recently used first
+        self._lock = threading.Lock()
+        self._total = 0
+        self._in_memory = 0
+
+    def add_bytes(self, data, filename):
+        """
+        Keep a result held in memory for download.
+
+        Args:
+            data (bytes): File contents
+            filename (str): Name offered to the browser
+
+        Returns:
+            str: Download ID
+
+        Raises:
+            DownloadTooLargeError: If the result exceeds the store's size cap
+        """
+        size = len(data)
+        self._check_size(size, filename)
+        with self._lock:
+            keep_in_memory = size < SPILL_SIZE and self._in_memory + size <= self.memory_bytes
+        if keep_in_memory:
+            return self._insert(filename, size, data, None)
+        fd, path = tempfile.mkstemp(prefix='download-', dir=self.spill_dir)
+        try:
+            with os.fdopen(fd, 'wb') as spill_file:
+                spill_file.write(data)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            raise
+        return self._insert(filename, size, None, path)
+
+    def add_file(self, file_path, filename):
+        """
+        Keep a result written to a file for download.
+
+        The file is taken over by the store: large files are moved into the
+        spill directory (which should be on the same file system), small
+        ones are read into memory and deleted.
+
+        Args:
+            file_path (str): File holding the result
+            filename (str): Name offered to the browser
+
+        Returns:
+            str: Download ID
+
+        Raises:
+            DownloadTooLargeError: If the result exceeds the store's size cap
+        """
+        try:
+            size = os.path.getsize(file_path)
+            self._check_size(size, filename)
+            with self._lock:
+                keep_in_memory = size < SPILL_SIZE and self._in_memory + size <= self.memory_bytes
+            if keep_in_memory:
+                with open(file_path, 'rb') as f:
+                    return self._insert(filename, size, f.read(), None)
+            fd, path = tempfile.mkstemp(prefix='download-', dir=self.spill_dir)
+            os.close(fd)
+            os.replace(file_path, path)
+            return self._insert(filename, size, None, path)
+        finally:
+            with contextlib.suppress(OSError):
+                os.remove(file_path)
+
+    def _check_size(self, size, filename):
+        """Refuse a result that could never fit in the store."""
+        if size > self.max_bytes:
+            raise DownloadTooLargeError(
+                f"{filename} is too large to keep for download "
+                f"({size} bytes, limit {self.max_bytes} bytes)"
+            )
+
+    def _insert(self, filename, size, data, path):
+        """Add an entry under a new ID, evicting entries to make room."""
+        with self._lock:
+            self._expire(time.time())
+            while self._entries and self._total + size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+            download_id = secrets.token_urlsafe(ID_BYTES)
+            while download_id in self._entries:
+                download_id = secrets.token_urlsafe(ID_BYTES)
+            self._entries[download_id] = DownloadEntry(download_id, filename, size, data, path, time.time(),
+                                                       f'"{download_id}"')
+            self._total += size
+            if data is not None:
+                self._in_memory += size
+        return download_id
+
+    def get(self, download_id):
+        """
+        Look up a result, dropping it if it has expired.
+
+        A hit makes the entry the most recently used.
+
+        Args:
+            download_id (str): ID returned when the result was added
+
+        Returns:
+            DownloadEntry: Stored result, or None if unknown or expired
+        """
+        with self._lock:
+            return self._lookup(download_id)
+
+    def open(self, download_id):
+        """
+        Look up a result and open its contents for reading.
+
+        A spilled file is opened while the store is locked, so it stays
+        readable even if the entry is evicted during the download.
+
+        Args:
+            download_id (str): ID returned when the result was added
+
+        Returns:
+            tuple: (DownloadEntry, binary file object), or None if the ID is
+            unknown or expired; the caller closes the file
+        """
+        with self._lock:
+            entry = self._lookup(download_id)
+            if entry is None:
+                return None
+            if entry.data is not None:
+                return entry, io.BytesIO(entry.data)
+            return entry, open(entry.path, 'rb')
+
+    def _lookup(self, download_id):
+        """Find an unexpired entry and mark it used; the caller holds the lock."""
+        entry = self._entries.get(download_id)
+        if entry is None:
+            return None
+        if time.time() - entry.created > self.ttl:
+            self._remove(download_id)
+            return None
+        self._entries.move_to_end(download_id)
+        return entry
+
+    def _expire(self, now):
+        """Drop every expired entry; the caller holds the lock."""
+        expired = [download_id for download_id, entry in self._entries.items()
+                   if now - entry.created > self.ttl]
+        for download_id in expired:
+            self._remove(download_id)
+
+    def _remove(self, download_id):
+        """Drop an entry and its spill file; the caller holds the lock."""
+        entry = self._entries.pop(download_id)
+        self._total -= entry.size
+        if entry.data is not None:
+            self._in_memory -= entry.size
+        else:
+            # An open download keeps reading a removed file on POSIX systems;
+            # elsewhere the file stays until the spill directory is removed
+            with contextlib.suppress(OSError):
+                os.remove(entry.path)
+
+    def stats(self):
+        """Return the entry count and bytes held, for the status page."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total,
+                'memoryBytes': self._in_memory,
+                'maxBytes': self.max_bytes,
+            }
+
+    def clear(self):
+        """Drop every entry and delete the spill files."""
+        with self._lock:
+            for download_id in list(self._entries):
+                self._remove(download_id)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+=====================================================================================
+                    CONTENT-ADDRESSED CACHE FOR BASE64 ENCODES
+=====================================================================================
+
+Base64 Image Converter - Convert images to Base64 and vice versa
+Copyright (C) 2025 Kyle J. Coder
+Advanced Analytics & Informatics, Edward Hines Jr. VA Hospital (v12/578)
+Veterans Health Administration, Department of Veterans Affairs
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+Contact: HinClinicalAnalytics@va.gov
+=====================================================================================
+
+On-disk cache of Base64-encoded image payloads keyed by content hash.
+
+The same logo or signature image often appears thousands of times under
+different names. When the cache is enabled, process_image hashes each
+source file and, for content it has seen before, copies the cached Base64
+payload (plus the cached MIME type and header-derived dimensions) into a
+freshly rendered HTML wrapper instead of encoding the image again.
+
+Cache layout (one directory level is used to keep directories small):
+
+    <cache_dir>/<first 2 hex digits>/<sha256>.b64    Base64 payload
+    <cache_dir>/<first 2 hex digits>/<sha256>.json   MIME type and dimensions
+
+Entries are written to temporary files and renamed into place, so several
+worker processes can share one cache safely. The modification time of the
+payload file records its last use, and trim() evicts the least recently
+used entries until the cache fits its size cap. Each process keeps a
+running total of the cache size, so store() can trim as soon as a long
+run pushes the cache past its cap.
+"""
+
+import collections
+import contextlib
+import json
+import os
+import tempfile
+import time
+
+# Default size cap for the cache directory
+DEFAULT_CACHE_SIZE = 1024 * 1024 * 1024  # 1 GiB
+
+# Temporary files older than this are leftovers of interrupted writes
+STALE_TEMP_AGE = 24 * 60 * 60  # seconds
+
+# store() trims an overfull cache down to this fraction of its size cap, so
+# the next few stores do not each rescan the cache directory
+STORE_TRIM_RATIO = 0.9
+
+# The running total only counts this process's own stores; rescan after this
+# many of them to pick up entries written by other processes
+RESCAN_EVERY_STORES = 256
+
+# A cached Base64 payload and the metadata stored with it
+CachedPayload = collections.namedtuple(
+    'CachedPayload', ['payload_path', 'length', 'mime_type', 'width', 'height', 'size']
+)
+
+
+def parse_size(text):
+    """
+    Parse a human-readable size such as '500M', '2G' or '1048576'.
+
+    Args:
+        text (str): Number of bytes, optionally with a K, M, G or T suffix
+
+    Returns:
+        int: Size in bytes
+
+    Raises:
+        ValueError: If the text is not a valid size
+    """
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+    value = text.strip().upper().rstrip('B')
+    multiplier = 1
+    if value and value[-1] in units:
+        multiplier = units[value[-1]]
+        value = value[:-1]
+    size = int(float(value) * multiplier)
+    if size < 0:
+        raise ValueError(f"size must not be negative: {text!r}")
+    return size
+
+
+class EncodeCache:
+    """
+    Content-addressed store of Base64 payloads with LRU eviction.
+
+    The object only holds the cache location, size cap and a running
+    total of the cache size, so it can be passed to worker processes.
+    Each process's copy counts the cache from its own last scan.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_CACHE_SIZE):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._total_bytes = None  # Size found by the last scan plus the stores since
+        self._stores_since_scan = 0
+
+    def _entry_paths(self, digest):
+        """Return the payload and metadata paths for a content digest."""
+        base = os.path.join(self.cache_dir, digest[:2], digest)
+        return base + '.b64', base + '.json'
+
+    def lookup(self, digest):
+        """
+        Find the cached payload for a content digest.
+
+        A hit refreshes the entry's last-use time for LRU eviction.
+
+        Args:
+            digest (str): SHA-256 hex digest of the image contents
+
+        Returns:
+            CachedPayload: Cached entry, or None on a miss
+        """
+        payload_path, meta_path = self._entry_paths(digest)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            length = os.path.getsize(payload_path)
+            os.utime(payload_path)
+        except (OSError, ValueError):
+            return None
+        if length != meta.get('length'):
+            return None  # Entry was evicted or replaced while being read
+        return CachedPayload(payload_path, length, meta['mime_type'], meta['width'], meta['height'],
+                             meta.get('size'))
+
+    @contextlib.contextmanager
+    def store(self, digest, mime_type, width, height, size=None):
+        """
+        Add a payload to the cache while it is being encoded.
+
+        Yields a text file to which the Base64 payload is written. The entry
+        is published only if the block completes without an exception. If
+        the cache then exceeds its size cap, least recently used entries
+        are evicted until it is back under STORE_TRIM_RATIO of the cap.
+
+        Args:
+            digest (str): SHA-256 hex digest of the image contents
+            mime_type (str): MIME type of the image
+            width (int): Image width, or None if unknown
+            height (int): Image height, or None if unknown
+            size (int): Size in bytes of the encoded image, which differs
+                from the source file when it was optimized first
+
+        Yields:
+            file: Text file opened for writing the Base64 payload
+        """
+        payload_path, meta_path = self._entry_paths(digest)
+        entry_dir = os.path.dirname(payload_path)
+        os.makedirs(entry_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix='.entry_', suffix='.tmp', dir=entry_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='ascii', newline='') as payload_file:
+                yield payload_file
+                length = payload_file.tell()
+            meta = {'length': length, 'mime_type': mime_type, 'width': width, 'height': height, 'size': size}
+            os.replace(temp_path, payload_path)
+            _write_json_atomic(meta_path, meta)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+            raise
+        self._count_store(length + len(json.dumps(meta)))
+
+    def _count_store(self, entry_bytes):
+        """Add a stored entry to the running total, trimming once the cache is over its cap."""
+        if self._total_bytes is not None and self._stores_since_scan < RESCAN_EVERY_STORES:
+            self._total_bytes += entry_bytes
+            self._stores_since_scan += 1
+            if self._total_bytes <= self.max_bytes:
+                return
+        self.trim(int(self.max_bytes * STORE_TRIM_RATIO))
+
+    def trim(self, target_bytes=None):
+        """
+        Evict least recently used entries if the cache exceeds its size cap.
+
+        Args:
+            target_bytes (int): Size to trim an overfull cache down to;
+                defaults to the size cap
+
+        Returns:
+            int: Number of entries evicted
+        """
+        if target_bytes is None:
+            target_bytes = self.max_bytes
+        self._total_bytes = 0
+        self._stores_since_scan = 0
+        entries = []
+        total = 0
+        now = time.time()
+        try:
+            subdirs = [e.path for e in os.scandir(self.cache_dir) if e.is_dir()]
+        except FileNotFoundError:
+            return 0
+
+        for subdir in subdirs:
+            with os.scandir(subdir) as listing:
+                for entry in listing:
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    if entry.name.endswith('.tmp'):
+                        if now - stat.st_mtime > STALE_TEMP_AGE:
+                            with contextlib.suppress(OSError):
+                                os.remove(entry.path)
+                        continue
+                    total += stat.st_size
+                    if entry.name.endswith('.b64'):
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        evicted = 0
+        entries.sort()
+        if total <= self.max_bytes:
+            entries = []
+        for _, size, payload_path in entries:
+            if total <= target_bytes:
+                break
+            meta_path = payload_path[:-len('.b64')] + '.json'
+            for path in (meta_path, payload_path):
+                try:
+                    total -= os.path.getsize(path)
+                    os.remove(path)
+                except OSError:
+                    pass
+            evicted += 1
+        self._total_bytes = total
+        return evicted
+
+
+def _write_json_atomic(path, data):
+    """Write a small JSON document via a temporary file and rename."""
+    fd, temp_path = tempfile.mkstemp(prefix='.entry_', suffix='.tmp', dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
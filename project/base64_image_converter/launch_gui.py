@@ -43,12 +43,13 @@ import sys
 import subprocess
 import webbrowser
 import time
-import pkg_resources
 
 def get_package_file_path(filename):
     """Get the path to a file within the package"""
     try:
-        # Try to get the file from the package resources
+        # Try to get the file from the package resources (imported on demand,
+        # as pkg_resources is slow to import)
+        import pkg_resources
         return pkg_resources.resource_filename('base64_image_converter', filename)
     except:
         # Fallback to current directory
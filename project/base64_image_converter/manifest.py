@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+=====================================================================================
+                    CONVERSION MANIFEST FOR INCREMENTAL RE-RUNS
+=====================================================================================
+
+Base64 Image Converter - Convert images to Base64 and vice versa
+Copyright (C) 2025 Kyle J. Coder
+Advanced Analytics & Informatics, Edward Hines Jr. VA Hospital (v12/578)
+Veterans Health Administration, Department of Veterans Affairs
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+Contact: HinClinicalAnalytics@va.gov
+=====================================================================================
+
+Persistent record of completed conversions, used to skip unchanged inputs
+when a batch is run again.
+
+For every converted source file the manifest stores its size, modification
+time (nanoseconds), SHA-256 content hash and the output files produced. On
+a re-run a source is skipped when its size and mtime still match and all
+of its outputs exist; if only the mtime changed, the content hash decides.
+The manifest is a JSON file written atomically, so an interrupted run never
+leaves it half-written. It also stores the options that shape the outputs
+(such as the output format); when these change, every source is
+converted again.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+try:
+    from .archive_io import input_exists, open_input
+except ImportError:
+    from archive_io import input_exists, open_input
+
+# Default manifest file name, stored inside the output directory
+MANIFEST_FILENAME = ".conversion_manifest.json"
+
+# Manifest file format version
+MANIFEST_VERSION = 1
+
+# Bytes read per step when hashing source files
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(file_path):
+    """
+    Compute the SHA-256 hash of a file without loading it into memory.
+
+    Args:
+        file_path (str): Full path to the file or to an archive member
+
+    Returns:
+        str: Hexadecimal SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    with open_input(file_path) as (f, _):
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class HashingReader:
+    """
+    Binary file wrapper that hashes the bytes a conversion reads.
+
+    Lets a conversion produce the SHA-256 digest of its source in the same
+    pass that reads it, instead of hashing the file a second time. Bytes
+    are hashed as they are read in order; reads after a seek (such as a
+    header probe looking ahead for dimensions) only count once they
+    continue where the hash left off.
+
+    Args:
+        file: Binary file object positioned at the start of the source
+        size (int): Size of the source in bytes
+    """
+
+    def __init__(self, file, size):
+        self._file = file
+        self._size = size
+        self._digest = hashlib.sha256()
+        self._position = 0
+        self._hashed = 0
+
+    def read(self, size=-1):
+        data = self._file.read(size)
+        start, self._position = self._position, self._position + len(data)
+        if start <= self._hashed < self._position:
+            self._digest.update(memoryview(data)[self._hashed - start:])
+            self._hashed = self._position
+        return data
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        self._position = self._file.seek(offset, whence)
+        return self._position
+
+    def tell(self):
+        return self._position
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+    def hexdigest(self):
+        """Return the digest, or None if the source was not read to the end."""
+        return self._digest.hexdigest() if self._hashed == self._size else None
+
+
+class ConversionManifest:
+    """
+    Persistent record of converted source files and their outputs.
+
+    Sources are keyed by absolute path. Typical use:
+
+        manifest = ConversionManifest.load(path)
+        if not manifest.is_up_to_date(item):
+            ... convert ...
+            manifest.record(item, digest, output_paths)
+        manifest.save()
+    """
+
+    def __init__(self, path, entries=None, options=None):
+        self.path = path
+        self.entries = entries if entries is not None else {}
+        self.options = options if options is not None else {}
+        self._seen = set()
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path, options=None):
+        """
+        Load a manifest from disk, starting empty if it does not exist.
+
+        An unreadable or incompatible manifest is ignored (and replaced on
+        the next save), which only costs a full reconversion. The same
+        applies when the manifest was written with different options.
+
+        Args:
+            path (str): Full path to the manifest file
+            options (dict): JSON-serializable options that shape the outputs
+
+        Returns:
+            ConversionManifest: Loaded manifest
+        """
+        options = options if options is not None else {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION and data.get("options", {}) == options:
+                return cls(path, data.get("entries", {}), options)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"⚠️  Ignoring unreadable manifest '{path}': {e}")
+        return cls(path, options=options)
+
+    @staticmethod
+    def source_key(file_path):
+        """Return the key under which a source file is recorded."""
+        return os.path.abspath(file_path)
+
+    def is_up_to_date(self, item):
+        """
+        Check whether a source file can be skipped.
+
+        Args:
+            item (WorkItem): Work item with path, size and mtime_ns
+
+        Returns:
+            bool: True if the recorded outputs exist and the source is unchanged
+        """
+        key = self.source_key(item.path)
+        self._seen.add(key)
+        entry = self.entries.get(key)
+        if entry is None or item.size is None:
+            return False
+        if not all(os.path.exists(output) for output in entry["outputs"]):
+            return False
+        if entry["size"] != item.size:
+            return False
+        if entry["mtime_ns"] == item.mtime_ns:
+            return True
+
+        # Touched but possibly unchanged: let the content hash decide
+        try:
+            if file_digest(item.path) != entry["sha256"]:
+                return False
+        except OSError:
+            return False
+        entry["mtime_ns"] = item.mtime_ns
+        self._dirty = True
+        return True
+
+    def record(self, item, digest, outputs):
+        """
+        Record a successful conversion.
+
+        Args:
+            item (WorkItem): Converted source file
+            digest (str): SHA-256 digest of the source contents
+            outputs (list): Paths of the files produced
+        """
+        self.entries[self.source_key(item.path)] = {
+            "size": item.size,
+            "mtime_ns": item.mtime_ns,
+            "sha256": digest,
+            "outputs": [os.path.abspath(output) for output in outputs],
+        }
+        self._dirty = True
+
+    def prune(self):
+        """
+        Remove outputs whose source files no longer exist.
+
+        Only entries not checked with is_up_to_date in this session are
+        considered, and an entry is pruned only when its source is missing
+        from disk (for archive members, when the archive is missing), so
+        manifests shared between runs over different inputs are left intact.
+
+        Returns:
+            list: Output paths that were deleted
+        """
+        removed = []
+        for source in list(self.entries):
+            if source in self._seen or input_exists(source):
+                continue
+            for output in self.entries.pop(source)["outputs"]:
+                try:
+                    os.remove(output)
+                    removed.append(output)
+                except FileNotFoundError:
+                    pass
+            self._dirty = True
+        return removed
+
+    def save(self):
+        """Write the manifest to disk atomically if it has changed."""
+        if not self._dirty:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".manifest_", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "options": self.options, "entries": self.entries}, f)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        self._dirty = False
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+=====================================================================================
+                    STREAMING MULTIPART/FORM-DATA PARSER
+=====================================================================================
+
+Base64 Image Converter - Convert images to Base64 and vice versa
+Copyright (C) 2025 Kyle J. Coder
+Advanced Analytics & Informatics, Edward Hines Jr. VA Hospital (v12/578)
+Veterans Health Administration, Department of Veterans Affairs
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+Contact: HinClinicalAnalytics@va.gov
+=====================================================================================
+
+Incremental parser for multipart/form-data request bodies.
+
+Used by the web interface's batch endpoint, which receives many files in
+one request. The body is fed to a MultipartParser in chunks as it is read
+from the socket, and each part's contents are reported as they arrive, so
+files can be written to disk without holding the request in memory.
+
+Only the part headers and a delimiter's worth of look-ahead are buffered
+between chunks.
+"""
+
+from email.parser import HeaderParser
+
+# Largest header block accepted for a single part
+MAX_HEADER_SIZE = 16 * 1024
+
+
+class MultipartError(ValueError):
+    """The request body is not valid multipart/form-data."""
+
+
+class PartInfo:
+    """
+    Headers of one part of a multipart/form-data body.
+
+    Attributes:
+        name (str): Form field name, or None if missing
+        filename (str): File name as sent by the client, or None for a
+            plain form field
+        content_type (str): Content-Type of the part (default 'text/plain')
+    """
+
+    __slots__ = ('name', 'filename', 'content_type')
+
+    def __init__(self, name, filename, content_type):
+        self.name = name
+        self.filename = filename
+        self.content_type = content_type
+
+    @classmethod
+    def from_header_block(cls, block):
+        """Parse a part's raw header block (without the blank line)."""
+        message = HeaderParser().parsestr(block.decode('utf-8', 'replace'))
+        return cls(
+            message.get_param('name', header='content-disposition'),
+            message.get_filename(),
+            message.get_content_type(),
+        )
+
+
+class MultipartParser:
+    """
+    Push parser for a multipart/form-data body.
+
+    Typical use:
+
+        parser = MultipartParser(boundary)
+        for chunk in body_chunks:
+            for event, value in parser.feed(chunk):
+                ...
+        parser.finish()
+
+    Events:
+        ('start', PartInfo): A part begins
+        ('data', bytes): Next piece of the current part's contents
+        ('end', None): The current part is complete
+
+    Raises:
+        MultipartError: From feed() or finish() if the body is malformed
+    """
+
+    def __init__(self, boundary):
+        if not boundary:
+            raise MultipartError("multipart body without a boundary")
+        if isinstance(boundary, str):
+            boundary = boundary.encode('latin-1')
+        self._delimiter = b'\r\n--' + boundary
+        # The first boundary may start the body, without a preceding line break
+        self._buffer = b'\r\n'
+        self._state = 'preamble'
+
+    def feed(self, data):
+        """
+        Parse the next chunk of the body.
+
+        Args:
+            data (bytes): Next chunk of the request body
+
+        Returns:
+            list: Events found in this chunk, in body order
+        """
+        events = []
+        self._buffer += data
+        while self._step(events):
+            pass
+        return events
+
+    def finish(self):
+        """
+        Check that the body ended with the closing boundary.
+
+        Raises:
+            MultipartError: If the body is truncated
+        """
+        if self._state != 'epilogue':
+            raise MultipartError("multipart body ended before the closing boundary")
+
+    def _step(self, events):
+        """Advance by one parser state; returns False when more data is needed."""
+        buffer = self._buffer
+        if self._state == 'preamble':
+            index = buffer.find(self._delimiter)
+            if index < 0:
+                self._buffer = buffer[-(len(self._delimiter) - 1):]
+                return False
+            self._buffer = buffer[index + len(self._delimiter):]
+            self._state = 'boundary'
+            return True
+
+        if self._state == 'boundary':
+            # After a boundary: '--' closes the body, otherwise a line break
+            # (optionally preceded by whitespace) starts the next part
+            if buffer.startswith(b'--'):
+                self._buffer = b''
+                self._state = 'epilogue'
+                return False
+            line_end = buffer.find(b'\r\n')
+            if line_end < 0:
+                if len(buffer) > MAX_HEADER_SIZE:
+                    raise MultipartError("malformed multipart boundary line")
+                return False
+            if buffer[:line_end].strip(b' \t'):
+                raise MultipartError("malformed multipart boundary line")
+            self._buffer = buffer[line_end + 2:]
+            self._state = 'headers'
+            return True
+
+        if self._state == 'headers':
+            if buffer.startswith(b'\r\n'):
+                header_end, block = 0, b''
+            else:
+                header_end = buffer.find(b'\r\n\r\n')
+                if header_end < 0:
+                    if len(buffer) > MAX_HEADER_SIZE:
+                        raise MultipartError("multipart part headers are too large")
+                    return False
+                block = buffer[:header_end]
+                header_end += 2
+            self._buffer = buffer[header_end + 2:]
+            events.append(('start', PartInfo.from_header_block(block)))
+            self._state = 'body'
+            return True
+
+        if self._state == 'body':
+            index = buffer.find(self._delimiter)
+            if index < 0:
+                # Keep enough bytes to recognise a delimiter split across chunks
+                keep = len(self._delimiter) - 1
+                if len(buffer) > keep:
+                    events.append(('data', buffer[:-keep]))
+                    self._buffer = buffer[-keep:]
+                return False
+            if index:
+                events.append(('data', buffer[:index]))
+            events.append(('end', None))
+            self._buffer = buffer[index + len(self._delimiter):]
+            self._state = 'boundary'
+            return True
+
+        # Epilogue: anything after the closing boundary is ignored
+        self._buffer = b''
+        return False
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+=====================================================================================
+                    PROFILING REPORTS FOR BATCH CONVERSIONS
+=====================================================================================
+
+Base64 Image Converter - Convert images to Base64 and vice versa
+Copyright (C) 2025 Kyle J. Coder
+Advanced Analytics & Informatics, Edward Hines Jr. VA Hospital (v12/578)
+Veterans Health Administration, Department of Veterans Affairs
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+Contact: HinClinicalAnalytics@va.gov
+=====================================================================================
+
+Profiling support for the converter's --profile and --profile-stats options.
+
+BatchProfiler collects the ConversionResult of every converted file and
+summarizes them as a JSON report:
+
+    stages      p50/p90/p99/max latency per stage (read, optimize, probe,
+                codec, validate, render, write) and each stage's share of the
+                total time, showing whether a run is disk-, encode- or
+                template-bound
+    throughput  input and output MB/s over the wall-clock time of the run
+    slowest     the files that took longest, with their stage timings
+    memory      peak traced Python allocations (tracemalloc) in this
+                process and, where available, peak RSS of this process
+                and of finished worker processes
+
+With several workers the stage timings are measured inside the workers
+and summed, while tracemalloc only sees the coordinating process.
+"""
+
+import contextlib
+import json
+import os
+import sys
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+try:
+    from .convertIMAGE_script import perf_counter_ns
+except ImportError:
+    from convertIMAGE_script import perf_counter_ns
+
+# Percentiles reported for every stage
+REPORT_PERCENTILES = (50, 90, 99)
+
+# Number of slowest files listed in the report
+DEFAULT_SLOWEST_COUNT = 10
+
+# Profiled stages, as (report name, ConversionResult attribute)
+STAGES = (
+    ('read', 'read_ns'),
+    ('optimize', 'optimize_ns'),
+    ('probe', 'probe_ns'),
+    ('codec', 'codec_ns'),
+    ('validate', 'validate_ns'),
+    ('render', 'render_ns'),
+    ('write', 'write_ns'),
+    ('total', 'total_ns'),
+)
+
+
+def percentile(sorted_values, percent):
+    """
+    Return a percentile of pre-sorted values using the nearest-rank method.
+
+    Args:
+        sorted_values (list): Values in ascending order
+        percent (float): Percentile between 0 and 100
+
+    Returns:
+        Value at the percentile, or None for an empty list
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * percent // 100))  # ceil without floats
+    return sorted_values[int(rank) - 1]
+
+
+class BatchProfiler:
+    """
+    Collects conversion results and timings for a profiling report.
+
+    Typical use:
+
+        profiler = BatchProfiler()
+        profiler.start()
+        run_batch(..., on_result=profiler.add)
+        profiler.stop()
+        profiler.write(path)
+    """
+
+    def __init__(self, trace_memory=True, slowest_count=DEFAULT_SLOWEST_COUNT):
+        self.trace_memory = trace_memory
+        self.slowest_count = slowest_count
+        self.results = []
+        self._started_ns = None
+        self._stopped_ns = None
+        self._peak_traced = None
+        self._owns_tracemalloc = False
+
+    def start(self):
+        """Start the wall clock and, if enabled, memory tracing."""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        self._started_ns = perf_counter_ns()
+
+    def add(self, result):
+        """Record the ConversionResult of one file (usable as on_result)."""
+        self.results.append(result)
+
+    def stop(self):
+        """Stop the wall clock and memory tracing."""
+        self._stopped_ns = perf_counter_ns()
+        if tracemalloc.is_tracing():
+            self._peak_traced = tracemalloc.get_traced_memory()[1]
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+                self._owns_tracemalloc = False
+
+    def report(self, **context):
+        """
+        Build the profiling report.
+
+        Args:
+            **context: Extra run details (e.g. workers, output format)
+                stored under "run"
+
+        Returns:
+            dict: JSON-serializable report
+        """
+        end_ns = self._stopped_ns if self._stopped_ns is not None else perf_counter_ns()
+        wall_s = (end_ns - self._started_ns) / 1e9 if self._started_ns is not None else 0.0
+        succeeded = [result for result in self.results if result]
+        input_bytes = sum(result.input_bytes for result in succeeded)
+        output_bytes = sum(result.output_bytes for result in succeeded)
+
+        stage_totals = {name: sum(getattr(r, attribute) for r in succeeded) for name, attribute in STAGES}
+        stages = {}
+        for name, attribute in STAGES:
+            values = sorted(getattr(result, attribute) for result in succeeded)
+            summary = {f"p{p}_ms": _ms(percentile(values, p)) for p in REPORT_PERCENTILES}
+            summary["max_ms"] = _ms(values[-1] if values else None)
+            summary["sum_ms"] = _ms(stage_totals[name])
+            if name != 'total':
+                share = stage_totals[name] / stage_totals['total'] if stage_totals['total'] else 0.0
+                summary["share"] = round(share, 4)
+            stages[name] = summary
+
+        slowest = sorted(succeeded, key=lambda result: result.total_ns, reverse=True)
+        return {
+            "run": dict(context, python=sys.version.split()[0], pid=os.getpid()),
+            "files": {
+                "converted": len(succeeded),
+                "failed": len(self.results) - len(succeeded),
+                "cached": sum(1 for result in succeeded if result.cached),
+            },
+            "wall_time_s": round(wall_s, 4),
+            "throughput": {
+                "input_bytes": input_bytes,
+                "output_bytes": output_bytes,
+                "bytes_saved": sum(result.bytes_saved for result in succeeded),
+                "input_mb_per_s": _rate(input_bytes, wall_s),
+                "output_mb_per_s": _rate(output_bytes, wall_s),
+            },
+            "stages": stages,
+            "slowest": [_file_entry(result) for result in slowest[:self.slowest_count]],
+            "memory": self._memory(),
+        }
+
+    def write(self, path, **context):
+        """
+        Write the JSON report to a file, or to stdout if path is '-'.
+
+        Args:
+            path (str): Destination file
+            **context: Extra run details passed on to report()
+        """
+        text = json.dumps(self.report(**context), indent=2)
+        if path == '-':
+            print(text)
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    def _memory(self):
+        """Collect peak memory figures for the report."""
+        memory = {"tracemalloc_peak_bytes": self._peak_traced}
+        if resource is not None:
+            # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+            scale = 1 if sys.platform == 'darwin' else 1024
+            memory["max_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+            memory["max_rss_children_bytes"] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+        return memory
+
+
+def _ms(value_ns):
+    """Convert nanoseconds to rounded milliseconds (None stays None)."""
+    return None if value_ns is None else round(value_ns / 1e6, 3)
+
+
+def _rate(byte_count, seconds):
+    """Return a throughput in MB/s (1 MB = 2**20 bytes)."""
+    return round(byte_count / (1024 * 1024) / seconds, 2) if seconds > 0 else None
+
+
+def _file_entry(result):
+    """Summarize one file for the slowest-files list."""
+    entry = {
+        "input_path": result.input_path,
+        "input_bytes": result.input_bytes,
+        "total_ms": _ms(result.total_ns),
+    }
+    for name, attribute in STAGES[:-1]:
+        entry[f"{name}_ms"] = _ms(getattr(result, attribute))
+    return entry
+
+
+@contextlib.contextmanager
+def cprofile_to(stats_path):
+    """
+    Run the enclosed block under cProfile and dump pstats to a file.
+
+    Worker processes are not profiled; use --workers 1 to see the
+    conversion functions themselves.
+
+    Args:
+        stats_path (str): Destination for the pstats data, or None to
+            run the block without profiling
+    """
+    if not stats_path:
+        yield
+        return
+    import cProfile
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(stats_path)
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+=====================================================================================
+                    OUTPUT RENDERERS FOR ENCODED IMAGES
+=====================================================================================
+
+Base64 Image Converter - Convert images to Base64 and vice versa
+Copyright (C) 2025 Kyle J. Coder
+Advanced Analytics & Informatics, Edward Hines Jr. VA Hospital (v12/578)
+Veterans Health Administration, Department of Veterans Affairs
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+Contact: HinClinicalAnalytics@va.gov
+=====================================================================================
+
+Output formats for Base64-encoded images.
+
+Each format is a template with a single {payload} placeholder where the
+Base64 data is streamed. Templates are parsed once per process into
+literal segments and field lookups, so rendering a file only joins
+strings; the payload itself is never part of the rendered text.
+
+Available formats:
+
+    html     Complete HTML5 document with conversion metadata (.txt)
+    raw      Bare Base64 payload (.b64)
+    datauri  Single data URI, e.g. data:image/png;base64,... (.txt)
+    css      CSS rule with a background-image data URI (.css)
+    json     JSON record with metadata and a data URI "src" (.json)
+
+Template fields are provided by the converter (see render()). A field
+written as {name!j} is inserted as a JSON value rather than as text.
+"""
+
+import json
+import re
+import string
+
+# Output format used when none is selected
+DEFAULT_OUTPUT_FORMAT = 'html'
+
+# Placeholder marking where the Base64 payload is written
+PAYLOAD_FIELD = 'payload'
+
+# Fields (including derived ones) that need the image size up front
+SIZE_FIELDS = frozenset(('image_size', 'image_file_size', 'payload_length', 'b64_file_size'))
+
+_HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{filename}</title>
+</head>
+<body>
+
+    <!-- 
+    Source image file has been encoded/converted into a base64 format ready for HTML embedding, with the following conversion information:
+        INPUT (source) image file details:     
+            Image file name: {filename}
+            Image file type: {mime_type}
+            Image file size: {image_file_size}
+            Image file location: {image_path}{dimensions_block}
+        OUTPUT Encoded Base64 file:
+            Base64 file name: {output_filename}
+            Base64 file type: text/plain
+            Base64 file location: {output_path}
+            Base64 file size: {b64_file_size}
+            Base64 individual string length: {payload_length}
+    -->
+    
+    <img 
+        src="data:{mime_type};base64,{payload}" 
+        alt="{alt_str}" 
+        class="{mime_type}"
+        loading="lazy"
+        decoding="async"{img_size_info}
+    />
+
+</body>
+</html>
+"""
+
+_CSS_TEMPLATE = """.{css_class} {{
+    background-image: url("data:{mime_type};base64,{payload}");{css_size}
+}}
+"""
+
+_JSON_TEMPLATE = """{{"source": {filename!j}, "mime_type": {mime_type!j}, "size": {image_size!j}, \
+"width": {width!j}, "height": {height!j}, "length": {payload_length!j}, \
+"src": "data:{mime_type};base64,{payload}"}}
+"""
+
+# Characters not allowed in a generated CSS class name
+_CSS_CLASS_INVALID = re.compile(r'[^A-Za-z0-9_-]')
+
+
+def _html_fields(fields):
+    """Derive the conditional blocks and labels of the HTML document."""
+    base_name, ext = fields['base_name'], fields['extension']
+    display_file_type = ext.lstrip(".").lower() if ext else "png"
+    derived = {
+        'alt_str': f"{base_name}.{display_file_type}",
+        'b64_file_size': f"{fields['payload_length']:.2f} bytes",
+        'dimensions_block': "",
+        'img_size_info': "",
+    }
+    width, height = fields['width'], fields['height']
+    if width is not None and height is not None:
+        derived['dimensions_block'] = f"""\n               Image file dimensions:
+                    Height: {height}
+                    Width: {width}"""
+        derived['img_size_info'] = f'\n        width="{width}"\n        height="{height}"'
+    return derived
+
+
+def _css_fields(fields):
+    """Derive a class selector and optional size declarations for CSS."""
+    css_class = _CSS_CLASS_INVALID.sub('-', fields['base_name'])
+    if not css_class or not css_class[0].isalpha():
+        css_class = 'img-' + css_class
+    css_size = ""
+    if fields['width'] is not None and fields['height'] is not None:
+        css_size = f"\n    width: {fields['width']}px;\n    height: {fields['height']}px;"
+    return {'css_class': css_class, 'css_size': css_size}
+
+
+# name: (output file extension, template, derived-field function)
+OUTPUT_FORMATS = {
+    'html': ('.txt', _HTML_TEMPLATE, _html_fields),
+    'raw': ('.b64', '{payload}', None),
+    'datauri': ('.txt', 'data:{mime_type};base64,{payload}', None),
+    'css': ('.css', _CSS_TEMPLATE, _css_fields),
+    'json': ('.json', _JSON_TEMPLATE, None),
+}
+
+# Renderers already compiled in this process, by format name
+_compiled = {}
+
+
+def _compile(template):
+    """Split a template into (literal, field_name, as_json) segments."""
+    segments = []
+    for literal, field_name, _, conversion in string.Formatter().parse(template):
+        if conversion not in (None, 'j'):
+            raise ValueError(f"unsupported template conversion: !{conversion}")
+        segments.append((literal, field_name, conversion == 'j'))
+    return tuple(segments)
+
+
+class OutputRenderer:
+    """
+    Precompiled output template for one format.
+
+    Use get_renderer() rather than creating instances directly, so each
+    template is compiled only once per process.
+    """
+
+    def __init__(self, name, extension, template, derive=None):
+        head, separator, tail = template.partition('{' + PAYLOAD_FIELD + '}')
+        if not separator:
+            raise ValueError(f"template for {name!r} has no {{{PAYLOAD_FIELD}}} field")
+        self.name = name
+        self.extension = extension
+        self._head = _compile(head)
+        self._tail = _compile(tail)
+        self._derive = derive
+        # Streams of unknown length must be measured before rendering these
+        used = {field_name for _, field_name, _ in self._head + self._tail}
+        self.needs_size = not SIZE_FIELDS.isdisjoint(used)
+
+    def render(self, fields):
+        """
+        Render the text written before and after the Base64 payload.
+
+        Args:
+            fields (dict): Conversion details: filename, base_name, extension,
+                image_path, output_filename, output_path, mime_type,
+                image_size, image_file_size, payload_length, width, height
+
+        Returns:
+            tuple: (head, tail) strings surrounding the payload
+        """
+        if self._derive is not None:
+            fields = dict(fields, **self._derive(fields))
+        return _fill(self._head, fields), _fill(self._tail, fields)
+
+
+def _fill(segments, fields):
+    """Join compiled template segments with their field values."""
+    parts = []
+    for literal, field_name, as_json in segments:
+        parts.append(literal)
+        if field_name is not None:
+            value = fields[field_name]
+            parts.append(json.dumps(value) if as_json else str(value))
+    return ''.join(parts)
+
+
+def get_renderer(name=DEFAULT_OUTPUT_FORMAT):
+    """
+    Return the compiled renderer for an output format.
+
+    Args:
+        name (str): One of OUTPUT_FORMATS
+
+    Returns:
+        OutputRenderer: Renderer, compiled on first use in this process
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    renderer = _compiled.get(name)
+    if renderer is None:
+        try:
+            extension, template, derive = OUTPUT_FORMATS[name]
+        except KeyError:
+            raise ValueError(f"unknown output format: {name!r}") from None
+        renderer = _compiled[name] = OutputRenderer(name, extension, template, derive)
+    return renderer
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+=====================================================================================
+                    INTEGRITY VALIDATION OF DECODED IMAGES
+=====================================================================================
+
+Base64 Image Converter - Convert images to Base64 and vice versa
+Copyright (C) 2025 Kyle J. Coder
+Advanced Analytics & Informatics, Edward Hines Jr. VA Hospital (v12/578)
+Veterans Health Administration, Department of Veterans Affairs
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+Contact: HinClinicalAnalytics@va.gov
+=====================================================================================
+
+Structural checks run on decoded images while they are being written.
+
+An ImageValidator is fed the decoded bytes of one image in the pieces
+the streaming decoder produces and raises ImageValidationError as soon
+as the data is known to be corrupt or truncated:
+
+    PNG   8-byte signature, then every chunk's length, type and CRC-32;
+          the image must end with an IEND chunk. A bad CRC is reported
+          as soon as the chunk is complete.
+    JPEG  marker segments are followed by their lengths, and the
+          end-of-image (EOI) marker must follow the scan data of at
+          least one start-of-scan (SOS) segment.
+    GIF   the screen descriptor, color tables, extensions and image
+          data sub-blocks are followed to the trailer byte (0x3B).
+
+Bytes after the end of the image (after IEND, EOI or the GIF trailer)
+are ignored, as by image viewers; cameras and editors often pad files.
+
+The format is recognised from the first bytes of the data, not from the
+data URI's MIME type; images in other formats are not checked. Only the
+current chunk header and a few trailing bytes are kept between pieces,
+so memory use does not depend on the image size.
+"""
+
+import struct
+import zlib
+
+# PNG file signature
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Start-of-image marker of a JPEG file, and the codes of the markers the
+# checker acts on (the byte following 0xFF)
+JPEG_SOI = b'\xff\xd8'
+JPEG_EOI_CODE = 0xD9
+JPEG_SOS_CODE = 0xDA
+
+# JPEG marker codes without a length field: TEM, RST0-RST7 and SOI
+JPEG_STANDALONE_CODES = frozenset((0x01, *range(0xD0, 0xD8), 0xD8))
+
+# GIF file signatures, block introducers and the trailer byte ending every GIF file
+GIF_SIGNATURES = (b'GIF87a', b'GIF89a')
+GIF_EXTENSION = 0x21
+GIF_IMAGE = 0x2C
+GIF_TRAILER = 0x3B
+
+# Largest chunk length allowed by the PNG specification
+PNG_MAX_CHUNK_LENGTH = 2 ** 31 - 1
+
+# Leading bytes needed to recognise the image format
+SNIFF_LENGTH = len(PNG_SIGNATURE)
+
+
+class ImageValidationError(ValueError):
+    """Decoded image data is corrupt or truncated."""
+
+
+class ImageValidator:
+    """
+    Streaming integrity check for one decoded image.
+
+    Typical use:
+
+        validator = ImageValidator()
+        for piece in decoded_pieces:
+            validator.feed(piece)
+            output.write(piece)
+        validator.finish()
+
+    Attributes:
+        image_format (str): 'png', 'jpeg' or 'gif' once recognised; None
+            while too few bytes have been seen or for unchecked formats
+    """
+
+    def __init__(self):
+        self.image_format = None
+        self._head = b''
+        self._checker = None
+
+    def feed(self, data):
+        """
+        Check the next piece of decoded image data.
+
+        Args:
+            data (bytes): Next decoded bytes of the image
+
+        Raises:
+            ImageValidationError: If the data so far is known to be corrupt
+        """
+        if self._checker is None:
+            if self._head is None:
+                return  # Format without checks
+            self._head += data
+            if len(self._head) < SNIFF_LENGTH:
+                return
+            data, self._head = self._head, None
+            self._select(data)
+            if self._checker is None:
+                return
+        self._checker.feed(data)
+
+    def finish(self):
+        """
+        Check that the image is complete.
+
+        Raises:
+            ImageValidationError: If the image is truncated
+        """
+        if self._checker is None and self._head:
+            # Shorter than the sniff length: check what little there is
+            head, self._head = self._head, None
+            self._select(head)
+            if self._checker is not None:
+                self._checker.feed(head)
+        if self._checker is not None:
+            self._checker.finish()
+
+    def _select(self, head):
+        """Pick the format checker matching the leading bytes."""
+        if head.startswith(PNG_SIGNATURE[:4]):  # The checker verifies the rest
+            self.image_format, self._checker = 'png', _PNGChecker()
+        elif head.startswith(JPEG_SOI):
+            self.image_format, self._checker = 'jpeg', _JPEGChecker()
+        elif head.startswith(GIF_SIGNATURES):
+            self.image_format, self._checker = 'gif', _GIFChecker()
+
+
+class _PNGChecker:
+    """Verifies the signature, chunk framing and CRCs of a PNG stream."""
+
+    def __init__(self):
+        self._pending = b''
+        self._field = 'signature'  # Next fixed-size field: signature, header or crc
+        self._chunk_type = None
+        self._chunk_length = 0
+        self._remaining = 0  # Chunk data bytes still to be read
+        self._crc = 0
+        self._offset = 0  # Stream offset of the current chunk
+        self._complete = False
+
+    def feed(self, data):
+        view = memoryview(data)
+        position = 0
+        end = len(view)
+        while position < end and not self._complete:
+            if self._remaining:
+                take = min(self._remaining, end - position)
+                self._crc = zlib.crc32(view[position:position + take], self._crc)
+                self._remaining -= take
+                position += take
+                continue
+            size = 4 if self._field == 'crc' else 8
+            needed = size - len(self._pending)
+            self._pending += bytes(view[position:position + needed])
+            position += needed
+            if len(self._pending) == size:
+                self._end_field()
+        # Bytes after IEND are ignored, as by image viewers
+
+    def _end_field(self):
+        """Act on a completed signature, chunk header or CRC field."""
+        field, self._pending = self._pending, b''
+        if self._field == 'signature':
+            if field != PNG_SIGNATURE:
+                raise ImageValidationError("corrupt PNG: bad file signature")
+            self._offset = len(PNG_SIGNATURE)
+            self._field = 'header'
+        elif self._field == 'header':
+            length, chunk_type = struct.unpack('>I4s', field)
+            if length > PNG_MAX_CHUNK_LENGTH or not chunk_type.isalpha():
+                raise ImageValidationError(f"corrupt PNG: invalid chunk header at offset {self._offset}")
+            self._chunk_type, self._chunk_length = chunk_type, length
+            self._crc = zlib.crc32(chunk_type)
+            self._remaining = length
+            self._field = 'crc'
+        else:
+            if struct.unpack('>I', field)[0] != self._crc:
+                name = self._chunk_type.decode('ascii')
+                raise ImageValidationError(f"corrupt PNG: CRC mismatch in {name} chunk at offset {self._offset}")
+            self._complete = self._chunk_type == b'IEND'
+            self._offset += 12 + self._chunk_length
+            self._field = 'header'
+
+    def finish(self):
+        if self._complete:
+            return
+        if self._field == 'signature':
+            raise ImageValidationError("corrupt PNG: bad file signature")
+        if self._chunk_type is not None and (self._remaining or self._field == 'crc'):
+            name = self._chunk_type.decode('ascii')
+            raise ImageValidationError(f"truncated PNG: data ends inside {name} chunk at offset {self._offset}")
+        raise ImageValidationError("truncated PNG: no IEND chunk")
+
+
+class _JPEGChecker:
+    """Follows the marker segments and scan data of a JPEG stream up to EOI."""
+
+    def __init__(self):
+        # States: 'marker' (0xFF expected), 'code' (marker code expected),
+        # 'length' (segment length), 'entropy' (scan data), 'entropy_ff'
+        # (0xFF seen in scan data) and 'done' (EOI seen)
+        self._state = 'marker'
+        self._offset = 0  # Stream offset of the next byte
+        self._length_bytes = b''
+        self._code = None
+        self._skip = 0  # Segment bytes still to be skipped
+        self._scans = 0
+
+    def feed(self, data):
+        view = memoryview(data)
+        position = 0
+        end = len(view)
+        while position < end and self._state != 'done':
+            if self._skip:
+                take = min(self._skip, end - position)
+                self._skip -= take
+                position += take
+                continue
+            if self._state == 'entropy':
+                # Scan data holds 0xFF only as 0xFF00 or before RSTn/markers
+                found = data.find(b'\xff', position)
+                if found < 0:
+                    position = end
+                else:
+                    position = found + 1
+                    self._state = 'entropy_ff'
+                continue
+            byte = view[position]
+            position += 1
+            if self._state == 'marker':
+                if byte != 0xFF:
+                    raise ImageValidationError(
+                        f"corrupt JPEG: expected a marker at offset {self._offset + position - 1}")
+                self._state = 'code'
+            elif self._state == 'length':
+                self._length_bytes += bytes((byte,))
+                if len(self._length_bytes) == 2:
+                    length = struct.unpack('>H', self._length_bytes)[0]
+                    if length < 2:
+                        raise ImageValidationError(
+                            f"corrupt JPEG: invalid segment length at offset {self._offset + position - 2}")
+                    self._skip = length - 2
+                    if self._code == JPEG_SOS_CODE:
+                        self._scans += 1
+                        self._state = 'entropy'
+                    else:
+                        self._state = 'marker'
+            elif self._state == 'entropy_ff' and (byte == 0x00 or 0xD0 <= byte <= 0xD7):
+                self._state = 'entropy'  # Stuffed 0xFF byte or restart marker
+            elif byte == 0xFF:
+                pass  # Fill byte before a marker code
+            else:
+                self._start_marker(byte)
+        self._offset += end
+
+    def _start_marker(self, code):
+        """Act on a marker code read after 0xFF."""
+        if code == JPEG_EOI_CODE:
+            self._state = 'done'
+        elif code in JPEG_STANDALONE_CODES:
+            self._state = 'marker'
+        else:
+            self._code = code
+            self._length_bytes = b''
+            self._state = 'length'
+
+    def finish(self):
+        if self._state == 'done':
+            if not self._scans:
+                raise ImageValidationError("corrupt JPEG: end-of-image (EOI) marker before any scan (SOS)")
+            return
+        if not self._scans:
+            raise ImageValidationError("truncated JPEG: data ends before the first scan (SOS)")
+        raise ImageValidationError("truncated JPEG: data ends before the end-of-image (EOI) marker")
+
+
+class _GIFChecker:
+    """Follows the block structure of a GIF stream up to its trailer."""
+
+    def __init__(self):
+        self._pending = b''
+        # Next fixed-size field: 'screen' (signature and logical screen
+        # descriptor), 'block' (introducer), 'label' (extension label),
+        # 'image' (image descriptor), 'lzw' (minimum code size) or
+        # 'size' (sub-block size); 'done' once the trailer is seen
+        self._field = 'screen'
+        self._skip = 0  # Color table or sub-block bytes still to be skipped
+        self._offset = 0  # Stream offset of the next byte
+
+    _FIELD_SIZES = {'screen': 13, 'block': 1, 'label': 1, 'image': 9, 'lzw': 1, 'size': 1}
+
+    def feed(self, data):
+        view = memoryview(data)
+        position = 0
+        end = len(view)
+        while position < end and self._field != 'done':
+            if self._skip:
+                take = min(self._skip, end - position)
+                self._skip -= take
+                position += take
+                continue
+            needed = self._FIELD_SIZES[self._field] - len(self._pending)
+            self._pending += bytes(view[position:position + needed])
+            position += needed
+            if len(self._pending) == self._FIELD_SIZES[self._field]:
+                field, self._pending = self._pending, b''
+                self._end_field(field, self._offset + position - len(field))
+        self._offset += end
+
+    def _end_field(self, field, offset):
+        """Act on a completed fixed-size field that started at offset."""
+        if self._field == 'screen':
+            self._skip = _gif_color_table_size(field[10])
+            self._field = 'block'
+        elif self._field == 'block':
+            if field[0] == GIF_TRAILER:
+                self._field = 'done'
+            elif field[0] == GIF_EXTENSION:
+                self._field = 'label'
+            elif field[0] == GIF_IMAGE:
+                self._field = 'image'
+            else:
+                raise ImageValidationError(f"corrupt GIF: unknown block type 0x{field[0]:02X} at offset {offset}")
+        elif self._field == 'label':
+            self._field = 'size'
+        elif self._field == 'image':
+            self._skip = _gif_color_table_size(field[8])
+            self._field = 'lzw'
+        elif self._field == 'lzw':
+            self._field = 'size'
+        elif field[0]:
+            self._skip = field[0]  # Sub-block data; the next size byte follows
+        else:
+            self._field = 'block'  # Block terminator
+
+    def finish(self):
+        if self._field != 'done':
+            raise ImageValidationError("truncated GIF: data ends before the trailer (0x3B)")
+
+
+def _gif_color_table_size(flags):
+    """Return the size in bytes of the color table announced by a packed flags byte."""
+    if not flags & 0x80:
+        return 0
+    return 3 * (2 << (flags & 0x07))
@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+=====================================================================================
+                    WATCH-FOLDER CHANGE DETECTION
+=====================================================================================
+
+Base64 Image Converter - Convert images to Base64 and vice versa
+Copyright (C) 2025 Kyle J. Coder
+Advanced Analytics & Informatics, Edward Hines Jr. VA Hospital (v12/578)
+Veterans Health Administration, Department of Veterans Affairs
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+Contact: HinClinicalAnalytics@va.gov
+=====================================================================================
+
+Change detection for the converter's --watch mode.
+
+A watcher reports which parts of the watched directory trees may have
+changed; the caller rescans them and decides what to convert:
+
+    InotifyWatcher  Linux only, through the C library's inotify calls
+                    (ctypes, no extra packages). Reports a file when a
+                    writer closes it, it is moved in or out, or it is
+                    deleted, and a directory when it is created, moved
+                    in, or events were lost.
+    PollingWatcher  Everywhere else. Stats each watched directory and
+                    the files last listed in it every poll interval, and
+                    reports directories whose contents changed and files
+                    rewritten in place (which does not touch the
+                    directory), plus all directories every
+                    RESCAN_INTERVAL.
+
+Both report Change tuples from wait(). A file that is still being written
+is held back by a SettleTracker until its size and modification time
+have stopped changing for the settle time, so half-copied files are never
+converted.
+"""
+
+import collections
+import errno
+import os
+import select
+import struct
+import sys
+import time
+
+# Seconds between directory checks of the polling watcher
+DEFAULT_POLL_INTERVAL = 0.25
+
+# Seconds a file's size and mtime must stay unchanged before it is converted
+DEFAULT_SETTLE_TIME = 0.5
+
+# Seconds between full rescans of the polling watcher
+RESCAN_INTERVAL = 30.0
+
+# Coarsest directory modification time resolution expected (FAT uses 2
+# seconds). A file created within this long of a listing may not change the
+# directory's mtime, so the polling watcher keeps re-listing such directories.
+DIR_MTIME_GRANULARITY = 2.0
+
+# A possibly changed path below a watched root. 'relative_path' uses os.sep
+# and is '' for the root itself; directories are to be rescanned (not
+# recursively: their sub-directories are reported separately).
+Change = collections.namedtuple('Change', ['root', 'relative_path', 'is_dir'])
+
+
+def _walk_dirs(root, relative_dir, include_dir):
+    """Yield relative_dir and every sub-directory below it that include_dir accepts."""
+    pending = [relative_dir]
+    while pending:
+        current = pending.pop()
+        yield current
+        try:
+            with os.scandir(os.path.join(root, current) if current else root) as entries:
+                for entry in entries:
+                    try:
+                        if not entry.is_dir(follow_symlinks=False):
+                            continue
+                    except OSError:
+                        continue
+                    child = os.path.join(current, entry.name) if current else entry.name
+                    if include_dir is None or include_dir(root, child):
+                        pending.append(child)
+        except OSError:
+            continue
+
+
+class PollingWatcher:
+    """
+    Portable watcher that compares directory and file modification times.
+
+    Each poll stats every watched directory and every file found in it by
+    its last listing. A directory is listed again when its modification
+    time changes, or while that time is within DIR_MTIME_GRANULARITY of
+    the last listing, since files created in the same clock tick would not
+    change it again; it is reported if the listing differs. Files of the
+    other directories are stat'ed one by one and reported when their size
+    or modification time changed.
+
+    Args:
+        roots (list): Directories to watch
+        recursive (bool): Also watch all sub-directories
+        include_dir (callable): Optional include_dir(root, relative_dir)
+            returning False for sub-directories that must not be watched
+        interval (float): Seconds between polls
+        rescan_interval (float): Seconds between full rescans
+    """
+
+    def __init__(self, roots, recursive=False, include_dir=None, interval=DEFAULT_POLL_INTERVAL,
+                 rescan_interval=RESCAN_INTERVAL):
+        self.roots = list(roots)
+        self.recursive = recursive
+        self.include_dir = include_dir
+        self.interval = interval
+        self.rescan_interval = rescan_interval
+        self._listings = {}  # (root, relative_dir) -> (mtime_ns, listed_at, {name: (size, mtime_ns)})
+        self._next_rescan = 0.0
+
+    def wait(self, timeout):
+        """
+        Wait up to timeout seconds, then report what may have changed.
+
+        The first call reports every directory, for an initial scan.
+
+        Returns:
+            set: Change tuples for directories to rescan and changed files
+        """
+        if self._next_rescan:
+            time.sleep(max(0.0, min(timeout, self.interval)))
+        now = time.monotonic()
+        if now >= self._next_rescan:
+            self._next_rescan = now + self.rescan_interval
+            return self._rescan()
+
+        changes = set()
+        for key, (mtime_ns, listed_at, files) in list(self._listings.items()):
+            root, relative_dir = key
+            try:
+                current = os.stat(os.path.join(root, relative_dir) if relative_dir else root).st_mtime_ns
+            except OSError:
+                del self._listings[key]  # Removed; a re-created directory shows up in its parent
+                continue
+            if current == mtime_ns and listed_at >= current / 1e9 + DIR_MTIME_GRANULARITY:
+                changes.update(self._changed_files(root, relative_dir, files))
+                continue
+            if not self._track(root, relative_dir):
+                continue
+            if current != mtime_ns or self._listings[key][2] != files:
+                changes.add(Change(root, relative_dir, True))
+                if self.recursive:
+                    changes.update(self._add_new_subdirs(root, relative_dir))
+        return changes
+
+    def _changed_files(self, root, relative_dir, files):
+        """Stat the files of an unchanged directory listing and report the ones that changed."""
+        changes = set()
+        for name, signature in list(files.items()):
+            relative_path = os.path.join(relative_dir, name) if relative_dir else name
+            try:
+                stat_result = os.stat(os.path.join(root, relative_path))
+                current = (stat_result.st_size, stat_result.st_mtime_ns)
+            except OSError:
+                del files[name]
+                current = None
+            if current != signature:
+                if current is not None:
+                    files[name] = current
+                changes.add(Change(root, relative_path, False))
+        return changes
+
+    def _add_new_subdirs(self, root, relative_dir):
+        """Start watching sub-directories of a changed directory that are new."""
+        added = set()
+        try:
+            with os.scandir(os.path.join(root, relative_dir) if relative_dir else root) as entries:
+                children = [os.path.join(relative_dir, entry.name) if relative_dir else entry.name
+                            for entry in entries if entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            return added
+        for child in children:
+            if (root, child) in self._listings:
+                continue
+            if self.include_dir is not None and not self.include_dir(root, child):
+                continue
+            for current in _walk_dirs(root, child, self.include_dir):
+                self._track(root, current)
+                added.add(Change(root, current, True))
+        return added
+
+    def _rescan(self):
+        """Re-read the whole directory tree and report every directory."""
+        self._listings.clear()
+        changes = set()
+        for root in self.roots:
+            dirs = _walk_dirs(root, '', self.include_dir) if self.recursive else ['']
+            for relative_dir in dirs:
+                self._track(root, relative_dir)
+                changes.add(Change(root, relative_dir, True))
+        return changes
+
+    def _track(self, root, relative_dir):
+        """List a directory's files with their sizes and mtimes; returns False if it is gone."""
+        path = os.path.join(root, relative_dir) if relative_dir else root
+        listed_at = time.time()
+        files = {}
+        try:
+            # Stat the directory first, so that changes made while listing it are seen next time
+            mtime_ns = os.stat(path).st_mtime_ns
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            stat_result = entry.stat()
+                            files[entry.name] = (stat_result.st_size, stat_result.st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError:
+            self._listings.pop((root, relative_dir), None)
+            return False
+        self._listings[(root, relative_dir)] = (mtime_ns, listed_at, files)
+        return True
+
+    def close(self):
+        """Release resources (none for polling)."""
+        self._listings.clear()
+
+
+# inotify event masks (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+# Events watched on every directory
+INOTIFY_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+                | IN_MOVE_SELF | IN_ONLYDIR)
+
+# Fixed part of struct inotify_event: wd, mask, cookie, len
+_EVENT_HEADER = struct.Struct('iIII')
+
+# Bytes read from the inotify descriptor at a time
+_EVENT_BUFFER_SIZE = 64 * 1024
+
+
+def _load_inotify():
+    """Return the C library if it provides inotify, otherwise None."""
+    if not sys.platform.startswith('linux'):
+        return None
+    # ctypes is imported here so that polling-only and non-watch runs never load it
+    import ctypes
+    import ctypes.util
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class InotifyWatcher:
+    """
+    Linux watcher driven by inotify events, with no polling delay.
+
+    Files are reported when a writer closes them (IN_CLOSE_WRITE) or they
+    are moved into a watched directory (IN_MOVED_TO), i.e. once they are
+    complete; creation alone is ignored for files. Deleted and moved-away
+    files are reported too, so the caller can forget them. New directories are
+    watched as they appear and reported for a scan.
+
+    Args:
+        roots (list): Directories to watch
+        recursive (bool): Also watch all sub-directories
+        include_dir (callable): Optional include_dir(root, relative_dir)
+            returning False for sub-directories that must not be watched
+
+    Raises:
+        OSError: If inotify is not available or a root cannot be watched
+    """
+
+    def __init__(self, roots, recursive=False, include_dir=None):
+        self._libc = _load_inotify()
+        if self._libc is None:
+            raise OSError(errno.ENOSYS, "inotify is not available on this system")
+        self.roots = list(roots)
+        self.recursive = recursive
+        self.include_dir = include_dir
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            import ctypes
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1 failed: {os.strerror(err)}")
+        self._watches = {}  # watch descriptor -> (root, relative_dir)
+        self._pending = set()
+        try:
+            for root in self.roots:
+                self._watch_tree(root, '', required=True)
+        except BaseException:
+            self.close()
+            raise
+
+    def _watch_tree(self, root, relative_dir, required=False):
+        """Watch a directory (and, if recursive, its sub-directories) and queue a scan of each."""
+        dirs = _walk_dirs(root, relative_dir, self.include_dir) if self.recursive else [relative_dir]
+        for current in dirs:
+            path = os.path.join(root, current) if current else root
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), INOTIFY_MASK)
+            if wd < 0:
+                import ctypes
+                err = ctypes.get_errno()
+                if required:
+                    raise OSError(err, f"cannot watch '{path}': {os.strerror(err)}")
+                continue  # Removed again before it could be watched
+            self._watches[wd] = (root, current)
+            self._pending.add(Change(root, current, True))
+
+    def wait(self, timeout):
+        """
+        Wait up to timeout seconds for events and report what changed.
+
+        The first call reports every watched directory, for an initial scan.
+
+        Returns:
+            set: Change tuples for files and directories
+        """
+        if not self._pending:
+            readable, _, _ = select.select([self._fd], [], [], max(0.0, timeout))
+            if readable:
+                self._read_events()
+        changes, self._pending = self._pending, set()
+        return changes
+
+    def _read_events(self):
+        while True:
+            try:
+                data = os.read(self._fd, _EVENT_BUFFER_SIZE)
+            except BlockingIOError:
+                return
+            if not data:
+                return
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, name_length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + name_length].rstrip(b'\0'))
+                offset += name_length
+                self._handle_event(wd, mask, name)
+
+    def _handle_event(self, wd, mask, name):
+        if mask & IN_Q_OVERFLOW:
+            # Events were lost: rescan everything that is watched
+            self._pending.update(Change(root, relative_dir, True)
+                                 for root, relative_dir in self._watches.values())
+            return
+        if mask & IN_IGNORED:
+            self._watches.pop(wd, None)
+            return
+        location = self._watches.get(wd)
+        if location is None or not name:
+            return
+        root, relative_dir = location
+        relative_path = os.path.join(relative_dir, name) if relative_dir else name
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO) and self.recursive:
+                if self.include_dir is None or self.include_dir(root, relative_path):
+                    self._watch_tree(root, relative_path)
+        elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO | IN_DELETE | IN_MOVED_FROM):
+            self._pending.add(Change(root, relative_path, False))
+
+    def close(self):
+        """Close the inotify descriptor, removing all watches."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._watches.clear()
+
+
+def open_watcher(roots, recursive=False, include_dir=None, interval=DEFAULT_POLL_INTERVAL,
+                 use_inotify=True):
+    """
+    Create the most efficient watcher available.
+
+    Args:
+        roots (list): Directories to watch
+        recursive (bool): Also watch all sub-directories
+        include_dir (callable): Optional include_dir(root, relative_dir)
+            returning False for sub-directories that must not be watched
+        interval (float): Poll interval if polling is used
+        use_inotify (bool): Use inotify where available
+
+    Returns:
+        InotifyWatcher or PollingWatcher: Watcher for the roots
+    """
+    if use_inotify:
+        try:
+            return InotifyWatcher(roots, recursive, include_dir)
+        except OSError:
+            pass  # Not Linux, or out of watches: fall back to polling
+    return PollingWatcher(roots, recursive, include_dir, interval)
+
+
+class SettleTracker:
+    """
+    Holds files back until they have stopped changing.
+
+    A file observed with a given size and mtime becomes ready once
+    settle_time seconds have passed and a fresh stat still shows the same
+    size and mtime; any change restarts its wait.
+
+    Args:
+        settle_time (float): Seconds without changes before a file is ready
+        clock (callable): Monotonic clock returning seconds
+    """
+
+    def __init__(self, settle_time=DEFAULT_SETTLE_TIME, clock=time.monotonic):
+        self.settle_time = settle_time
+        self._clock = clock
+        self._pending = {}  # path -> (item, signature, observed_at)
+
+    def observe(self, item):
+        """
+        Note a file that appeared or changed.
+
+        Args:
+            item (WorkItem): File with path, size and mtime_ns
+        """
+        signature = (item.size, item.mtime_ns)
+        pending = self._pending.get(item.path)
+        if pending is None or pending[1] != signature:
+            self._pending[item.path] = (item, signature, self._clock())
+
+    def discard(self, path):
+        """Stop tracking a file."""
+        self._pending.pop(path, None)
+
+    def pop_ready(self):
+        """
+        Remove and return the files that have settled.
+
+        Returns:
+            list: WorkItems with their current size and mtime, oldest first
+        """
+        now = self._clock()
+        ready = []
+        for path, (item, signature, observed_at) in list(self._pending.items()):
+            if now - observed_at < self.settle_time:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self._pending[path]  # Deleted or moved away before it settled
+                continue
+            current = (stat.st_size, stat.st_mtime_ns)
+            if current != signature:
+                self._pending[path] = (item._replace(size=current[0], mtime_ns=current[1]), current, now)
+                continue
+            del self._pending[path]
+            ready.append(item)
+        return ready
+
+    def next_deadline(self):
+        """Seconds until the next pending file could be ready, or None."""
+        if not self._pending:
+            return None
+        oldest = min(observed_at for _, _, observed_at in self._pending.values())
+        return max(0.0, oldest + self.settle_time - self._clock())
+
+    def __contains__(self, path):
+        return path in self._pending
+
+    def __len__(self):
+        return len(self._pending)
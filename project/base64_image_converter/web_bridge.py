@@ -32,21 +32,60 @@ This script provides a web server bridge to integrate the HTML GUI with the
 base64 image converter Python script. It creates a local web server that can
 handle file uploads and conversion requests from the HTML interface.
 
+Requests are served on their own threads, so a large upload does not
+hold up other users or /status checks. Conversions run in a bounded pool
+of worker processes: at most --workers conversions run at once, up to
+--queue-depth more wait for a free worker, and further requests are
+answered with 503 Service Unavailable and a Retry-After header.
+
+The interface uploads each file as the raw request body of
+POST /upload?name=<file name>&mode=<conversion mode>. The body is copied
+to a temporary file in UPLOAD_CHUNK_SIZE pieces and converted from there
+by the streaming encoder/decoder, so neither the upload nor the
+conversion is held in memory as a whole. The older POST /convert, taking
+the file as a base64 data URL inside JSON, is still accepted.
+
+Converted files wait in a DownloadStore until they are fetched from
+/download/<id>: large results stay on disk, the total is capped by
+--download-store-size with least-recently-used eviction, and results
+expire --download-ttl seconds after the conversion.
+
+Downloads are sent in chunks; spilled files go straight from the file to
+the socket with socket.sendfile. A single byte range (Range: bytes=...)
+is answered with 206 Partial Content, so interrupted downloads can be
+resumed, and every download carries a strong ETag that If-None-Match
+(304 Not Modified) and If-Range are checked against.
+
+POST /convert/batch?mode=<conversion mode> takes any number of files as
+a multipart/form-data body. Each file is spooled to disk as soon as its
+part has arrived and converted while the rest of the body is still being
+received, with up to --workers conversions of the batch running at once.
+The response is a zip archive streamed back as conversions complete,
+ending with BATCH_SUMMARY_MEMBER, a JSON summary of every file's outcome.
+
 Usage:
-    python web_bridge.py
+    python web_bridge.py [--host HOST] [--port PORT] [--workers N] [--queue-depth N]
 
 Then open your browser to: http://localhost:8080
 """
 
 import os
 import json
+import base64
+import argparse
+import contextlib
+import itertools
+import multiprocessing
 import shutil
+import signal
 import tempfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
 from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
 from urllib.parse import urlparse, parse_qs
 import webbrowser
 import threading
-import time
 
 # Try to use modern importlib.resources, fallback to pkg_resources
 try:
@@ -62,19 +101,412 @@ except ImportError:
 
 # Import your existing converter functions
 try:
-    from .convertIMAGE_script import process_file, file_size_str
+    from .convertIMAGE_script import (
+        DEFAULT_OUTPUT_FORMAT, conversion_direction, create_process_pool, decode_document,
+        decode_pipe, encode_bytes, encode_pipe, extension_map, get_renderer,
+    )
 except ImportError:
     try:
-        from convertIMAGE_script import process_file, file_size_str
+        from convertIMAGE_script import (
+            DEFAULT_OUTPUT_FORMAT, conversion_direction, create_process_pool, decode_document,
+            decode_pipe, encode_bytes, encode_pipe, extension_map, get_renderer,
+        )
     except ImportError:
         print("⚠️  Warning: Could not import convertIMAGE_script. Make sure it's in the same directory.")
         # Fallback function for demonstration
-        def process_file(file_path, output_dir):
-            print(f"Demo: Would process {file_path} to {output_dir}")
+        def conversion_direction(filename, direction='auto'):
+            print(f"Demo: Would convert {filename}")
+            return None
+        encode_bytes = decode_document = encode_pipe = decode_pipe = None
+        create_process_pool = ProcessPoolExecutor
+
+try:
+    from .download_store import DEFAULT_STORE_SIZE, DEFAULT_TTL, DownloadStore, DownloadTooLargeError
+    from .encode_cache import parse_size
+    from .multipart import MultipartError, MultipartParser
+except ImportError:
+    from download_store import DEFAULT_STORE_SIZE, DEFAULT_TTL, DownloadStore, DownloadTooLargeError
+    from encode_cache import parse_size
+    from multipart import MultipartError, MultipartParser
+
+# Conversion modes of the web interface and the converter direction for each
+CONVERSION_MODES = {'auto': 'auto', 'to-base64': 'encode', 'from-base64': 'decode'}
+
+# Default address of the web server
+DEFAULT_HOST = 'localhost'
+DEFAULT_PORT = 8080
+
+# Conversions allowed to wait for a free worker before requests are refused
+DEFAULT_QUEUE_DEPTH = 8
+
+# Seconds a refused client is asked to wait before retrying
+RETRY_AFTER_SECONDS = 5
+
+# Bytes of an upload read from the socket per step
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Bytes of a download written to the socket per step
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Name of the archive returned by /convert/batch and of its summary member
+BATCH_ARCHIVE_NAME = 'converted.zip'
+BATCH_SUMMARY_MEMBER = 'summary.json'
+
+
+def parse_byte_range(range_header, size):
+    """
+    Interpret a Range header for a representation of the given size.
+    
+    Only a single byte range is honoured; a header with several ranges, or
+    one that is malformed, is ignored as RFC 9110 allows, and the whole
+    file is sent.
+    
+    Args:
+        range_header (str): Value of the Range header
+        size (int): Size of the file in bytes
+    
+    Returns:
+        tuple: (first, last) byte positions, inclusive, or None to send the
+        whole file
+    
+    Raises:
+        ValueError: If the range is valid but lies outside the file
+    """
+    unit, _, ranges = range_header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in ranges:
+        return None
+    first, dash, last = ranges.strip().partition('-')
+    if not dash or not (first + last).isdigit():
+        return None
+    if not first:
+        # Suffix range: the final 'last' bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("empty suffix range")
+        return max(size - length, 0), size - 1
+    first = int(first)
+    if last and int(last) < first:
+        return None
+    if first >= size:
+        raise ValueError("range starts after the end of the file")
+    return first, (min(int(last), size - 1) if last else size - 1)
+
+
+def etag_matches(header, etag):
+    """
+    Check an If-None-Match style header against an entity tag.
+    
+    Uses the weak comparison required for If-None-Match: a 'W/' prefix on
+    either tag is ignored.
+    
+    Args:
+        header (str): Comma-separated entity tags, or '*'
+        etag (str): Quoted entity tag of the file
+    
+    Returns:
+        bool: True if the header lists the tag or is '*'
+    """
+    if header.strip() == '*':
+        return True
+    bare = etag[2:] if etag.startswith('W/') else etag
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == bare:
             return True
+    return False
+
+
+class ServerBusyError(RuntimeError):
+    """Every worker is busy and the conversion queue is full."""
+
+
+def _convert_upload(binary_data, file_name, direction):
+    """
+    Convert one uploaded file in a worker process.
+    
+    Args:
+        binary_data (bytes): Uploaded file contents
+        file_name (str): Uploaded file name
+        direction (str): 'encode' or 'decode'
+    
+    Returns:
+        ConversionResult: In-memory result, failed with the reason if the
+        conversion did not succeed, or None for any other direction
+    """
+    if direction == 'encode':
+        return encode_bytes(binary_data, file_name)
+    if direction == 'decode':
+        return decode_document(binary_data, file_name)
+    return None
+
+
+def _convert_upload_file(upload_path, file_name, direction, output_path):
+    """
+    Convert one spooled upload file to an output file in a worker process.
+    
+    Both directions stream through the pipe-mode converters, so memory use
+    does not depend on the file size.
+    
+    Args:
+        upload_path (str): Temporary file holding the upload
+        file_name (str): Uploaded file name, used for the MIME type guess
+            and the download name
+        direction (str): 'encode' or 'decode'
+        output_path (str): Temporary file to write the converted output to
+    
+    Returns:
+        ConversionResult: Result whose output_paths holds the download name
+        (e.g. 'logo.txt'), failed with the reason if the conversion did not
+        succeed, or None for any other direction
+    """
+    stem = os.path.splitext(file_name)[0]
+    if direction == 'encode':
+        result = encode_pipe(upload_path, output_path, name=file_name)
+        extension = get_renderer(DEFAULT_OUTPUT_FORMAT).extension
+    elif direction == 'decode':
+        result = decode_pipe(upload_path, output_path)
+        extension = extension_map.get(result.mime_type, '.png')
+    else:
+        return None
+    result.input_path = file_name
+    if result.output_paths:
+        result.output_paths = [f"{stem}{extension}"]
+    return result
+
+
+def _future_outcome(future):
+    """Return a finished future's result, or the exception it raised."""
+    try:
+        return future.result()
+    except Exception as e:
+        return e
+
+
+def _init_worker():
+    """Leave Ctrl+C to the server process, which shuts the pool down."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class ConversionPool:
+    """
+    Bounded pool of worker processes shared by all request threads.
+    
+    Conversions are CPU-bound, so they run in separate processes rather
+    than on the request threads. Workers are started with the 'spawn'
+    method because forking a multi-threaded server is unsafe; on Python
+    3.6 they run in a spawn-context multiprocessing.Pool instead (see
+    create_process_pool).
+    
+    Every running or waiting conversion holds one of workers + queue_depth
+    places, so at most that many conversions are in the pool at once. A
+    single upload holds its place from reserve(); a batch takes one more
+    place for each further conversion it runs (see BatchConversions).
+    
+    Attributes:
+        workers (int): Conversions run at the same time
+        queue_depth (int): Conversions allowed to wait for a free worker
+    """
+
+    def __init__(self, workers, queue_depth):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self._executor = create_process_pool(
+            workers,
+            initializer=_init_worker,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+        self._slots = threading.BoundedSemaphore(workers + queue_depth)
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @contextlib.contextmanager
+    def reserve(self):
+        """
+        Hold a place in the pool while a request uploads and converts.
+        
+        Taking the place before reading an upload means a busy server
+        refuses the request without receiving the whole file first.
+        
+        Raises:
+            ServerBusyError: If workers + queue_depth places are already held
+        """
+        if not self.try_acquire():
+            raise ServerBusyError("server is busy, please retry shortly")
+        try:
+            yield
+        finally:
+            self.release()
+
+    def try_acquire(self):
+        """
+        Take a place in the pool without waiting for one.
         
-        def file_size_str(file_path):
-            return "Unknown size"
+        Returns:
+            bool: True if a place was taken; it must be given back with release()
+        """
+        if not self._slots.acquire(blocking=False):
+            return False
+        with self._lock:
+            self._pending += 1
+        return True
+
+    def release(self):
+        """Give back a place taken with try_acquire()."""
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def run(self, function, *args):
+        """
+        Run a function in a worker process and wait for its result.
+        
+        Call this while holding a place from reserve().
+        
+        Args:
+            function: Module-level function to call
+            *args: Picklable arguments for the function
+        
+        Returns:
+            The function's return value
+        """
+        return self.submit(function, *args).result()
+
+    def submit(self, function, *args):
+        """
+        Start a function in a worker process without waiting for it.
+        
+        Call this while holding a place for the function, from reserve() or
+        try_acquire().
+        
+        Returns:
+            concurrent.futures.Future: Future for the function's return value
+        """
+        return self._executor.submit(function, *args)
+
+    def stats(self):
+        """Return the pool size and load for the status page."""
+        with self._lock:
+            pending = self._pending
+        return {
+            'workers': self.workers,
+            'queueDepth': self.queue_depth,
+            'pending': pending,
+        }
+
+    def shutdown(self):
+        """Stop the worker processes once pending conversions finish."""
+        self._executor.shutdown(wait=True)
+
+
+class BatchConversions:
+    """
+    Running conversions of one batch request and the pool places they hold.
+    
+    The request's own place from ConversionPool.reserve() covers its first
+    conversion. Each further conversion running at the same time takes an
+    extra place without waiting, and at most pool.workers of the batch's
+    conversions run at once. When no place is free, submit() waits for one
+    of the batch's own conversions to finish instead, so a batch never
+    holds more places than it has conversions running. Extra places are
+    given back as conversions finish, and all of them by close().
+    
+    Attributes:
+        pending (dict): Running futures, mapped to their file indexes
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.pending = {}
+        self._extra_places = 0
+
+    def submit(self, index, function, *args):
+        """
+        Start a conversion, first waiting for a place if the batch needs one.
+        
+        Args:
+            index (int): File index reported with the conversion's outcome
+            function: Module-level function to run in a worker process
+            *args: Picklable arguments for the function
+        
+        Returns:
+            list: (index, outcome) pairs of conversions that finished while
+            waiting for a place
+        """
+        finished = []
+        while len(self.pending) >= self.pool.workers or (
+                len(self.pending) > self._extra_places and not self._take_place()):
+            done, _ = wait(list(self.pending), return_when=FIRST_COMPLETED)
+            finished.extend(self._collect(future) for future in done)
+        self.pending[self.pool.submit(function, *args)] = index
+        return finished
+
+    def as_completed(self):
+        """
+        Wait for the running conversions.
+        
+        Yields:
+            tuple: (index, outcome) for each conversion as it finishes; the
+            outcome is the function's result or the exception it raised
+        """
+        for future in as_completed(list(self.pending)):
+            yield self._collect(future)
+
+    def close(self):
+        """Stop conversions that have not started, wait for the rest and give back every extra place."""
+        for future in self.pending:
+            future.cancel()
+        wait(self.pending)
+        self.pending.clear()
+        while self._extra_places:
+            self._give_back_place()
+
+    def _take_place(self):
+        if not self.pool.try_acquire():
+            return False
+        self._extra_places += 1
+        return True
+
+    def _give_back_place(self):
+        self._extra_places -= 1
+        self.pool.release()
+
+    def _collect(self, future):
+        index = self.pending.pop(future)
+        if self._extra_places:
+            self._give_back_place()
+        return index, _future_outcome(future)
+
+
+class ConversionServer(ThreadingMixIn, HTTPServer):
+    """
+    HTTP server handling each request on its own thread.
+    
+    Attributes:
+        pool (ConversionPool): Worker processes running the conversions
+        work_dir (str): Temporary directory for uploads and their outputs,
+            removed when the server is closed
+        downloads (DownloadStore): Converted files waiting to be downloaded,
+            spilled to a directory inside work_dir
+    """
+
+    daemon_threads = True
+    request_queue_size = 64
+
+    def __init__(self, server_address, handler_class, workers=1, queue_depth=DEFAULT_QUEUE_DEPTH,
+                 download_bytes=DEFAULT_STORE_SIZE, download_ttl=DEFAULT_TTL):
+        super().__init__(server_address, handler_class)
+        self.pool = ConversionPool(workers, queue_depth)
+        self.work_dir = tempfile.mkdtemp(prefix='base64-converter-web-')
+        self.downloads = DownloadStore(os.path.join(self.work_dir, 'downloads'),
+                                       max_bytes=download_bytes, ttl=download_ttl)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown()
+        self.downloads.clear()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
 
 def get_package_file_path(filename):
     """Get the path to a file within the package"""
@@ -119,7 +551,11 @@ class ConversionHandler(BaseHTTPRequestHandler):
         """Handle POST requests - file uploads and conversion"""
         path = urlparse(self.path).path
         
-        if path == '/convert':
+        if path == '/upload':
+            self.handle_upload()
+        elif path == '/convert/batch':
+            self.handle_batch()
+        elif path == '/convert':
             self.handle_conversion()
         else:
             self.send_error(404)
@@ -159,81 +595,176 @@ class ConversionHandler(BaseHTTPRequestHandler):
                 });
             }
 
-            // Enhanced file processing that uses the Python backend
+            // Enhanced file processing that uses the Python backend: all files
+            // go to the server in one request and come back as one zip archive
             async function processFiles() {
                 const totalFiles = selectedFiles.length;
-                let processedFiles = 0;
                 conversionResults = [];
 
-                for (let i = 0; i < selectedFiles.length; i++) {
-                    const file = selectedFiles[i];
-                    const conversionDirection = determineConversionDirection(file.name);
-                    
-                    logMessage('info', `[${i + 1}/${totalFiles}] ${conversionDirection}: ${file.name}`);
-                    
-                    try {
-                        // Convert file to base64 for transmission
-                        const fileData = await fileToBase64(file);
-                        
-                        const response = await fetch('/convert', {
-                            method: 'POST',
-                            headers: {
-                                'Content-Type': 'application/json',
-                            },
-                            body: JSON.stringify({
-                                fileName: file.name,
-                                fileData: fileData,
-                                fileSize: file.size,
-                                conversionMode: document.getElementById('conversionMode').value
-                            })
-                        });
-                        
-                        const result = await response.json();
-                        
-                        if (result.success) {
+                const formData = new FormData();
+                selectedFiles.forEach((file, index) => {
+                    logMessage('info', `[${index + 1}/${totalFiles}] ${determineConversionDirection(file.name)}: ${file.name}`);
+                    formData.append('files', file, file.name);
+                });
+                const query = new URLSearchParams({
+                    mode: document.getElementById('conversionMode').value
+                });
+
+                try {
+                    const response = await fetch('/convert/batch?' + query.toString(), {
+                        method: 'POST',
+                        body: formData
+                    });
+                    if (!response.ok) {
+                        const failure = await response.json();
+                        throw new Error(failure.error);
+                    }
+                    updateProgress(50);
+
+                    const archive = await response.blob();
+                    const members = await readZipDirectory(archive);
+                    if (!members.has('summary.json')) {
+                        throw new Error('The archive has no summary.json');
+                    }
+                    const summary = JSON.parse(await (await readZipMember(archive, members.get('summary.json'))).text());
+
+                    summary.files.forEach(entry => {
+                        const conversionType = determineConversionDirection(entry.inputFile);
+                        if (entry.success) {
                             conversionResults.push({
                                 success: true,
-                                inputFile: file.name,
-                                outputFile: result.outputFile,
-                                conversionType: conversionDirection,
-                                fileSize: formatFileSize(file.size),
-                                downloadUrl: result.downloadUrl
+                                inputFile: entry.inputFile,
+                                outputFile: entry.outputFile,
+                                conversionType: conversionType,
+                                fileSize: formatFileSize(entry.inputBytes),
+                                archive: archive,
+                                member: members.get(entry.outputFile)
                             });
-                            logMessage('success', `✅ Successfully converted: ${file.name} → ${result.outputFile}`);
+                            logMessage('success', `✅ Successfully converted: ${entry.inputFile} → ${entry.outputFile}`);
                         } else {
                             conversionResults.push({
                                 success: false,
-                                inputFile: file.name,
-                                error: result.error,
-                                conversionType: conversionDirection
+                                inputFile: entry.inputFile,
+                                error: entry.error,
+                                conversionType: conversionType
                             });
-                            logMessage('error', `❌ Failed to convert: ${file.name} - ${result.error}`);
+                            logMessage('error', `❌ Failed to convert: ${entry.inputFile} - ${entry.error}`);
                         }
-                    } catch (error) {
+                    });
+
+                    if (summary.successful > 0) {
+                        saveBlob(archive, 'converted.zip');
+                        logMessage('info', `💾 ${summary.successful} converted file(s) saved in converted.zip`);
+                    }
+                } catch (error) {
+                    selectedFiles.forEach(file => {
                         conversionResults.push({
                             success: false,
                             inputFile: file.name,
                             error: error.message,
-                            conversionType: conversionDirection
+                            conversionType: determineConversionDirection(file.name)
                         });
-                        logMessage('error', `❌ Error processing: ${file.name} - ${error.message}`);
-                    }
-                    
-                    processedFiles++;
-                    updateProgress((processedFiles / totalFiles) * 100);
+                    });
+                    logMessage('error', `❌ Batch conversion failed: ${error.message}`);
                 }
-                
+
+                updateProgress(100);
                 finishConversion();
             }
 
-            // Helper function to convert file to base64
-            function fileToBase64(file) {
-                return new Promise((resolve, reject) => {
-                    const reader = new FileReader();
-                    reader.readAsDataURL(file);
-                    reader.onload = () => resolve(reader.result);
-                    reader.onerror = error => reject(error);
-                });
+            // List the members of the batch archive from its central directory,
+            // without loading the whole archive into memory
+            async function readZipDirectory(archive) {
+                const view = async (start, end) => new DataView(await archive.slice(start, end).arrayBuffer());
+                const record = await view(archive.size - 22, archive.size);
+                if (record.byteLength < 22 || record.getUint32(0, true) !== 0x06054b50) {
+                    throw new Error('The server did not return a zip archive');
+                }
+                let directorySize = record.getUint32(12, true);
+                let directoryOffset = record.getUint32(16, true);
+                if (directoryOffset === 0xFFFFFFFF || directorySize === 0xFFFFFFFF) {
+                    // ZIP64 archive: the locator before the end record points to the ZIP64 end record
+                    const locator = await view(archive.size - 42, archive.size - 22);
+                    const zip64Offset = Number(locator.getBigUint64(8, true));
+                    const zip64Record = await view(zip64Offset, zip64Offset + 56);
+                    directorySize = Number(zip64Record.getBigUint64(40, true));
+                    directoryOffset = Number(zip64Record.getBigUint64(48, true));
+                }
+
+                const directory = await view(directoryOffset, directoryOffset + directorySize);
+                const members = new Map();
+                let position = 0;
+                while (position + 46 <= directory.byteLength) {
+                    const method = directory.getUint16(position + 10, true);
+                    let compressedSize = directory.getUint32(position + 20, true);
+                    const fileSize = directory.getUint32(position + 24, true);
+                    const nameLength = directory.getUint16(position + 28, true);
+                    const extraLength = directory.getUint16(position + 30, true);
+                    const commentLength = directory.getUint16(position + 32, true);
+                    let headerOffset = directory.getUint32(position + 42, true);
+                    const name = new TextDecoder().decode(
+                        new Uint8Array(directory.buffer, position + 46, nameLength));
+
+                    // The ZIP64 extra field holds, in order, the 64-bit values of
+                    // whichever sizes and offset are 0xFFFFFFFF above
+                    let extra = position + 46 + nameLength;
+                    while (extra + 4 <= position + 46 + nameLength + extraLength) {
+                        const extraSize = directory.getUint16(extra + 2, true);
+                        if (directory.getUint16(extra, true) === 0x0001) {
+                            let value = extra + 4;
+                            if (fileSize === 0xFFFFFFFF) {
+                                value += 8;
+                            }
+                            if (compressedSize === 0xFFFFFFFF) {
+                                compressedSize = Number(directory.getBigUint64(value, true));
+                                value += 8;
+                            }
+                            if (headerOffset === 0xFFFFFFFF) {
+                                headerOffset = Number(directory.getBigUint64(value, true));
+                            }
+                            break;
+                        }
+                        extra += 4 + extraSize;
+                    }
+
+                    members.set(name, { method, compressedSize, headerOffset });
+                    position += 46 + nameLength + extraLength + commentLength;
+                }
+                return members;
+            }
+
+            // Get one member of the batch archive as a Blob; stored members are
+            // sliced out of the archive, deflated ones decompressed as a stream
+            async function readZipMember(archive, member) {
+                const header = new DataView(await archive.slice(member.headerOffset, member.headerOffset + 30).arrayBuffer());
+                const dataOffset = member.headerOffset + 30 + header.getUint16(26, true) + header.getUint16(28, true);
+                const data = archive.slice(dataOffset, dataOffset + member.compressedSize);
+                if (member.method === 0) {
+                    return data;
+                }
+                if (member.method !== 8 || typeof DecompressionStream === 'undefined') {
+                    throw new Error('This browser cannot extract the file; use converted.zip instead');
+                }
+                return new Response(data.stream().pipeThrough(new DecompressionStream('deflate-raw'))).blob();
+            }
+
+            // Offer a Blob to the user as a file download
+            function saveBlob(blob, fileName) {
+                const link = document.createElement('a');
+                link.href = URL.createObjectURL(blob);
+                link.download = fileName;
+                link.click();
+                setTimeout(() => URL.revokeObjectURL(link.href), 60000);
+            }
+
+            // Download the output of one converted file from the batch archive
+            async function downloadResult(index) {
+                const result = conversionResults[index];
+                try {
+                    saveBlob(await readZipMember(result.archive, result.member), result.outputFile);
+                } catch (error) {
+                    logMessage('error', `❌ Could not extract ${result.outputFile}: ${error.message}`);
+                }
             }
 
             // Update the displayResults function to handle download links
@@ -243,7 +774,7 @@ class ConversionHandler(BaseHTTPRequestHandler):
                 
                 resultsGrid.innerHTML = '';
                 
-                conversionResults.forEach(result => {
+                conversionResults.forEach((result, index) => {
                     const resultCard = document.createElement('div');
                     resultCard.className = `result-card ${result.success ? '' : 'error'}`;
                     
@@ -254,7 +785,7 @@ class ConversionHandler(BaseHTTPRequestHandler):
                             <p><strong>Output:</strong> ${result.outputFile}</p>
                             <p><strong>Size:</strong> ${result.fileSize}</p>
                             <button class="btn" style="margin-top: 10px; padding: 5px 10px; font-size: 0.8rem;" 
-                                    onclick="window.open('${result.downloadUrl}', '_blank')">
+                                    onclick="downloadResult(${index})">
                                 💾 Download
                             </button>
                         `;
@@ -291,8 +822,306 @@ class ConversionHandler(BaseHTTPRequestHandler):
         except Exception as e:
             self.send_error(500, f"Error serving HTML: {str(e)}")
     
+    def handle_upload(self):
+        """Handle raw file uploads: POST /upload?name=<file name>&mode=<mode>"""
+        upload_path = output_path = None
+        try:
+            query = parse_qs(urlparse(self.path).query)
+            file_name = os.path.basename(query.get('name', [''])[0])
+            conversion_mode = query.get('mode', ['auto'])[0]
+            try:
+                content_length = int(self.headers.get('Content-Length', ''))
+            except ValueError:
+                content_length = -1
+            if not file_name or content_length < 0:
+                # The body is left unread, so the connection cannot be reused
+                self.close_connection = True
+                self.send_json(400, {
+                    'success': False,
+                    'error': 'Upload needs a name parameter and a Content-Length header'
+                })
+                return
+            
+            direction = conversion_direction(file_name, CONVERSION_MODES.get(conversion_mode, 'auto'))
+            if direction is None:
+                self.close_connection = True
+                self.send_json(200, {'success': False, 'error': f'Unsupported file type: {file_name}'})
+                return
+            
+            # Take a place in the pool before receiving the file, then spool
+            # it to disk and convert it from there in a worker process
+            with self.server.pool.reserve():
+                fd, upload_path = tempfile.mkstemp(prefix='upload-', dir=self.server.work_dir)
+                output_path = upload_path + '.out'
+                with open(fd, 'wb') as upload_file:
+                    self.receive_body(upload_file, content_length)
+                result = self.server.pool.run(
+                    _convert_upload_file, upload_path, file_name, direction, output_path
+                )
+            
+            self.send_json(200, self.conversion_response(
+                result, file_name, lambda: self.server.downloads.add_file(output_path, result.output_path)
+            ))
+            
+        except ServerBusyError as e:
+            self.close_connection = True
+            self.send_json(503, {'success': False, 'error': str(e)},
+                           {'Retry-After': str(RETRY_AFTER_SECONDS)})
+        except Exception as e:
+            self.close_connection = True
+            self.send_json(500, {'success': False, 'error': str(e)})
+        finally:
+            for path in (upload_path, output_path):
+                if path is not None:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+    
+    def handle_batch(self):
+        """Handle batch conversions: POST /convert/batch?mode=<mode> with multipart/form-data files"""
+        batch_dir = None
+        headers_sent = False
+        try:
+            query = parse_qs(urlparse(self.path).query)
+            conversion_mode = CONVERSION_MODES.get(query.get('mode', ['auto'])[0], 'auto')
+            try:
+                content_length = int(self.headers.get('Content-Length', ''))
+            except ValueError:
+                content_length = -1
+            if self.headers.get_content_type() != 'multipart/form-data' or content_length < 0:
+                self.close_connection = True
+                self.send_json(400, {
+                    'success': False,
+                    'error': 'Batch upload needs a multipart/form-data body with a Content-Length header'
+                })
+                return
+            parser = MultipartParser(self.headers.get_param('boundary'))
+            
+            with self.server.pool.reserve():
+                conversions = BatchConversions(self.server.pool)
+                try:
+                    batch_dir = tempfile.mkdtemp(prefix='batch-', dir=self.server.work_dir)
+                    files, finished = self.receive_batch(parser, content_length, conversion_mode,
+                                                         batch_dir, conversions)
+                    if not files:
+                        self.send_json(400, {'success': False, 'error': 'No files in batch upload'})
+                        return
+                    
+                    # The archive goes out while later conversions still run; its
+                    # length is unknown, so the end of the response marks its end
+                    self.close_connection = True
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/zip')
+                    self.send_header('Content-Disposition', f'attachment; filename="{BATCH_ARCHIVE_NAME}"')
+                    self.end_headers()
+                    headers_sent = True
+                    
+                    with zipfile.ZipFile(self.wfile, 'w') as archive:
+                        member_names = {BATCH_SUMMARY_MEMBER}
+                        for index, outcome in itertools.chain(finished, conversions.as_completed()):
+                            self.add_batch_output(archive, member_names, files[index], outcome)
+                    
+                        successful = sum(1 for entry in files if entry['success'])
+                        summary = {
+                            'successful': successful,
+                            'failed': len(files) - successful,
+                            'files': [{key: value for key, value in entry.items() if not key.startswith('_')}
+                                      for entry in files]
+                        }
+                        archive.writestr(BATCH_SUMMARY_MEMBER, json.dumps(summary, indent=2))
+                finally:
+                    # Stop the rest of an abandoned batch before giving up its places
+                    conversions.close()
+            
+            print(f"✅ Batch converted: {successful} of {len(files)} file(s)")
+            
+        except ServerBusyError as e:
+            self.close_connection = True
+            self.send_json(503, {'success': False, 'error': str(e)},
+                           {'Retry-After': str(RETRY_AFTER_SECONDS)})
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+            print(f"⚠️  Batch request interrupted: {self.path}")
+        except Exception as e:
+            self.close_connection = True
+            if headers_sent:
+                # Too late for an error response; the archive is left incomplete
+                print(f"❌ Batch error: {e}")
+            else:
+                status = 400 if isinstance(e, (MultipartError, ConnectionError)) else 500
+                self.send_json(status, {'success': False, 'error': str(e)})
+        finally:
+            if batch_dir is not None:
+                shutil.rmtree(batch_dir, ignore_errors=True)
+    
+    def receive_batch(self, parser, length, conversion_mode, batch_dir, conversions):
+        """
+        Spool the files of a batch upload and start converting them.
+        
+        Each file part is written to batch_dir as it arrives and submitted
+        to the pool once complete. Each running conversion holds a place in
+        the pool (see BatchConversions); when the batch cannot run another
+        one, reading the upload waits for one of its conversions to finish.
+        
+        Args:
+            parser (MultipartParser): Parser for the request body
+            length (int): Content-Length of the request
+            conversion_mode (str): Converter direction: 'auto', 'encode' or 'decode'
+            batch_dir (str): Directory for the batch's temporary files
+            conversions (BatchConversions): Receives the started conversions
+        
+        Returns:
+            tuple: (files, finished) where files lists one summary entry per
+            uploaded file and finished holds (index, outcome) pairs of
+            conversions that completed during the upload
+        
+        Raises:
+            MultipartError: If the body is not valid multipart/form-data
+            ConnectionError: If the client sends fewer than length bytes
+        """
+        files = []
+        finished = []
+        part_file = None
+        entry = None
+        
+        def handle(event, value):
+            nonlocal part_file, entry
+            if event == 'start':
+                entry = None
+                if not value.filename:
+                    return  # A plain form field or an empty file input
+                file_name = os.path.basename(value.filename.replace('\\', '/'))
+                direction = conversion_direction(file_name, conversion_mode)
+                entry = {'inputFile': file_name, 'inputBytes': 0, 'success': False}
+                files.append(entry)
+                if direction is None:
+                    entry['error'] = f'Unsupported file type: {file_name}'
+                    return
+                entry['_direction'] = direction
+                entry['_input_path'] = os.path.join(batch_dir, f'{len(files)}.in')
+                part_file = open(entry['_input_path'], 'wb')
+            elif event == 'data':
+                if entry is not None:
+                    entry['inputBytes'] += len(value)
+                if part_file is not None:
+                    part_file.write(value)
+            elif part_file is not None:
+                part_file.close()
+                part_file = None
+                entry['_output_path'] = entry['_input_path'] + '.out'
+                finished.extend(conversions.submit(
+                    len(files) - 1, _convert_upload_file, entry['_input_path'], entry['inputFile'],
+                    entry['_direction'], entry['_output_path']
+                ))
+        
+        try:
+            remaining = length
+            while remaining:
+                chunk = self.rfile.read(min(UPLOAD_CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise ConnectionError(f"upload ended after {length - remaining} of {length} bytes")
+                remaining -= len(chunk)
+                for event, value in parser.feed(chunk):
+                    handle(event, value)
+            parser.finish()
+        finally:
+            if part_file is not None:
+                part_file.close()
+        return files, finished
+    
+    def add_batch_output(self, archive, member_names, entry, outcome):
+        """
+        Record one batch conversion and copy its output into the archive.
+        
+        Args:
+            archive (zipfile.ZipFile): Archive being streamed to the client
+            member_names (set): Member names already used in the archive
+            entry (dict): Summary entry of the file, updated in place
+            outcome: ConversionResult, or the exception the conversion raised
+        """
+        if isinstance(outcome, Exception):
+            entry['error'] = str(outcome)
+        elif not outcome:
+            entry['error'] = f'Conversion failed: {outcome.error}'
+        else:
+            # A name already used gets a numeric suffix, e.g. 'photo_2.txt'
+            member_name = outcome.output_path
+            stem, ext = os.path.splitext(member_name)
+            counter = 1
+            while member_name in member_names:
+                counter += 1
+                member_name = f"{stem}_{counter}{ext}"
+            member_names.add(member_name)
+            
+            info = zipfile.ZipInfo.from_file(entry['_output_path'], member_name)
+            # Base64 documents compress; decoded images already are compressed
+            if entry['_direction'] == 'encode':
+                info.compress_type = zipfile.ZIP_DEFLATED
+            with open(entry['_output_path'], 'rb') as source, archive.open(info, 'w') as target:
+                shutil.copyfileobj(source, target, DOWNLOAD_CHUNK_SIZE)
+            entry.update(success=True, outputFile=member_name, outputBytes=info.file_size)
+        for key in ('_input_path', '_output_path'):
+            with contextlib.suppress(KeyError, OSError):
+                os.remove(entry[key])
+    
+    def receive_body(self, target, length):
+        """
+        Copy the request body to a file in UPLOAD_CHUNK_SIZE pieces.
+        
+        Args:
+            target: Binary file object to write to
+            length (int): Content-Length of the request
+        
+        Raises:
+            ConnectionError: If the client sends fewer than length bytes
+        """
+        remaining = length
+        while remaining:
+            chunk = self.rfile.read(min(UPLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                raise ConnectionError(f"upload ended after {length - remaining} of {length} bytes")
+            target.write(chunk)
+            remaining -= len(chunk)
+    
+    def conversion_response(self, result, file_name, keep_output):
+        """
+        Build the JSON response for a conversion and keep its output for download.
+        
+        Args:
+            result (ConversionResult): Conversion outcome, or None if the
+                file type is not supported
+            file_name (str): Uploaded file name
+            keep_output (callable): Adds the converted file to the download
+                store and returns its download ID
+        
+        Returns:
+            dict: Response with the download URL, or the error
+        """
+        if result:
+            output_file = result.output_path
+            try:
+                download_id = keep_output()
+            except DownloadTooLargeError as e:
+                return {'success': False, 'error': str(e)}
+            return {
+                'success': True,
+                'outputFile': output_file,
+                'downloadUrl': f'/download/{download_id}',
+                'message': 'Conversion completed successfully'
+            }
+        if result is None:
+            return {
+                'success': False,
+                'error': f'Unsupported file type: {file_name}'
+            }
+        return {
+            'success': False,
+            'error': f'Conversion failed: {result.error}'
+        }
+    
     def handle_conversion(self):
-        """Handle file conversion requests"""
+        """Handle file conversion requests with the file as a base64 data URL in JSON"""
         try:
             # Read the request data
             content_length = int(self.headers['Content-Length'])
@@ -300,94 +1129,45 @@ class ConversionHandler(BaseHTTPRequestHandler):
             request_data = json.loads(post_data.decode('utf-8'))
             
             # Extract file information
-            file_name = request_data['fileName']
+            file_name = os.path.basename(request_data['fileName'])
             file_data = request_data['fileData']
             conversion_mode = request_data.get('conversionMode', 'auto')
             
-            # Create temporary directories
-            temp_input_dir = tempfile.mkdtemp(prefix='converter_input_')
-            temp_output_dir = tempfile.mkdtemp(prefix='converter_output_')
+            # Decode the base64 file data
+            if file_data.startswith('data:'):
+                # Remove data URL prefix
+                header, data = file_data.split(',', 1)
+                file_content = data
+            else:
+                file_content = file_data
+            binary_data = base64.b64decode(file_content)
             
-            try:
-                # Decode the base64 file data and save to temp input directory
-                if file_data.startswith('data:'):
-                    # Remove data URL prefix
-                    header, data = file_data.split(',', 1)
-                    file_content = data
-                else:
-                    file_content = file_data
-                
-                import base64
-                binary_data = base64.b64decode(file_content)
-                
-                temp_input_file = os.path.join(temp_input_dir, file_name)
-                with open(temp_input_file, 'wb') as f:
-                    f.write(binary_data)
-                
-                # Process the file using your existing function
-                success = process_file(temp_input_file, temp_output_dir)
-                
-                if success:
-                    # Find the output file
-                    output_files = os.listdir(temp_output_dir)
-                    if output_files:
-                        output_file = output_files[0]
-                        output_path = os.path.join(temp_output_dir, output_file)
-                        
-                        # Create a download endpoint for the file
-                        download_id = str(int(time.time() * 1000))  # Simple unique ID
-                        
-                        # Store the file for download (in a real app, use a proper storage system)
-                        if not hasattr(self.server, 'download_files'):
-                            self.server.download_files = {}
-                        
-                        with open(output_path, 'rb') as f:
-                            self.server.download_files[download_id] = {
-                                'data': f.read(),
-                                'filename': output_file,
-                                'created': time.time()
-                            }
-                        
-                        response = {
-                            'success': True,
-                            'outputFile': output_file,
-                            'downloadUrl': f'/download/{download_id}',
-                            'message': 'Conversion completed successfully'
-                        }
-                    else:
-                        response = {
-                            'success': False,
-                            'error': 'No output file generated'
-                        }
-                else:
-                    response = {
-                        'success': False,
-                        'error': 'Conversion failed'
-                    }
-                
-            finally:
-                # Clean up temporary directories
-                shutil.rmtree(temp_input_dir, ignore_errors=True)
-                shutil.rmtree(temp_output_dir, ignore_errors=True)
+            # Convert in memory in a worker process; nothing is written to disk
+            direction = conversion_direction(file_name, CONVERSION_MODES.get(conversion_mode, 'auto'))
+            with self.server.pool.reserve():
+                result = self.server.pool.run(_convert_upload, binary_data, file_name, direction)
             
             # Send response
-            response_json = json.dumps(response)
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Content-length', len(response_json.encode('utf-8')))
-            self.end_headers()
-            self.wfile.write(response_json.encode('utf-8'))
+            self.send_json(200, self.conversion_response(
+                result, file_name, lambda: self.server.downloads.add_bytes(result.output_data[0], result.output_path)
+            ))
             
+        except ServerBusyError as e:
+            self.send_json(503, {'success': False, 'error': str(e)},
+                           {'Retry-After': str(RETRY_AFTER_SECONDS)})
         except Exception as e:
-            error_response = json.dumps({
-                'success': False,
-                'error': str(e)
-            })
-            self.send_response(500)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Content-length', len(error_response.encode('utf-8')))
-            self.end_headers()
-            self.wfile.write(error_response.encode('utf-8'))
+            self.send_json(500, {'success': False, 'error': str(e)})
+    
+    def send_json(self, status_code, payload, headers=None):
+        """Send a JSON response with the given status and extra headers"""
+        response_json = json.dumps(payload).encode('utf-8')
+        self.send_response(status_code)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-length', len(response_json))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(response_json)
     
     def handle_download(self):
         """Handle file download requests"""
@@ -397,101 +1177,191 @@ class ConversionHandler(BaseHTTPRequestHandler):
             download_id = path.split('/')[-1]
             
             # Check if we have the download file
-            if not hasattr(self.server, 'download_files') or download_id not in self.server.download_files:
+            opened = self.server.downloads.open(download_id)
+            if opened is None:
                 self.send_error(404, "Download file not found or expired")
                 return
             
-            file_info = self.server.download_files[download_id]
-            file_data = file_info['data']
-            filename = file_info['filename']
-            
-            # Determine content type based on file extension
-            content_type = 'application/octet-stream'
-            if filename.lower().endswith(('.txt', '.b64')):
-                content_type = 'text/plain'
-            elif filename.lower().endswith(('.jpg', '.jpeg')):
-                content_type = 'image/jpeg'
-            elif filename.lower().endswith('.png'):
-                content_type = 'image/png'
-            elif filename.lower().endswith('.gif'):
-                content_type = 'image/gif'
-            
-            # Send the file
-            self.send_response(200)
-            self.send_header('Content-Type', content_type)
-            self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
-            self.send_header('Content-Length', len(file_data))
-            self.end_headers()
-            self.wfile.write(file_data)
-            
-            print(f"✅ File downloaded: {filename} ({len(file_data)} bytes)")
+            entry, download_file = opened
+            with download_file:
+                self.send_download(entry, download_file)
             
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away; a Range request can resume the download
+            self.close_connection = True
+            print(f"⚠️  Download interrupted: {self.path}")
         except Exception as e:
             print(f"❌ Download error: {e}")
             self.send_error(500, f"Download error: {str(e)}")
     
+    def send_download(self, entry, download_file):
+        """
+        Send a stored file, honouring conditional and range requests.
+        
+        Args:
+            entry (DownloadEntry): Stored result
+            download_file: Open binary file with the result's contents
+        """
+        filename = entry.filename
+        
+        # Determine content type based on file extension
+        content_type = 'application/octet-stream'
+        if filename.lower().endswith(('.txt', '.b64')):
+            content_type = 'text/plain'
+        elif filename.lower().endswith(('.jpg', '.jpeg')):
+            content_type = 'image/jpeg'
+        elif filename.lower().endswith('.png'):
+            content_type = 'image/png'
+        elif filename.lower().endswith('.gif'):
+            content_type = 'image/gif'
+        
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None and etag_matches(if_none_match, entry.etag):
+            self.send_response(304)
+            self.send_header('ETag', entry.etag)
+            self.send_header('Accept-Ranges', 'bytes')
+            self.end_headers()
+            return
+        
+        # If-Range needs a strong match; otherwise the whole file is sent
+        byte_range = None
+        range_header = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        if range_header is not None and (if_range is None or if_range.strip() == entry.etag):
+            try:
+                byte_range = parse_byte_range(range_header, entry.size)
+            except ValueError:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{entry.size}')
+                self.send_header('Content-Length', 0)
+                self.end_headers()
+                return
+        
+        if byte_range is None:
+            first, last = 0, entry.size - 1
+            self.send_response(200)
+        else:
+            first, last = byte_range
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {first}-{last}/{entry.size}')
+        count = last - first + 1
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
+        self.send_header('Content-Length', count)
+        self.send_header('ETag', entry.etag)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.end_headers()
+        
+        if entry.data is not None:
+            view = memoryview(entry.data)
+            for offset in range(first, last + 1, DOWNLOAD_CHUNK_SIZE):
+                self.wfile.write(view[offset:min(offset + DOWNLOAD_CHUNK_SIZE, last + 1)])
+        elif count:
+            # Spilled file: the kernel copies it to the socket
+            self.connection.sendfile(download_file, first, count)
+        
+        if byte_range is None:
+            print(f"✅ File downloaded: {filename} ({entry.size} bytes)")
+        else:
+            print(f"✅ File downloaded: {filename} (bytes {first}-{last} of {entry.size})")
+    
     def serve_status(self):
         """Serve application status"""
         status = {
             'status': 'ready',
-            'message': 'Base64 Converter Web Interface is running'
+            'message': 'Base64 Converter Web Interface is running',
+            'conversions': self.server.pool.stats(),
+            'downloads': self.server.downloads.stats()
         }
-        response_json = json.dumps(status)
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Content-length', len(response_json.encode('utf-8')))
-        self.end_headers()
-        self.wfile.write(response_json.encode('utf-8'))
-
-def cleanup_old_downloads(server, max_age=3600):
-    """Clean up old download files (older than max_age seconds)"""
-    if hasattr(server, 'download_files'):
-        current_time = time.time()
-        to_remove = []
-        for download_id, file_info in server.download_files.items():
-            if current_time - file_info['created'] > max_age:
-                to_remove.append(download_id)
-        
-        for download_id in to_remove:
-            del server.download_files[download_id]
-
-def start_cleanup_thread(server):
-    """Start a background thread to clean up old files"""
-    def cleanup_worker():
-        while True:
-            time.sleep(300)  # Clean up every 5 minutes
-            cleanup_old_downloads(server)
-    
-    cleanup_thread = threading.Thread(target=cleanup_worker, daemon=True)
-    cleanup_thread.start()
-
-def main():
+        self.send_json(200, status)
+
+def parse_arguments(argv=None):
+    """
+    Parse the web server's command-line options.
+    
+    Args:
+        argv (list): Arguments to parse; defaults to sys.argv[1:]
+    
+    Returns:
+        argparse.Namespace: Parsed options, with workers resolved to a count
+    """
+    parser = argparse.ArgumentParser(
+        prog="base64-converter-web",
+        description="Serve the Base64 Image Converter web interface.",
+    )
+    parser.add_argument(
+        "--host", default=DEFAULT_HOST,
+        help=f"address to listen on (default: {DEFAULT_HOST})",
+    )
+    parser.add_argument(
+        "-p", "--port", type=int, default=DEFAULT_PORT,
+        help=f"port to listen on (default: {DEFAULT_PORT})",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=0, metavar="N",
+        help="number of worker processes running conversions "
+             "(default: 0 = one per CPU core)",
+    )
+    parser.add_argument(
+        "--queue-depth", type=int, default=DEFAULT_QUEUE_DEPTH, metavar="N",
+        help="conversions allowed to wait for a free worker before requests "
+             f"are refused with 503 (default: {DEFAULT_QUEUE_DEPTH})",
+    )
+    parser.add_argument(
+        "--download-store-size", type=parse_size, default=DEFAULT_STORE_SIZE, metavar="SIZE",
+        help="cap on converted files kept for download, in memory and on disk; "
+             "the least recently used are evicted first (default: 1G)",
+    )
+    parser.add_argument(
+        "--download-ttl", type=float, default=DEFAULT_TTL, metavar="SECONDS",
+        help=f"time a converted file stays available for download (default: {DEFAULT_TTL})",
+    )
+    parser.add_argument(
+        "--no-browser", action="store_true",
+        help="do not open the interface in a web browser",
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 0:
+        parser.error("--workers must be 0 or a positive integer")
+    if args.queue_depth < 0:
+        parser.error("--queue-depth must be 0 or a positive integer")
+    if args.download_ttl <= 0:
+        parser.error("--download-ttl must be positive")
+    if args.workers == 0:
+        args.workers = os.cpu_count() or 1
+    return args
+
+def main(argv=None):
     """Start the web server"""
-    port = 8080
-    server_address = ('localhost', port)
+    args = parse_arguments(argv)
+    port = args.port
+    server_address = (args.host, port)
+    url = f"http://{args.host}:{port}"
     
     print("=" * 80)
     print("          BASE64 IMAGE CONVERTER - WEB INTERFACE")
     print("=" * 80)
-    print(f"🚀 Starting web server on http://localhost:{port}")
+    print(f"🚀 Starting web server on {url}")
     print("📂 Make sure Base64_Converter_GUI.html is in the same directory")
     print("🔧 Python script integration: ACTIVE")
+    print(f"⚙️  Conversion workers: {args.workers} (queue depth {args.queue_depth})")
     print()
     
+    httpd = None
     try:
-        httpd = HTTPServer(server_address, ConversionHandler)
-        httpd.download_files = {}  # Storage for download files
-        
-        # Start cleanup thread
-        start_cleanup_thread(httpd)
+        httpd = ConversionServer(server_address, ConversionHandler,
+                                 workers=args.workers, queue_depth=args.queue_depth,
+                                 download_bytes=args.download_store_size,
+                                 download_ttl=args.download_ttl)
         
         print(f"✅ Server started successfully!")
-        print(f"🌐 Open your browser to: http://localhost:{port}")
+        print(f"🌐 Open your browser to: {url}")
         print("⏹️  Press Ctrl+C to stop the server")
         print()
         
         # Automatically open the browser
-        threading.Timer(1.0, lambda: webbrowser.open(f'http://localhost:{port}')).start()
+        if not args.no_browser:
+            threading.Timer(1.0, lambda: webbrowser.open(url)).start()
         
         # Start serving
         httpd.serve_forever()
@@ -500,6 +1370,9 @@ def main():
         print("\n🛑 Server stopped by user")
     except Exception as e:
         print(f"❌ Error starting server: {e}")
+    finally:
+        if httpd is not None:
+            httpd.server_close()
 
 if __name__ == "__main__":
     main()
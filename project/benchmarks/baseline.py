@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Base64 Image Converter - Convert images to Base64 and vice versa
+Copyright (C) 2025 Kyle J. Coder
+Advanced Analytics & Informatics, Edward Hines Jr. VA Hospital (v12/578)
+Veterans Health Administration, Department of Veterans Affairs
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+Shared baseline file for the benchmark scripts.
+
+Each script saves its results under its own section of one JSON file, so
+a single committed baseline (BASELINE_FILE) covers the whole suite:
+
+    {"startup": {"python": "3.12.3", "platform": "linux",
+                 "settings": {"runs": 20}, "results": {...}},
+     "throughput": {...}, "header_probe": {...}}
+
+Saving a section leaves the other sections in the file untouched. Files
+written by older versions of bench_throughput.py, which held a single
+benchmark's results at the top level, are still read.
+
+The committed numbers were measured on one development machine; timings
+depend on the hardware, so regenerate the baseline on the machine that
+runs the comparison (e.g. the CI runner) before relying on it.
+"""
+
+import json
+import os
+import sys
+
+# Baseline committed with the benchmarks, used when no file is named
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def add_baseline_arguments(parser):
+    """Add --save-baseline and --compare, both defaulting to BASELINE_FILE."""
+    parser.add_argument("--save-baseline", metavar="FILE", nargs="?", const=BASELINE_FILE,
+                        help="write the results as a baseline (default file: benchmarks/baseline.json)")
+    parser.add_argument("--compare", metavar="FILE", nargs="?", const=BASELINE_FILE,
+                        help="compare the results with a baseline (default file: benchmarks/baseline.json)")
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_baseline(path, section):
+    """
+    Read one benchmark's results from a baseline file.
+
+    Args:
+        path (str): Baseline JSON file
+        section (str): Benchmark name, e.g. 'startup'
+
+    Returns:
+        dict: Results keyed by case name; empty if the file has no such section
+
+    Raises:
+        SystemExit: If the file cannot be read
+    """
+    try:
+        data = _read(path)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"❌ Cannot read baseline {path}: {e}") from None
+    if section in data:
+        return data[section].get("results", {})
+    # Single-benchmark layout written before sections were introduced
+    return data.get("results", {})
+
+
+def save_baseline(path, section, results, **settings):
+    """
+    Write one benchmark's results into a baseline file.
+
+    Args:
+        path (str): Baseline JSON file; created if missing
+        section (str): Benchmark name, e.g. 'startup'
+        results (dict): Results keyed by case name
+        **settings: Options the results were measured with (e.g. runs=20)
+    """
+    data = _read(path) if os.path.exists(path) else {}
+    if "results" in data:
+        data = {}
+    data[section] = {
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "settings": settings,
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(data.items())), f, indent=2)
+        f.write("\n")
+
+
+def compare_timings(results, baseline, metric, max_slowdown):
+    """
+    Compare a lower-is-better timing metric with a baseline.
+
+    Args:
+        results (dict): Current results keyed by case name
+        baseline (dict): Baseline results keyed by case name
+        metric (str): Field holding the timing, e.g. 'median_ms'
+        max_slowdown (float): Allowed growth as a fraction of the baseline
+
+    Returns:
+        dict: Per-case {'ratio', 'regressed'} for cases timed in both
+    """
+    comparison = {}
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not current or not previous or not current.get(metric) or not previous.get(metric):
+            continue
+        ratio = current[metric] / previous[metric]
+        comparison[name] = {"ratio": round(ratio, 3), "regressed": ratio > 1.0 + max_slowdown}
+    return comparison
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Base64 Image Converter - Convert images to Base64 and vice versa
+Copyright (C) 2025 Kyle J. Coder
+Advanced Analytics & Informatics, Edward Hines Jr. VA Hospital (v12/578)
+Veterans Health Administration, Department of Veterans Affairs
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+Contact: HinClinicalAnalytics@va.gov
+
+Micro-benchmark for image header probing.
+
+Compares the previous dimension reader, which reopened each image and
+issued many small reads, with probe_image, which parses the first chunk
+that process_image has already read for encoding. Synthetic PNG, JPEG
+(with large metadata segments before the frame header), GIF and BMP files
+are generated in a temporary directory.
+
+Results can be saved as a baseline and later runs compared against it;
+without a file name both options use the committed baseline.json (see
+baseline.py). A fixture regresses when its probe time grows by more than
+--max-slowdown; the script then exits with status 1.
+
+Usage:
+    python benchmarks/bench_header_probe.py [--number 2000] [--save-baseline [FILE]]
+        [--compare [FILE]] [--max-slowdown 0.25] [--json]
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+import tempfile
+import timeit
+import zlib
+
+# Benchmark and project directories
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, PROJECT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from baseline import add_baseline_arguments, compare_timings, load_baseline, save_baseline  # noqa: E402
+from base64_image_converter.convertIMAGE_script import ENCODE_CHUNK_SIZE, probe_image  # noqa: E402
+
+# Default regression threshold (fraction of the baseline probe time)
+DEFAULT_MAX_SLOWDOWN = 0.25
+
+
+def legacy_read_dimensions(image_path, mime_type):
+    """Dimension reader as it was before probe_image (kept for comparison)."""
+    try:
+        with open(image_path, "rb") as f:
+            if mime_type == "image/png":
+                f.read(8)
+                chunk = f.read(25)
+                if chunk[12:16] == b'IHDR':
+                    return int.from_bytes(chunk[16:20], "big"), int.from_bytes(chunk[20:24], "big")
+            elif mime_type == "image/jpeg":
+                f.read(2)
+                while True:
+                    marker, code = f.read(1), f.read(1)
+                    if marker != b'\xFF':
+                        break
+                    while code == b'\xFF':
+                        code = f.read(1)
+                    if 0xC0 <= code[0] <= 0xCF and code[0] != 0xC4 and code[0] != 0xCC:
+                        f.read(3)
+                        height = int.from_bytes(f.read(2), "big")
+                        width = int.from_bytes(f.read(2), "big")
+                        return width, height
+                    size = int.from_bytes(f.read(2), "big")
+                    f.read(size - 2)
+            elif mime_type == "image/gif":
+                header = f.read(10)
+                return int.from_bytes(header[6:8], "little"), int.from_bytes(header[8:10], "little")
+            elif mime_type == "image/bmp":
+                f.read(18)
+                return int.from_bytes(f.read(4), "little"), int.from_bytes(f.read(4), "little")
+    except Exception:
+        pass
+    return None, None
+
+
+def _png_chunk(chunk_type, data):
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+
+def make_fixtures(directory):
+    """Write synthetic images and return a list of (label, path, mime_type)."""
+    pixels = os.urandom(256 * 1024)
+    png = (b'\x89PNG\r\n\x1a\n'
+           + _png_chunk(b'IHDR', struct.pack('>IIBBBBB', 1920, 1080, 8, 2, 0, 0, 0))
+           + _png_chunk(b'IDAT', pixels) + _png_chunk(b'IEND', b''))
+
+    # EXIF/ICC-style APPn segments push the frame header past 256 KiB
+    segments = b''.join(b'\xFF' + bytes([0xE1 + i % 14]) + struct.pack('>H', 0xFFFF) + os.urandom(0xFFFD)
+                        for i in range(4))
+    jpeg = (b'\xFF\xD8' + segments
+            + b'\xFF\xC0' + struct.pack('>HBHHB', 17, 8, 3024, 4032, 3) + b'\x00' * 9
+            + b'\xFF\xDA' + pixels + b'\xFF\xD9')
+
+    gif = b'GIF89a' + struct.pack('<HH', 640, 480) + b'\x00' * 3 + pixels + b';'
+    bmp = b'BM' + struct.pack('<IHHI', 54 + len(pixels), 0, 0, 54) + struct.pack('<Iii', 40, 800, 600) + b'\x00' * 28 + pixels
+
+    fixtures = []
+    for label, name, mime_type, data in (
+        ("PNG", "image.png", "image/png", png),
+        ("JPEG (1 MiB APPn)", "image.jpg", "image/jpeg", jpeg),
+        ("GIF", "image.gif", "image/gif", gif),
+        ("BMP", "image.bmp", "image/bmp", bmp),
+    ):
+        path = os.path.join(directory, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        fixtures.append((label, path, mime_type))
+    return fixtures
+
+
+def probe_single_read(image_path):
+    """Open, read the first encode chunk and probe it, as process_image does."""
+    with open(image_path, "rb") as f:
+        return probe_image(f.read(ENCODE_CHUNK_SIZE), f)[1:]
+
+
+def main():
+    """Run the probe comparison and print, save or compare the results."""
+    parser = argparse.ArgumentParser(description="Compare header probing strategies.")
+    parser.add_argument("--number", type=int, default=2000, help="calls per measurement (default: 2000)")
+    add_baseline_arguments(parser)
+    parser.add_argument("--max-slowdown", type=float, default=DEFAULT_MAX_SLOWDOWN,
+                        help=f"allowed probe time growth vs. baseline (default: {DEFAULT_MAX_SLOWDOWN})")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for label, path, mime_type in make_fixtures(directory):
+            # The legacy path opened the file twice: once to probe, once to encode
+            def legacy():
+                legacy_read_dimensions(path, mime_type)
+                with open(path, "rb") as f:
+                    f.read(ENCODE_CHUNK_SIZE)
+
+            def single():
+                probe_single_read(path)
+
+            legacy_s = min(timeit.repeat(legacy, number=args.number, repeat=3))
+            single_s = min(timeit.repeat(single, number=args.number, repeat=3))
+            results[label] = {
+                "legacy_us": round(legacy_s / args.number * 1e6, 2),
+                "probe_us": round(single_s / args.number * 1e6, 2),
+                "legacy_dimensions": legacy_read_dimensions(path, mime_type),
+                "probe_dimensions": probe_single_read(path),
+            }
+
+    comparison = {}
+    if args.compare:
+        baseline = load_baseline(args.compare, "header_probe")
+        comparison = compare_timings(results, baseline, "probe_us", args.max_slowdown)
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, "header_probe", results, number=args.number)
+
+    regressions = [label for label, entry in comparison.items() if entry["regressed"]]
+
+    if args.json:
+        print(json.dumps({"results": results, "comparison": comparison}, indent=2))
+        return 1 if regressions else 0
+
+    print("=" * 72)
+    print("              BASE64 CONVERTER - HEADER PROBE BENCHMARK")
+    print("=" * 72)
+    print(f"Python {sys.version.split()[0]}, {args.number} calls per measurement")
+    print()
+    print(f"{'Fixture':<20}{'Legacy (us)':>13}{'Probe (us)':>12}{'Speedup':>10}{'vs. baseline':>14}  Dimensions")
+    print("-" * 86)
+    for label, result in results.items():
+        speedup = result["legacy_us"] / result["probe_us"] if result["probe_us"] else float("inf")
+        dims = result["probe_dimensions"]
+        note = "" if dims == tuple(result["legacy_dimensions"]) else f" (legacy: {result['legacy_dimensions']})"
+        delta = ""
+        if label in comparison:
+            delta = f"{(comparison[label]['ratio'] - 1) * 100:+.1f}%"
+            if comparison[label]["regressed"]:
+                delta += " ❌"
+        print(f"{label:<20}{result['legacy_us']:>13.2f}{result['probe_us']:>12.2f}{speedup:>9.2f}x"
+              f"{delta:>14}  {dims}{note}")
+
+    if args.save_baseline or args.compare:
+        print()
+    if args.save_baseline:
+        print(f"Baseline written to {args.save_baseline}")
+    if args.compare:
+        if regressions:
+            print(f"❌ {len(regressions)} fixture(s) regressed: {', '.join(regressions)}")
+        elif not comparison:
+            print(f"⚠️  No fixtures in common with {args.compare}")
+        else:
+            print(f"✓ No regressions against {args.compare}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Base64 Image Converter - Convert images to Base64 and vice versa
+Copyright (C) 2025 Kyle J. Coder
+Advanced Analytics & Informatics, Edward Hines Jr. VA Hospital (v12/578)
+Veterans Health Administration, Department of Veterans Affairs
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+Contact: HinClinicalAnalytics@va.gov
+
+Startup-time benchmark for the base64-converter command-line interface.
+
+Each scenario is run in a fresh interpreter so that module import costs are
+measured the way a cron job or container run experiences them. The
+"eager GUI imports" scenario reproduces the previous behaviour, where
+tkinter and its file dialogs were imported at module load.
+
+Results can be saved as a baseline and later runs compared against it;
+without a file name both options use the committed baseline.json (see
+baseline.py). A scenario regresses when its median time grows by more
+than --max-slowdown; the script then exits with status 1.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 20] [--save-baseline [FILE]]
+        [--compare [FILE]] [--max-slowdown 0.25] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Benchmark and project directories
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from baseline import add_baseline_arguments, compare_timings, load_baseline, save_baseline  # noqa: E402
+
+# Default regression threshold (fraction of the baseline median)
+DEFAULT_MAX_SLOWDOWN = 0.25
+
+SCENARIOS = [
+    ("interpreter only", "pass"),
+    ("import converter", "import base64_image_converter.convertIMAGE_script"),
+    ("import tkinter", "import tkinter; from tkinter import filedialog"),
+    ("eager GUI imports", "import tkinter; from tkinter import filedialog; "
+                          "import base64_image_converter.convertIMAGE_script"),
+    ("converter --help", "import sys; sys.argv = ['base64-converter', '--help']; "
+                         "from base64_image_converter.convertIMAGE_script import main; main()"),
+]
+
+
+def time_scenario(code, runs):
+    """Run a code snippet in fresh interpreters and return wall times in ms."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = PROJECT_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        elapsed = (time.perf_counter() - start) * 1000.0
+        if result.returncode != 0:
+            return None
+        timings.append(elapsed)
+    return timings
+
+
+def main():
+    """Run all startup scenarios and print, save or compare the results."""
+    parser = argparse.ArgumentParser(description="Measure converter startup time.")
+    parser.add_argument("--runs", type=int, default=20, help="runs per scenario (default: 20)")
+    add_baseline_arguments(parser)
+    parser.add_argument("--max-slowdown", type=float, default=DEFAULT_MAX_SLOWDOWN,
+                        help=f"allowed median growth vs. baseline (default: {DEFAULT_MAX_SLOWDOWN})")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for name, code in SCENARIOS:
+        timings = time_scenario(code, args.runs)
+        if timings is None:
+            results[name] = None
+        else:
+            results[name] = {
+                "median_ms": round(statistics.median(timings), 2),
+                "min_ms": round(min(timings), 2),
+            }
+
+    comparison = {}
+    if args.compare:
+        baseline = load_baseline(args.compare, "startup")
+        comparison = compare_timings(results, baseline, "median_ms", args.max_slowdown)
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, "startup", results, runs=args.runs)
+
+    regressions = [name for name, entry in comparison.items() if entry["regressed"]]
+
+    if args.json:
+        print(json.dumps({"results": results, "comparison": comparison}, indent=2))
+        return 1 if regressions else 0
+
+    print("=" * 60)
+    print("          BASE64 CONVERTER - STARTUP BENCHMARK")
+    print("=" * 60)
+    print(f"Python {sys.version.split()[0]}, {args.runs} runs per scenario")
+    print()
+    print(f"{'Scenario':<22}{'Median (ms)':>14}{'Min (ms)':>12}{'vs. baseline':>16}")
+    print("-" * 64)
+    for name, _ in SCENARIOS:
+        result = results[name]
+        if result is None:
+            print(f"{name:<22}{'unavailable':>14}")
+            continue
+        delta = ""
+        if name in comparison:
+            delta = f"{(comparison[name]['ratio'] - 1) * 100:+.1f}%"
+            if comparison[name]["regressed"]:
+                delta += " ❌"
+        print(f"{name:<22}{result['median_ms']:>14.2f}{result['min_ms']:>12.2f}{delta:>16}")
+    print()
+
+    converter = results["import converter"]
+    eager = results["eager GUI imports"]
+    if converter and eager:
+        saved = eager["median_ms"] - converter["median_ms"]
+        print(f"Lazy tkinter import saves {saved:.2f} ms per startup (median).")
+    else:
+        print("tkinter is not installed here; the eager-import comparison was skipped.")
+
+    if args.save_baseline:
+        print(f"Baseline written to {args.save_baseline}")
+    if args.compare:
+        if regressions:
+            print(f"❌ {len(regressions)} scenario(s) regressed: {', '.join(regressions)}")
+        elif not comparison:
+            print(f"⚠️  No scenarios in common with {args.compare}")
+        else:
+            print(f"✓ No regressions against {args.compare}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
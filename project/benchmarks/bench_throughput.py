@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Base64 Image Converter - Convert images to Base64 and vice versa
+Copyright (C) 2025 Kyle J. Coder
+Advanced Analytics & Informatics, Edward Hines Jr. VA Hospital (v12/578)
+Veterans Health Administration, Department of Veterans Affairs
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+Contact: HinClinicalAnalytics@va.gov
+
+Encode/decode throughput benchmark with baseline regression checks.
+
+For every fixture (see fixtures.py) the benchmark measures process_image
+(image → Base64 HTML) and process_base64_file (Base64 HTML → image). Each
+case runs in a fresh interpreter so that its peak RSS is its own. After a
+warm-up call, the median of several samples is reported as MB/s of image
+data; small files are converted repeatedly within a sample so that timer
+resolution does not dominate.
+
+Results can be saved as a baseline and later runs compared against it;
+without a file name both options use the committed baseline.json (see
+baseline.py). A case regresses when its throughput drops, or its peak
+RSS grows, by more than the given thresholds; the script then exits with
+status 1.
+
+Usage:
+    python benchmarks/bench_throughput.py [--sizes 1K,64K,1M,16M] [--formats png,jpeg]
+        [--repeat 3] [--fixtures-dir DIR] [--save-baseline [FILE]] [--compare [FILE]] [--json]
+
+The 100M and 500M size classes are not run by default; pass them with
+--sizes, and --fixtures-dir to keep the generated files between runs.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Benchmark and project directories
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from baseline import add_baseline_arguments, load_baseline, save_baseline  # noqa: E402
+from fixtures import FORMATS, SIZE_CLASSES, ensure_fixture  # noqa: E402
+
+# Size classes run when --sizes is not given
+DEFAULT_SIZES = ('1K', '64K', '1M', '16M')
+
+# Default regression thresholds (fractions of the baseline)
+DEFAULT_MAX_SLOWDOWN = 0.15
+DEFAULT_MAX_RSS_GROWTH = 0.25
+
+# Minimum duration of one timing sample; small files are converted repeatedly
+MIN_SAMPLE_SECONDS = 0.05
+
+# Code run in a fresh interpreter for each case; prints a JSON result line
+_CASE_CODE = """
+import contextlib, json, os, sys, time
+try:
+    import resource
+except ImportError:
+    resource = None
+from base64_image_converter.convertIMAGE_script import process_image, process_base64_file
+
+def max_rss():
+    if resource is None:
+        return None
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+operation, source, output_dir, repeat = sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4])
+min_sample_seconds = float(sys.argv[5])
+convert = process_image if operation == 'encode' else process_base64_file
+rss_before = max_rss()
+seconds = []
+with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+    result = convert(source, output_dir)  # Warm-up: lazy imports and caches
+    if not result:
+        sys.exit(f"conversion failed: {result.error}")
+    for _ in range(repeat):
+        # Small files are converted repeatedly so each sample is long enough to time
+        calls = 0
+        started = time.perf_counter()
+        while True:
+            convert(source, output_dir)
+            calls += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_sample_seconds:
+                break
+        seconds.append(elapsed / calls)
+print(json.dumps({'seconds': seconds, 'output_path': result.output_path,
+                  'rss_before': rss_before, 'rss_peak': max_rss()}))
+"""
+
+
+def run_case(operation, source, output_dir, repeat):
+    """Run one benchmark case in a fresh interpreter and return its result."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = PROJECT_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    completed = subprocess.run(
+        [sys.executable, "-c", _CASE_CODE, operation, source, output_dir, str(repeat),
+         str(MIN_SAMPLE_SECONDS)],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{operation} of {os.path.basename(source)} failed: {completed.stderr.strip()}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure(operation, source, output_dir, repeat, image_bytes):
+    """Measure a case and summarize it as throughput and peak RSS."""
+    case = run_case(operation, source, output_dir, repeat)
+    median_s = statistics.median(case['seconds'])
+    summary = {
+        'median_s': round(median_s, 6),
+        'mb_per_s': round(image_bytes / (1024 * 1024) / median_s, 2) if median_s > 0 else None,
+        'peak_rss_mb': None,
+        'rss_growth_mb': None,
+    }
+    if case['rss_peak'] is not None:
+        # Growth over the interpreter's footprint after imports
+        summary['peak_rss_mb'] = round(case['rss_peak'] / (1024 * 1024), 1)
+        summary['rss_growth_mb'] = round((case['rss_peak'] - case['rss_before']) / (1024 * 1024), 1)
+    return summary, case['output_path']
+
+
+def run_benchmarks(sizes, formats, repeat, fixtures_dir):
+    """Run every format/size case and return results keyed by case name."""
+    results = {}
+    work_dir = tempfile.mkdtemp(prefix='bench_throughput_')
+    try:
+        for size_class in sizes:
+            for image_format in formats:
+                source = ensure_fixture(fixtures_dir, image_format, size_class)
+                image_bytes = os.path.getsize(source)
+                case_dir = os.path.join(work_dir, f"{image_format}_{size_class}")
+                os.makedirs(os.path.join(case_dir, 'decoded'))
+
+                encoded, encoded_path = measure('encode', source, case_dir, repeat, image_bytes)
+                decoded, _ = measure('decode', encoded_path, os.path.join(case_dir, 'decoded'),
+                                     repeat, image_bytes)
+                results[f"{image_format}-{size_class}-encode"] = encoded
+                results[f"{image_format}-{size_class}-decode"] = decoded
+
+                # Outputs of large cases are not needed once measured
+                shutil.rmtree(case_dir, ignore_errors=True)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline, max_slowdown, max_rss_growth):
+    """
+    Compare results with a baseline.
+
+    Returns:
+        dict: Per-case comparison with throughput and RSS ratios and a
+        'regressed' flag, for cases present in both
+    """
+    comparison = {}
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        entry = {'regressed': False}
+        if current['mb_per_s'] and previous.get('mb_per_s'):
+            entry['speed_ratio'] = round(current['mb_per_s'] / previous['mb_per_s'], 3)
+            if entry['speed_ratio'] < 1.0 - max_slowdown:
+                entry['regressed'] = True
+        if current['peak_rss_mb'] and previous.get('peak_rss_mb'):
+            entry['rss_ratio'] = round(current['peak_rss_mb'] / previous['peak_rss_mb'], 3)
+            if entry['rss_ratio'] > 1.0 + max_rss_growth:
+                entry['regressed'] = True
+        comparison[name] = entry
+    return comparison
+
+
+def _split_list(text, allowed, label):
+    values = [value.strip() for value in text.split(',') if value.strip()]
+    unknown = [value for value in values if value not in allowed]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown {label}: {', '.join(unknown)} "
+                                         f"(choose from {', '.join(allowed)})")
+    return values
+
+
+def main():
+    """Run the throughput benchmark and print or save the results."""
+    parser = argparse.ArgumentParser(description="Measure encode/decode throughput.")
+    parser.add_argument("--sizes", default=",".join(DEFAULT_SIZES),
+                        type=lambda text: _split_list(text, SIZE_CLASSES, "size class"),
+                        help=f"comma-separated size classes (default: {','.join(DEFAULT_SIZES)}; "
+                             f"available: {','.join(SIZE_CLASSES)})")
+    parser.add_argument("--formats", default=",".join(FORMATS),
+                        type=lambda text: _split_list(text, FORMATS, "format"),
+                        help=f"comma-separated fixture formats (default: {','.join(FORMATS)})")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions per case (default: 3)")
+    parser.add_argument("--fixtures-dir", metavar="DIR",
+                        help="keep generated fixtures here and reuse them (default: temporary)")
+    add_baseline_arguments(parser)
+    parser.add_argument("--max-slowdown", type=float, default=DEFAULT_MAX_SLOWDOWN,
+                        help=f"allowed throughput drop vs. baseline (default: {DEFAULT_MAX_SLOWDOWN})")
+    parser.add_argument("--max-rss-growth", type=float, default=DEFAULT_MAX_RSS_GROWTH,
+                        help=f"allowed peak RSS growth vs. baseline (default: {DEFAULT_MAX_RSS_GROWTH})")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    temp_fixtures = None
+    fixtures_dir = args.fixtures_dir
+    if fixtures_dir is None:
+        fixtures_dir = temp_fixtures = tempfile.mkdtemp(prefix='bench_fixtures_')
+    try:
+        results = run_benchmarks(args.sizes, args.formats, args.repeat, fixtures_dir)
+    finally:
+        if temp_fixtures is not None:
+            shutil.rmtree(temp_fixtures, ignore_errors=True)
+
+    comparison = {}
+    if args.compare:
+        baseline = load_baseline(args.compare, "throughput")
+        comparison = compare(results, baseline, args.max_slowdown, args.max_rss_growth)
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, "throughput", results, repeat=args.repeat)
+
+    regressions = sorted(name for name, entry in comparison.items() if entry['regressed'])
+
+    if args.json:
+        print(json.dumps({"results": results, "comparison": comparison}, indent=2))
+    else:
+        print("=" * 78)
+        print("              BASE64 CONVERTER - THROUGHPUT BENCHMARK")
+        print("=" * 78)
+        print(f"Python {sys.version.split()[0]}, median of {args.repeat} runs per case")
+        print()
+        print(f"{'Case':<22}{'MB/s':>10}{'Median (s)':>13}{'Peak RSS (MB)':>15}{'vs. baseline':>16}")
+        print("-" * 78)
+        for name, result in results.items():
+            rss = f"{result['peak_rss_mb']:.1f}" if result['peak_rss_mb'] is not None else "n/a"
+            delta = ""
+            if name in comparison and 'speed_ratio' in comparison[name]:
+                delta = f"{(comparison[name]['speed_ratio'] - 1) * 100:+.1f}%"
+                if comparison[name]['regressed']:
+                    delta += " ❌"
+            print(f"{name:<22}{result['mb_per_s']:>10.2f}{result['median_s']:>13.4f}{rss:>15}{delta:>16}")
+        print()
+        if args.save_baseline:
+            print(f"Baseline written to {args.save_baseline}")
+        if args.compare:
+            if regressions:
+                print(f"❌ {len(regressions)} case(s) regressed: {', '.join(regressions)}")
+            elif not comparison:
+                print(f"⚠️  No cases in common with {args.compare}")
+            else:
+                print(f"✓ No regressions against {args.compare}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Base64 Image Converter - Convert images to Base64 and vice versa
+Copyright (C) 2025 Kyle J. Coder
+Advanced Analytics & Informatics, Edward Hines Jr. VA Hospital (v12/578)
+Veterans Health Administration, Department of Veterans Affairs
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+Contact: HinClinicalAnalytics@va.gov
+
+Synthetic image fixtures for the benchmark suite.
+
+Fixtures are generated in pure Python and streamed to disk, so even the
+500 MB size class never has to fit in memory. Pixel data comes from a
+seeded generator, so the same size class and format always produce the
+same bytes:
+
+    PNG   valid 24-bit image, zlib "stored" IDAT chunks
+    BMP   valid 24-bit uncompressed bitmap
+    JPEG  baseline frame headers followed by filler scan data without markers
+    GIF   valid header and image descriptor with filler LZW sub-blocks
+
+The JPEG and GIF payloads are not meant to be displayed; they only have
+to look like images to the converter's header probe and encoder.
+"""
+
+import os
+import random
+import struct
+import zlib
+
+# Size classes in bytes, from icons to very large scans
+SIZE_CLASSES = {
+    '1K': 1024,
+    '64K': 64 * 1024,
+    '1M': 1024 * 1024,
+    '16M': 16 * 1024 * 1024,
+    '100M': 100 * 1024 * 1024,
+    '500M': 500 * 1024 * 1024,
+}
+
+FORMATS = ('png', 'jpeg', 'gif', 'bmp')
+
+# File extension per fixture format
+EXTENSIONS = {'png': '.png', 'jpeg': '.jpg', 'gif': '.gif', 'bmp': '.bmp'}
+
+# Bytes of pseudo-random data generated up front and reused for filler
+_BLOCK_SIZE = 1024 * 1024
+
+# Maximum width in pixels of the generated PNG and BMP images
+_MAX_IMAGE_WIDTH = 1024
+
+# Seed for the pseudo-random pixel data of every fixture
+FIXTURE_SEED = 1234
+
+
+def _filler_block(seed, exclude=None):
+    """Return a reproducible block of pseudo-random bytes."""
+    rng = random.Random(seed)
+    block = rng.getrandbits(8 * _BLOCK_SIZE).to_bytes(_BLOCK_SIZE, 'little')
+    if exclude is not None:
+        block = block.replace(exclude, b'\x00')
+    return block
+
+
+def _write_filler(out, byte_count, block):
+    """Write byte_count bytes by repeating a filler block."""
+    while byte_count > 0:
+        piece = block[:byte_count]
+        out.write(piece)
+        byte_count -= len(piece)
+
+
+def _image_width(size):
+    """Pick a roughly square width (a multiple of 4) for an RGB image."""
+    return max(4, min(_MAX_IMAGE_WIDTH, int((size / 3) ** 0.5)) // 4 * 4)
+
+
+def _png_chunk(out, chunk_type, data):
+    """Write one PNG chunk with its length and CRC."""
+    out.write(struct.pack('>I', len(data)))
+    out.write(chunk_type)
+    out.write(data)
+    out.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(chunk_type)) & 0xFFFFFFFF))
+
+
+def _write_png(out, size, seed):
+    """Write a synthetic PNG image of about size bytes."""
+    width = _image_width(size)
+    row_bytes = 1 + 3 * width  # Filter byte plus RGB pixels
+    height = max(1, size // row_bytes)
+    out.write(b'\x89PNG\r\n\x1a\n')
+    _png_chunk(out, b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+
+    block = _filler_block(seed)
+    rows_per_chunk = max(1, _BLOCK_SIZE // row_bytes)
+    compressor = zlib.compressobj(0)
+    for first_row in range(0, height, rows_per_chunk):
+        rows = min(rows_per_chunk, height - first_row)
+        scanlines = b''.join(b'\x00' + block[(r * 7) % 4096:(r * 7) % 4096 + row_bytes - 1]
+                             for r in range(first_row, first_row + rows))
+        data = compressor.compress(scanlines)
+        if data:
+            _png_chunk(out, b'IDAT', data)
+    _png_chunk(out, b'IDAT', compressor.flush())
+    _png_chunk(out, b'IEND', b'')
+
+
+def _write_bmp(out, size, seed):
+    """Write a synthetic BMP image of about size bytes."""
+    width = _image_width(size)
+    row_bytes = 3 * width  # Width is a multiple of 4, so rows need no padding
+    height = max(1, (size - 54) // row_bytes)
+    pixel_bytes = row_bytes * height
+    out.write(b'BM' + struct.pack('<IHHI', 54 + pixel_bytes, 0, 0, 54))
+    out.write(struct.pack('<IiiHHIIiiII', 40, width, height, 1, 24, 0, pixel_bytes, 2835, 2835, 0, 0))
+    _write_filler(out, pixel_bytes, _filler_block(seed))
+
+
+def _write_jpeg(out, size, seed):
+    """Write a synthetic JPEG image of about size bytes."""
+    width, height = 4000, 3000
+    out.write(b'\xFF\xD8')
+    out.write(b'\xFF\xE0' + struct.pack('>H', 16) + b'JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00')
+    out.write(b'\xFF\xC0' + struct.pack('>HBHHB', 17, 8, height, width, 3)
+              + b'\x01\x22\x00\x02\x11\x01\x03\x11\x01')
+    out.write(b'\xFF\xDA' + struct.pack('>HB', 12, 3) + b'\x01\x00\x02\x11\x03\x11\x00\x3F\x00')
+    # Entropy-coded data never contains a bare 0xFF marker byte
+    _write_filler(out, max(0, size - out.tell() - 2), _filler_block(seed, exclude=b'\xFF'))
+    out.write(b'\xFF\xD9')
+
+
+def _write_gif(out, size, seed):
+    """Write a synthetic GIF image of about size bytes."""
+    width, height = 2048, 2048
+    out.write(b'GIF89a' + struct.pack('<HHBBB', width, height, 0xF7, 0, 0))
+    out.write(_filler_block(seed)[:3 * 256])  # Global color table
+    out.write(b'\x2C' + struct.pack('<HHHHB', 0, 0, width, height, 0) + b'\x08')
+    block = _filler_block(seed + 1)
+    remaining = size - out.tell() - 2  # Room left before terminator and trailer
+    offset = 0
+    while remaining >= 2:
+        length = min(255, remaining - 1)
+        out.write(bytes([length]))
+        out.write(block[offset:offset + length])
+        offset = (offset + length) % (_BLOCK_SIZE - 256)
+        remaining -= length + 1
+    out.write(b'\x00;')
+
+
+_WRITERS = {'png': _write_png, 'jpeg': _write_jpeg, 'gif': _write_gif, 'bmp': _write_bmp}
+
+
+def fixture_path(directory, image_format, size_class):
+    """Return the file path used for a fixture."""
+    return os.path.join(directory, f"{image_format}_{size_class}{EXTENSIONS[image_format]}")
+
+
+def ensure_fixture(directory, image_format, size_class):
+    """
+    Create a fixture unless an identical one already exists.
+
+    Args:
+        directory (str): Directory holding the fixtures
+        image_format (str): One of FORMATS
+        size_class (str): One of SIZE_CLASSES
+
+    Returns:
+        str: Path of the fixture file
+    """
+    path = fixture_path(directory, image_format, size_class)
+    if os.path.exists(path):
+        return path
+    os.makedirs(directory, exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as out:
+        _WRITERS[image_format](out, SIZE_CLASSES[size_class], FIXTURE_SEED)
+    os.replace(temp_path, path)
+    return path
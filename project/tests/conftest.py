@@ -0,0 +1,51 @@
+"""Shared pytest configuration and test-data builders."""
+
+import os
+import random
+import struct
+import sys
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Samples per pixel for the 8-bit PNG color types make_png supports
+_PNG_CHANNELS = {0: 1, 2: 3, 4: 2, 6: 4}
+
+
+def random_bytes(size, seed=0):
+    """Return size reproducible pseudo-random bytes (random.randbytes needs Python 3.9)."""
+    if not size:
+        return b''
+    return random.Random(seed).getrandbits(8 * size).to_bytes(size, 'little')
+
+
+def png_chunk(chunk_type, data):
+    """Frame one PNG chunk: length, type, data and CRC."""
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+
+def make_png(width=3, height=2, color_type=0, seed=None, scanlines=None, extra_chunks=()):
+    """
+    Build a small, valid 8-bit PNG.
+
+    Args:
+        width, height: Image dimensions
+        color_type: PNG color type (0 grayscale, 2 RGB, 4 gray + alpha, 6 RGBA)
+        seed: If given, the pixels are random and stored uncompressed, so the file
+            is about as large as the pixel data
+        scanlines: Raw scanlines (filter bytes included) to use instead of zeros
+        extra_chunks: Framed chunks to insert between IHDR and IDAT
+
+    Returns:
+        bytes: The PNG file
+    """
+    row_size = width * _PNG_CHANNELS[color_type]
+    if seed is not None:
+        pixels = random_bytes(row_size * height, seed)
+        raw = b''.join(b'\x00' + pixels[row * row_size:(row + 1) * row_size] for row in range(height))
+        idat = zlib.compress(raw, 0)
+    else:
+        idat = zlib.compress(scanlines if scanlines is not None else bytes((row_size + 1) * height))
+    header = struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + png_chunk(b'IHDR', header) + b''.join(extra_chunks)
+            + png_chunk(b'IDAT', idat) + png_chunk(b'IEND', b''))
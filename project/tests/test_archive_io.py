@@ -0,0 +1,187 @@
+"""Tests for writing batch output to archives and reading archive inputs."""
+
+import base64
+import io
+import json
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from base64_image_converter import archive_io
+from base64_image_converter.archive_io import (INDEX_MEMBER, ArchiveReader, ArchiveWriter, archive_kind,
+                                               get_reader, input_exists, iter_archive_members, open_input,
+                                               split_archive_path)
+from base64_image_converter.convertIMAGE_script import ConversionResult, main
+
+from conftest import make_png
+
+
+@pytest.fixture(autouse=True)
+def fresh_readers():
+    archive_io._forget_readers()
+    yield
+    for reader in archive_io._readers.values():
+        reader.close()
+    archive_io._forget_readers()
+
+
+def read_archive(path):
+    """Return {member name: contents} in archive order."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            return {name: archive.read(name) for name in archive.namelist()}
+    with tarfile.open(path) as archive:
+        return {info.name: archive.extractfile(info).read() for info in archive if info.isfile()}
+
+
+@pytest.mark.parametrize('name, kind', [
+    ('out.zip', 'zip'),
+    ('OUT.ZIP', 'zip'),
+    ('out.tar', 'w'),
+    ('out.tar.gz', 'w:gz'),
+    ('out.tgz', 'w:gz'),
+    ('out.tar.bz2', 'w:bz2'),
+    ('out.tbz2', 'w:bz2'),
+    ('out.tar.xz', 'w:xz'),
+    ('out.txz', 'w:xz'),
+    ('out.gz', None),
+    ('out.png', None),
+])
+def test_archive_kind(name, kind):
+    assert archive_kind(name) == kind
+
+
+@pytest.mark.parametrize('name', ['out.zip', 'out.tar', 'out.tar.gz', 'out.tar.bz2', 'out.tar.xz'])
+def test_writer_adds_members_and_index(tmp_path, name):
+    sources = {}
+    for index, contents in enumerate([b'first', b'second', b'third', b'fourth']):
+        path = tmp_path / f'{index}.out'
+        path.write_bytes(contents)
+        sources[str(path)] = contents
+    result = ConversionResult('photo.png', mime_type='image/png', input_bytes=42, width=3, height=2)
+
+    path = str(tmp_path / 'nested' / name)
+    with ArchiveWriter(path) as archive:
+        files = list(sources)
+        assert archive.add_file(files[0], 'photo.txt', result) == 'photo.txt'
+        assert archive.add_file(files[1], 'photo.txt') == 'photo_2.txt'
+        assert archive.add_file(files[2], os.path.join('sub', 'photo.txt')) == 'sub/photo.txt'
+        assert archive.add_file(files[3], INDEX_MEMBER) == 'index_2.jsonl'
+    assert archive.member_count == 4
+    assert not os.path.exists(path + '.part')
+
+    members = read_archive(path)
+    assert list(members) == ['photo.txt', 'photo_2.txt', 'sub/photo.txt', 'index_2.jsonl', INDEX_MEMBER]
+    assert list(members.values())[:4] == list(sources.values())
+    index = [json.loads(line) for line in members[INDEX_MEMBER].splitlines()]
+    assert index[0] == {'member': 'photo.txt', 'bytes': 5, 'source': 'photo.png', 'mime_type': 'image/png',
+                        'source_bytes': 42, 'width': 3, 'height': 2}
+    assert index[1] == {'member': 'photo_2.txt', 'bytes': 6}
+    assert [entry['member'] for entry in index] == list(members)[:4]
+
+
+def test_writer_discards_archive_on_error(tmp_path):
+    path = str(tmp_path / 'out.zip')
+    source = tmp_path / 'a.out'
+    source.write_bytes(b'data')
+    with pytest.raises(RuntimeError):
+        with ArchiveWriter(path) as archive:
+            archive.add_file(str(source), 'a.txt')
+            raise RuntimeError('batch failed')
+    assert os.listdir(tmp_path) == ['a.out']
+
+
+def test_writer_rejects_unknown_archive_types(tmp_path):
+    with pytest.raises(ValueError, match='unsupported archive type'):
+        ArchiveWriter(str(tmp_path / 'out.rar'))
+
+
+@pytest.fixture
+def input_archives(tmp_path):
+    png = make_png()
+    (tmp_path / 'plain.png').write_bytes(png)
+    (tmp_path / 'notes.txt').write_text('not an archive')
+    with zipfile.ZipFile(tmp_path / 'bundle.zip', 'w') as archive:
+        archive.writestr('scans/', '')
+        archive.writestr('scans/a.png', png)
+    with tarfile.open(tmp_path / 'delivery.tar.gz', 'w:gz') as archive:
+        for name in ('b.png', 'c.png'):
+            info = tarfile.TarInfo(name)
+            info.size = len(png)
+            info.mtime = 1700000000
+            archive.addfile(info, io.BytesIO(png))
+        directory = tarfile.TarInfo('empty')
+        directory.type = tarfile.DIRTYPE
+        archive.addfile(directory)
+    return tmp_path, png
+
+
+def test_split_archive_path(input_archives):
+    root, _ = input_archives
+    bundle = str(root / 'bundle.zip')
+    assert split_archive_path(os.path.join(bundle, 'scans', 'a.png')) == (bundle, 'scans/a.png')
+    assert split_archive_path(os.path.join(bundle, 'missing.png')) == (bundle, 'missing.png')
+    assert split_archive_path(bundle) is None
+    assert split_archive_path(str(root / 'plain.png')) is None
+    assert split_archive_path(str(root / 'notes.txt' / 'a.png')) is None
+    assert split_archive_path(str(root / 'missing' / 'a.png')) is None
+
+    assert input_exists(os.path.join(bundle, 'scans', 'a.png'))
+    assert not input_exists(str(root / 'missing.png'))
+
+
+def test_members_list_regular_files(input_archives):
+    root, png = input_archives
+    assert [member.name for member in iter_archive_members(str(root / 'bundle.zip'))] == ['scans/a.png']
+    members = list(iter_archive_members(str(root / 'delivery.tar.gz')))
+    assert [(member.name, member.size, member.mtime_ns) for member in members] == [
+        ('b.png', len(png), 1700000000 * 1_000_000_000),
+        ('c.png', len(png), 1700000000 * 1_000_000_000),
+    ]
+
+
+@pytest.mark.parametrize('relative_path', ['plain.png', 'bundle.zip/scans/a.png', 'delivery.tar.gz/c.png'])
+def test_open_input_streams_files_and_members(input_archives, relative_path):
+    root, png = input_archives
+    with open_input(os.path.join(str(root), *relative_path.split('/'))) as (source, size):
+        assert size == len(png)
+        assert source.read(8) == png[:8]
+        assert source.read() == png[8:]
+
+
+@pytest.mark.parametrize('member', ['missing.png', 'empty'])
+def test_open_input_missing_member(input_archives, member):
+    root, _ = input_archives
+    with pytest.raises(FileNotFoundError, match=repr(member)):
+        with open_input(os.path.join(str(root), 'delivery.tar.gz', member)):
+            pass
+
+
+def test_readers_are_reused_and_evicted(input_archives, monkeypatch):
+    root, _ = input_archives
+    monkeypatch.setattr(archive_io, 'MAX_OPEN_ARCHIVES', 1)
+    zip_reader = get_reader(str(root / 'bundle.zip'))
+    assert isinstance(zip_reader, ArchiveReader)
+    assert get_reader(os.path.join(str(root), '.', 'bundle.zip')) is zip_reader
+
+    tar_reader = get_reader(str(root / 'delivery.tar.gz'))
+    assert list(archive_io._readers.values()) == [tar_reader]
+    assert get_reader(str(root / 'bundle.zip')) is not zip_reader
+
+
+def test_cli_writes_outputs_into_one_archive(input_archives):
+    root, png = input_archives
+    path = str(root / 'out' / 'converted.zip')
+    inputs = [str(root / 'plain.png'), os.path.join(str(root), 'bundle.zip', 'scans', 'a.png')]
+    assert main(inputs + ['--archive', path, '--quiet']) == 0
+
+    members = read_archive(path)
+    assert list(members) == ['plain.txt', 'a.txt', INDEX_MEMBER]
+    assert base64.b64encode(png) in members['plain.txt']
+    assert base64.b64encode(png) in members['a.txt']
+    assert os.listdir(os.path.dirname(path)) == ['converted.zip']
+    index = [json.loads(line) for line in members[INDEX_MEMBER].splitlines()]
+    assert [(entry['source'], entry['source_bytes']) for entry in index] == \
+        [(inputs[0], len(png)), (inputs[1], len(png))]
@@ -0,0 +1,118 @@
+"""Tests for command-line parsing and headless runs of main()."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from base64_image_converter import convertIMAGE_script
+from base64_image_converter.convertIMAGE_script import main, parse_arguments
+from base64_image_converter.watch import DEFAULT_POLL_INTERVAL, DEFAULT_SETTLE_TIME
+
+from conftest import make_png
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_defaults():
+    args = parse_arguments([])
+    assert args.inputs == [] and args.output is None
+    assert (args.direction, args.recursive, args.workers, args.all_images) == ('auto', False, 1, False)
+    assert (args.include, args.exclude) == ([], [])
+    assert not args.quiet and not args.no_dialogs
+
+
+def test_options():
+    args = parse_arguments(['a.png', 'dir', '-o', 'out', '-d', 'encode', '-r', '--include', '*.png',
+                            '--include', 'scans/*', '--exclude', 'tmp', '-a', '-w', '3', '-q'])
+    assert args.inputs == ['a.png', 'dir'] and args.output == 'out'
+    assert (args.direction, args.recursive, args.all_images, args.workers, args.quiet) == \
+        ('encode', True, True, 3, True)
+    assert (args.include, args.exclude) == (['*.png', 'scans/*'], ['tmp'])
+
+
+def test_zero_workers_means_one_per_core():
+    assert parse_arguments(['-w', '0']).workers == (os.cpu_count() or 1)
+
+
+def test_watch_timing_defaults_are_left_to_watch_mode(capsys):
+    args = parse_arguments(['--watch', 'in'])
+    assert (args.settle, args.poll_interval) == (None, None)
+    assert parse_arguments(['--watch', 'in', '--settle', '0', '--poll-interval', '2']).poll_interval == 2
+    with pytest.raises(SystemExit):
+        parse_arguments(['--help'])
+    help_text = ' '.join(capsys.readouterr().out.split())
+    assert f'(default: {DEFAULT_SETTLE_TIME})' in help_text
+    assert f'(default: {DEFAULT_POLL_INTERVAL})' in help_text
+
+
+@pytest.mark.parametrize('argv', [['-w', '-1'], ['-d', 'sideways'], ['--unknown'],
+                                  ['--watch', '--settle', '-1'], ['--watch', '--poll-interval', '0']])
+def test_invalid_options_exit(argv, capsys):
+    with pytest.raises(SystemExit) as excinfo:
+        parse_arguments(argv)
+    assert excinfo.value.code == 2
+    assert 'error:' in capsys.readouterr().err
+
+
+@pytest.fixture
+def no_dialogs(monkeypatch, tmp_path):
+    """Fail the test if main() tries to open a file dialog."""
+    def dialog(*args):
+        raise AssertionError('file dialog opened in a headless run')
+    monkeypatch.setattr(convertIMAGE_script, 'select_input_file', dialog)
+    monkeypatch.setattr(convertIMAGE_script, 'select_output_directory', dialog)
+    monkeypatch.setattr(convertIMAGE_script, 'default_input_dir', str(tmp_path / 'Inputs'))
+    monkeypatch.setattr(convertIMAGE_script, 'default_output_dir', str(tmp_path / 'Outputs'))
+
+
+def test_headless_run_converts_the_given_inputs(tmp_path, no_dialogs):
+    (tmp_path / 'logo.png').write_bytes(make_png())
+    assert main([str(tmp_path / 'logo.png'), '-o', str(tmp_path / 'out'), '-q']) == 0
+    assert os.listdir(tmp_path / 'out') == ['logo.txt']
+
+
+def test_headless_run_uses_the_default_output_folder(tmp_path, no_dialogs):
+    (tmp_path / 'logo.png').write_bytes(make_png())
+    assert main([str(tmp_path / 'logo.png'), '-q']) == 0
+    assert os.listdir(tmp_path / 'Outputs') == ['logo.txt']
+
+
+def test_headless_run_fails_on_any_failed_file(tmp_path, no_dialogs, capsys):
+    (tmp_path / 'logo.png').write_bytes(make_png())
+    (tmp_path / 'empty.txt').write_text('nothing to decode')
+    assert main([str(tmp_path / 'logo.png'), str(tmp_path / 'empty.txt'), '-o', str(tmp_path / 'out')]) == 1
+    assert 'Failed conversions: 1 file(s)' in capsys.readouterr().out
+
+
+def test_headless_run_without_matching_inputs(tmp_path, no_dialogs, capsys):
+    (tmp_path / 'empty').mkdir()
+    assert main([str(tmp_path / 'empty')]) == 1
+    assert 'No convertible files' in capsys.readouterr().out
+
+
+def test_no_dialogs_with_an_empty_input_folder(no_dialogs, capsys):
+    assert main(['--no-dialogs']) == 1
+    assert 'file dialogs are disabled' in capsys.readouterr().out
+
+
+def test_parsing_does_not_load_the_watchers():
+    script = ('import sys\n'
+              'from base64_image_converter.convertIMAGE_script import parse_arguments\n'
+              'parse_arguments(["--watch", "in"])\n'
+              'print("base64_image_converter.watch" in sys.modules)\n')
+    output = subprocess.run([sys.executable, '-c', script], cwd=PROJECT_DIR, check=True,
+                            stdout=subprocess.PIPE, universal_newlines=True).stdout
+    assert output.split() == ['False']
+
+
+def test_headless_run_does_not_import_tkinter(tmp_path):
+    (tmp_path / 'logo.png').write_bytes(make_png())
+    script = ('import sys\n'
+              'from base64_image_converter.convertIMAGE_script import main\n'
+              f'status = main([{str(tmp_path / "logo.png")!r}, "-o", {str(tmp_path)!r}, "-q"])\n'
+              'print(status, "tkinter" in sys.modules)\n')
+    output = subprocess.run([sys.executable, '-c', script], cwd=PROJECT_DIR, check=True,
+                            stdout=subprocess.PIPE, universal_newlines=True).stdout
+    assert output.split() == ['0', 'False']
@@ -0,0 +1,56 @@
+"""Tests for ConversionResult, the record returned by every conversion."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from base64_image_converter.convertIMAGE_script import ConversionResult
+
+from conftest import make_png
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_truthiness_follows_success():
+    assert not ConversionResult('a.png')
+    assert ConversionResult('a.png', ['out/a.txt'])
+    assert not ConversionResult('a.png', ['out/a.txt'], error='disk full')
+
+
+def test_output_path_is_the_first_output():
+    assert ConversionResult('a.html').output_path is None
+    assert ConversionResult('a.html', ['a_001.png', 'a_002.png']).output_path == 'a_001.png'
+
+
+def test_result_is_not_a_path():
+    # Callers use result.output_path; a result must not pass for a file name
+    with pytest.raises(TypeError):
+        os.fspath(ConversionResult('a.png', ['out/a.txt']))
+
+
+def test_as_dict_is_json_serializable():
+    result = ConversionResult('a.png', ['out/a.txt'], 'image/png', 10, 40, 1, 1)
+    result.output_data = [b'not included']
+    result.codec_ns = 5
+    data = json.loads(json.dumps(result.as_dict()))
+    assert 'output_data' not in data
+    assert data['output_paths'] == ['out/a.txt']
+    assert data['codec_ns'] == 5
+    assert result.total_ns == 5
+
+
+def test_timings_without_perf_counter_ns(tmp_path):
+    # Python 3.6 has no time.perf_counter_ns; the stage clock falls back to perf_counter
+    (tmp_path / 'logo.png').write_bytes(make_png())
+    script = ('import time\n'
+              'del time.perf_counter_ns\n'
+              'from base64_image_converter.convertIMAGE_script import process_image\n'
+              f'result = process_image({str(tmp_path / "logo.png")!r}, {str(tmp_path)!r})\n'
+              'timings = [getattr(result, name) for name in result.TIMING_FIELDS]\n'
+              'print(bool(result), all(isinstance(value, int) and value >= 0 for value in timings))\n')
+    output = subprocess.run([sys.executable, '-c', script], cwd=PROJECT_DIR, check=True,
+                            stdout=subprocess.PIPE, universal_newlines=True).stdout
+    assert output.split()[-2:] == ['True', 'True']
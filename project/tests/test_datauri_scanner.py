@@ -0,0 +1,113 @@
+"""Tests for the streaming data URI scanner used by the Base64 decoder."""
+
+import base64
+import binascii
+import re
+
+import pytest
+
+from base64_image_converter.convertIMAGE_script import MAX_MIME_TYPE_LENGTH, DataURIScanner
+
+from conftest import random_bytes
+
+# The regular expression the scanner replaced
+DATA_URI_PATTERN = re.compile(rb'data:([^;]+);base64,([A-Za-z0-9+/=]+)')
+
+
+def scan(document, chunk_size=None, strict=False):
+    """Feed a document in chunks and return [(mime_type, decoded bytes)]."""
+    scanner = DataURIScanner(strict=strict)
+    chunk_size = chunk_size or len(document) or 1
+    events = []
+    for start in range(0, len(document), chunk_size):
+        events.extend(scanner.feed(document[start:start + chunk_size]))
+    events.extend(scanner.finish())
+
+    images = []
+    for kind, value in events:
+        if kind == 'start':
+            images.append([value, b''])
+        elif kind == 'data':
+            images[-1][1] += value
+        else:
+            assert value is None
+    return [tuple(image) for image in images]
+
+
+def reference(document):
+    """Decode every match of the old regular expression."""
+    return [(mime.decode(), base64.b64decode(payload)) for mime, payload in DATA_URI_PATTERN.findall(document)]
+
+
+def uri(payload, mime_type='image/png'):
+    return b'data:' + mime_type.encode() + b';base64,' + base64.b64encode(payload)
+
+
+DOCUMENTS = [
+    b'',
+    b'<p>no images</p>',
+    b'<img src="' + uri(random_bytes(1, seed=1)) + b'">',
+    b'<img src="' + uri(random_bytes(2, seed=2)) + b'"><img src="'
+    + uri(random_bytes(3, seed=3), 'image/gif') + b'">',
+    b'url(' + uri(random_bytes(1000, seed=4), 'image/jpeg') + b') data: data:text/plain,hi '
+    + uri(random_bytes(57, seed=5)),
+    b'data:data:' + uri(random_bytes(10, seed=6)) + b'data:',
+    uri(random_bytes(4096, seed=7), 'image/svg+xml'),
+]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 7, 64, None])
+@pytest.mark.parametrize('document', DOCUMENTS, ids=[f'document{i}' for i in range(len(DOCUMENTS))])
+def test_matches_regex_at_every_chunk_size(document, chunk_size):
+    assert scan(document, chunk_size) == reference(document)
+
+
+@pytest.mark.parametrize('document', [
+    b'data:text/plain,hello',
+    b'data:;base64,AAAA',
+    b'data:image/png;base64,"',
+    b'data:image/png;base64',
+    b'data:' + b'x' * (MAX_MIME_TYPE_LENGTH + 1) + b';base64,AAAA',
+])
+def test_ignores_non_base64_uris(document):
+    assert scan(document) == []
+    assert scan(document, 1) == []
+
+
+def test_longest_allowed_mime_type_is_accepted():
+    mime_type = 'x' * MAX_MIME_TYPE_LENGTH
+    assert scan(uri(b'abc', mime_type), 1) == [(mime_type, b'abc')]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, None])
+def test_lenient_mode_follows_b64decode(chunk_size):
+    # Decoding stops after the first padded block; stray '=' is ignored
+    assert scan(b'data:image/png;base64,QQ==QUJD"', chunk_size) == [('image/png', b'A')]
+    assert scan(b'data:image/png;base64,QU=JD"', chunk_size) == [('image/png', base64.b64decode(b'QU=JD'))]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, None])
+@pytest.mark.parametrize('terminator', [b'"', b"'", b')', b'<', b' ', b'\n', b''])
+def test_strict_mode_accepts_valid_payloads(terminator, chunk_size):
+    payload = random_bytes(100, seed=8)
+    assert scan(uri(payload) + terminator, chunk_size, strict=True) == [('image/png', payload)]
+
+
+@pytest.mark.parametrize('document, message', [
+    (b'data:image/png;base64,QUJDR"', 'truncated'),
+    (b'data:image/png;base64,QQ==QUJD"', 'excess data after padding'),
+    (b'data:image/png;base64,Q===', "misplaced '=' padding"),
+    (b'data:image/png;base64,QU=JD"', "'=' inside the data"),
+    (b'data:image/png;base64,QUJD!', "unexpected byte b'!'"),
+])
+@pytest.mark.parametrize('chunk_size', [1, 3, None])
+def test_strict_mode_rejects_invalid_payloads(document, message, chunk_size):
+    with pytest.raises(binascii.Error, match=re.escape(message)):
+        scan(document, chunk_size, strict=True)
+
+
+def test_buffers_little_while_searching():
+    scanner = DataURIScanner()
+    for _ in range(100):
+        assert scanner.feed(b'x' * 10000 + b'dat') == []
+    assert len(scanner._buffer) < len(b'data:')
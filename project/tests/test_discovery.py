@@ -0,0 +1,135 @@
+"""Tests for input discovery: directory scans, globs and archives found in them."""
+
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from base64_image_converter.convertIMAGE_script import expand_input_paths, iter_input_files, run_batch
+
+from conftest import make_png
+
+PNG = make_png()
+
+
+@pytest.fixture
+def plain_tree(tmp_path):
+    root = tmp_path / 'in'
+    for name in ('a.png', 'b.GIF', 'notes.txt', 'readme.md', 'sub/c.jpg', 'sub/deep/d.html',
+                 'thumbs/e.png', 'sub/thumbs/f.png'):
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(PNG)
+    return root
+
+
+@pytest.fixture
+def input_tree(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'top.png').write_bytes(PNG)
+    (tmp_path / 'readme.md').write_text('not convertible')
+    (tmp_path / 'sub' / 'nested.jpg').write_bytes(PNG)
+    with zipfile.ZipFile(tmp_path / 'sub' / 'bundle.zip', 'w') as archive:
+        archive.writestr('scans/a.png', PNG)
+        archive.writestr('scans/skip.md', 'ignored')
+    with tarfile.open(tmp_path / 'delivery.tar.gz', 'w:gz') as archive:
+        info = tarfile.TarInfo('b.png')
+        info.size = len(PNG)
+        archive.addfile(info, io.BytesIO(PNG))
+    return tmp_path
+
+
+def _found(items, root):
+    return sorted((os.path.relpath(item.path, str(root)), item.relative_dir) for item in items)
+
+
+def test_scan_selects_by_direction(plain_tree):
+    assert _found(iter_input_files(str(plain_tree), 'encode'), plain_tree) == [('a.png', ''), ('b.GIF', '')]
+    assert _found(iter_input_files(str(plain_tree), 'decode'), plain_tree) == [('notes.txt', '')]
+
+
+def test_scan_records_size_and_mtime(plain_tree):
+    for item in iter_input_files(str(plain_tree), recursive=True):
+        stat = os.stat(item.path)
+        assert (item.size, item.mtime_ns) == (stat.st_size, stat.st_mtime_ns)
+
+
+def test_recursive_scan_keeps_relative_dirs(plain_tree):
+    assert _found(iter_input_files(str(plain_tree), recursive=True), plain_tree) == [
+        ('a.png', ''),
+        ('b.GIF', ''),
+        ('notes.txt', ''),
+        (os.path.join('sub', 'c.jpg'), 'sub'),
+        (os.path.join('sub', 'deep', 'd.html'), os.path.join('sub', 'deep')),
+        (os.path.join('sub', 'thumbs', 'f.png'), os.path.join('sub', 'thumbs')),
+        (os.path.join('thumbs', 'e.png'), 'thumbs'),
+    ]
+
+
+@pytest.mark.parametrize('include, exclude, expected', [
+    (['*.png'], [], ['a.png', 'sub/thumbs/f.png', 'thumbs/e.png']),
+    (['sub/*'], [], ['sub/c.jpg', 'sub/deep/d.html', 'sub/thumbs/f.png']),
+    (['*.md'], [], ['readme.md']),
+    ([], ['thumbs'], ['a.png', 'b.GIF', 'notes.txt', 'sub/c.jpg', 'sub/deep/d.html']),
+    ([], ['sub/*'], ['a.png', 'b.GIF', 'notes.txt', 'thumbs/e.png']),
+    (['*.png', '*.jpg'], ['*/thumbs'], ['a.png', 'sub/c.jpg', 'thumbs/e.png']),
+])
+def test_include_and_exclude_patterns(plain_tree, include, exclude, expected):
+    items = iter_input_files(str(plain_tree), recursive=True, include=include, exclude=exclude)
+    expected = [os.path.join(*name.split('/')) for name in expected]
+    assert [path for path, _ in _found(items, plain_tree)] == expected
+
+
+def test_glob_keeps_dirs_below_the_fixed_prefix(plain_tree):
+    items = expand_input_paths([os.path.join(str(plain_tree), 'sub', '**', '*.png')], exclude=['deep'])
+    assert _found(items, plain_tree) == [(os.path.join('sub', 'thumbs', 'f.png'), 'thumbs')]
+
+
+def test_batch_mirrors_the_input_tree(plain_tree, tmp_path):
+    output_dir = tmp_path / 'out'
+    items = expand_input_paths([str(plain_tree)], 'encode', recursive=True, exclude=['thumbs'])
+    summary = run_batch(items, str(output_dir), quiet=True)
+    assert (summary.successful, summary.failed) == (3, 0)
+    outputs = sorted(os.path.relpath(os.path.join(path, name), str(output_dir))
+                     for path, _, names in os.walk(str(output_dir)) for name in names)
+    assert outputs == ['a.txt', 'b.txt', os.path.join('sub', 'c.txt')]
+
+
+def test_scan_lists_convertible_files(input_tree):
+    assert _found(iter_input_files(str(input_tree), 'encode'), input_tree) == [
+        (os.path.join('delivery.tar.gz', 'b.png'), ''),
+        ('top.png', ''),
+    ]
+
+
+def test_recursive_scan_expands_nested_archives(input_tree):
+    assert _found(iter_input_files(str(input_tree), 'encode', recursive=True), input_tree) == [
+        (os.path.join('delivery.tar.gz', 'b.png'), ''),
+        (os.path.join('sub', 'bundle.zip', 'scans', 'a.png'), os.path.join('sub', 'scans')),
+        (os.path.join('sub', 'nested.jpg'), 'sub'),
+        ('top.png', ''),
+    ]
+
+
+def test_excluded_archives_are_not_opened(input_tree):
+    items = iter_input_files(str(input_tree), 'encode', recursive=True, exclude=['*.zip', '*.tar.gz'])
+    assert _found(items, input_tree) == [(os.path.join('sub', 'nested.jpg'), 'sub'), ('top.png', '')]
+
+
+def test_include_patterns_select_archive_members(input_tree):
+    items = iter_input_files(str(input_tree), 'encode', recursive=True, include=['a.png'])
+    assert _found(items, input_tree) == [
+        (os.path.join('sub', 'bundle.zip', 'scans', 'a.png'), os.path.join('sub', 'scans')),
+    ]
+
+
+def test_glob_matches_expand_archives(input_tree):
+    items = expand_input_paths([os.path.join(str(input_tree), '*')], 'encode')
+    assert _found(items, input_tree) == [(os.path.join('delivery.tar.gz', 'b.png'), ''), ('top.png', '')]
+
+
+def test_named_files_are_always_kept(input_tree):
+    missing = os.path.join(str(input_tree), 'missing.png')
+    assert [item.path for item in expand_input_paths([missing])] == [missing]
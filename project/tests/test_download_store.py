@@ -0,0 +1,118 @@
+"""Tests for the web server's byte-capped download store."""
+
+import os
+
+import pytest
+
+from base64_image_converter import download_store
+from base64_image_converter.download_store import SPILL_SIZE, DownloadStore, DownloadTooLargeError
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DownloadStore(str(tmp_path / 'spill'), max_bytes=10 * SPILL_SIZE, memory_bytes=SPILL_SIZE)
+
+
+def read(store, download_id):
+    opened = store.open(download_id)
+    if opened is None:
+        return None
+    entry, download_file = opened
+    with download_file:
+        return download_file.read()
+
+
+def test_small_results_are_kept_in_memory(store):
+    download_id = store.add_bytes(b'abc', 'logo.txt')
+    entry = store.get(download_id)
+    assert (entry.filename, entry.size, entry.data, entry.path) == ('logo.txt', 3, b'abc', None)
+    assert entry.etag == f'"{download_id}"'
+    assert read(store, download_id) == b'abc'
+    assert os.listdir(store.spill_dir) == []
+    assert store.stats() == {'entries': 1, 'bytes': 3, 'memoryBytes': 3, 'maxBytes': 10 * SPILL_SIZE}
+
+
+def test_large_results_are_spilled(store):
+    data = b'x' * SPILL_SIZE
+    download_id = store.add_bytes(data, 'big.txt')
+    entry = store.get(download_id)
+    assert entry.data is None
+    assert os.path.dirname(entry.path) == store.spill_dir
+    assert read(store, download_id) == data
+    assert store.stats()['memoryBytes'] == 0
+
+
+def test_results_past_the_memory_cap_are_spilled(store):
+    first = store.add_bytes(b'a' * (SPILL_SIZE - 10), 'a.txt')
+    second = store.add_bytes(b'b' * 20, 'b.txt')
+    assert store.get(first).data is not None
+    assert store.get(second).data is None
+    assert read(store, second) == b'b' * 20
+
+
+def test_add_file_takes_over_the_file(store, tmp_path):
+    small = tmp_path / 'small.out'
+    small.write_bytes(b'small')
+    large = tmp_path / 'large.out'
+    large.write_bytes(b'L' * SPILL_SIZE)
+
+    small_id = store.add_file(str(small), 'small.txt')
+    large_id = store.add_file(str(large), 'large.txt')
+    assert not small.exists() and not large.exists()
+    assert store.get(small_id).data == b'small'
+    assert store.get(large_id).data is None
+    assert read(store, large_id) == b'L' * SPILL_SIZE
+
+
+def test_results_larger_than_the_store_are_refused(store, tmp_path):
+    with pytest.raises(DownloadTooLargeError, match='huge.txt'):
+        store.add_bytes(b'x' * (store.max_bytes + 1), 'huge.txt')
+    output = tmp_path / 'huge.out'
+    output.write_bytes(b'x' * (store.max_bytes + 1))
+    with pytest.raises(DownloadTooLargeError):
+        store.add_file(str(output), 'huge.txt')
+    assert not output.exists()
+    assert len(store) == 0 and os.listdir(store.spill_dir) == []
+
+
+def test_least_recently_used_results_are_evicted(store):
+    size = 3 * SPILL_SIZE
+    ids = [store.add_bytes(bytes([index]) * size, f'{index}.txt') for index in range(3)]
+    store.get(ids[0])  # now the most recently used
+    newest = store.add_bytes(b'n' * size, 'new.txt')
+    assert store.get(ids[1]) is None
+    assert [read(store, download_id)[:1] for download_id in (ids[0], ids[2], newest)] == [b'\x00', b'\x02', b'n']
+    assert store.stats()['bytes'] == 3 * size
+    assert len(os.listdir(store.spill_dir)) == 3
+
+
+def test_open_download_survives_eviction(store):
+    download_id = store.add_bytes(b'x' * SPILL_SIZE, 'big.txt')
+    entry, download_file = store.open(download_id)
+    with download_file:
+        store.clear()
+        assert store.get(download_id) is None
+        assert download_file.read() == b'x' * SPILL_SIZE
+    assert os.listdir(store.spill_dir) == []
+
+
+def test_results_expire(store, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(download_store.time, 'time', lambda: now[0])
+    store.ttl = 60
+    kept = store.add_bytes(b'kept', 'kept.txt')
+    spilled = store.add_bytes(b's' * SPILL_SIZE, 'spilled.txt')
+    now[0] += 60
+    assert store.get(kept) is not None
+
+    now[0] += 1
+    assert store.get(kept) is None
+    # Adding a result drops every expired entry, including their spill files
+    store.add_bytes(b'new', 'new.txt')
+    assert store.get(spilled) is None
+    assert len(store) == 1 and os.listdir(store.spill_dir) == []
+
+
+def test_unknown_ids(store):
+    assert store.get('unknown') is None
+    assert store.open('unknown') is None
@@ -0,0 +1,172 @@
+"""Tests for the content-addressed cache of Base64 encodings."""
+
+import base64
+import os
+import time
+
+import pytest
+
+from base64_image_converter import encode_cache
+from base64_image_converter.convertIMAGE_script import process_image
+from base64_image_converter.encode_cache import STALE_TEMP_AGE, STORE_TRIM_RATIO, EncodeCache, parse_size
+from base64_image_converter.manifest import file_digest
+
+from conftest import make_png
+
+
+def add_entry(cache, digest, payload='QUJD', mime_type='image/png', width=3, height=2, size=3):
+    with cache.store(digest, mime_type, width, height, size) as payload_file:
+        payload_file.write(payload)
+
+
+def age(path, seconds):
+    """Move a file's modification time the given number of seconds back."""
+    mtime = time.time() - seconds
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.mark.parametrize('text, size', [
+    ('1048576', 1048576),
+    ('0', 0),
+    ('1K', 1024),
+    ('500M', 500 * 1024 ** 2),
+    ('2g', 2 * 1024 ** 3),
+    (' 1.5GB ', 3 * 1024 ** 3 // 2),
+    ('1T', 1024 ** 4),
+])
+def test_parse_size(text, size):
+    assert parse_size(text) == size
+
+
+@pytest.mark.parametrize('text', ['', 'M', 'lots', '-1K', '1X'])
+def test_parse_size_rejects_invalid_sizes(text):
+    with pytest.raises(ValueError):
+        parse_size(text)
+
+
+def test_store_then_lookup(tmp_path):
+    cache = EncodeCache(str(tmp_path))
+    digest = 'ab' + '0' * 62
+    assert cache.lookup(digest) is None
+
+    add_entry(cache, digest, payload='QUJDRA==', width=None, height=None, size=4)
+    cached = cache.lookup(digest)
+    assert cached.payload_path == str(tmp_path / 'ab' / (digest + '.b64'))
+    assert (cached.length, cached.mime_type, cached.width, cached.height, cached.size) == \
+        (8, 'image/png', None, None, 4)
+    with open(cached.payload_path, encoding='ascii') as f:
+        assert f.read() == 'QUJDRA=='
+    assert sorted(os.listdir(tmp_path / 'ab')) == [digest + '.b64', digest + '.json']
+
+
+def test_failed_store_publishes_nothing(tmp_path):
+    cache = EncodeCache(str(tmp_path))
+    digest = 'cd' + '0' * 62
+    with pytest.raises(RuntimeError):
+        with cache.store(digest, 'image/png', 1, 1) as payload_file:
+            payload_file.write('QUJD')
+            raise RuntimeError('encoding failed')
+    assert cache.lookup(digest) is None
+    assert os.listdir(tmp_path / 'cd') == []
+
+
+def test_lookup_ignores_a_replaced_payload(tmp_path):
+    cache = EncodeCache(str(tmp_path))
+    digest = 'ef' + '0' * 62
+    add_entry(cache, digest)
+    with open(cache.lookup(digest).payload_path, 'a', encoding='ascii') as f:
+        f.write('QUJD')
+    assert cache.lookup(digest) is None
+
+
+def test_lookup_refreshes_last_use(tmp_path):
+    cache = EncodeCache(str(tmp_path))
+    digest = '12' + '0' * 62
+    add_entry(cache, digest)
+    payload_path = cache.lookup(digest).payload_path
+    age(payload_path, 3600)
+    cache.lookup(digest)
+    assert time.time() - os.path.getmtime(payload_path) < 60
+
+
+def test_trim_evicts_least_recently_used(tmp_path):
+    cache = EncodeCache(str(tmp_path), max_bytes=10 ** 9)
+    digests = [f'{index:02x}' + '0' * 62 for index in range(4)]
+    for index, digest in enumerate(digests):
+        add_entry(cache, digest, payload='A' * 1000)
+        age(cache.lookup(digest).payload_path, 100 * (len(digests) - index))
+    cache.lookup(digests[0])  # now the most recently used
+    assert cache.trim() == 0
+
+    cache.max_bytes = 2500
+    assert cache.trim() == 2
+    assert [digest for digest in digests if cache.lookup(digest)] == [digests[0], digests[3]]
+
+
+def test_trim_removes_stale_temporary_files(tmp_path):
+    cache = EncodeCache(str(tmp_path), max_bytes=0)
+    (tmp_path / 'ab').mkdir()
+    stale = tmp_path / 'ab' / '.entry_stale.tmp'
+    fresh = tmp_path / 'ab' / '.entry_fresh.tmp'
+    stale.write_text('x')
+    fresh.write_text('x')
+    age(stale, STALE_TEMP_AGE + 60)
+    assert cache.trim() == 0
+    assert not stale.exists() and fresh.exists()
+
+
+def test_trim_without_cache_directory(tmp_path):
+    assert EncodeCache(str(tmp_path / 'missing')).trim() == 0
+
+
+def cache_size(cache_dir):
+    return sum(os.path.getsize(os.path.join(directory, name))
+               for directory, _, names in os.walk(cache_dir) for name in names)
+
+
+def test_store_trims_once_the_cache_passes_its_cap(tmp_path):
+    cache = EncodeCache(str(tmp_path), max_bytes=5000)
+    digests = [f'{index:02x}' + '0' * 62 for index in range(10)]
+    for index, digest in enumerate(digests):
+        add_entry(cache, digest, payload='A' * 1000)
+        age(cache.lookup(digest).payload_path, 100 * (len(digests) - index))
+        assert cache_size(tmp_path) <= 5000
+    # The overfull cache was trimmed below the cap, keeping the newest entries
+    kept = [digest for digest in digests if cache.lookup(digest)]
+    assert kept == digests[-len(kept):]
+    assert len(kept) < 5
+    assert cache_size(tmp_path) <= 5000 * STORE_TRIM_RATIO + 1100
+
+
+def test_store_rescans_for_entries_from_other_processes(tmp_path, monkeypatch):
+    monkeypatch.setattr(encode_cache, 'RESCAN_EVERY_STORES', 2)
+    cache = EncodeCache(str(tmp_path), max_bytes=5000)
+    other = EncodeCache(str(tmp_path), max_bytes=10 ** 9)
+    add_entry(cache, 'aa' + '0' * 62, payload='A' * 1000)
+    for index in range(8):
+        add_entry(other, f'{index:02x}' + '1' * 62, payload='A' * 1000)
+    for index in range(3):
+        add_entry(cache, f'{index:02x}' + '2' * 62, payload='A' * 100)
+    assert cache_size(tmp_path) <= 5000
+
+
+def test_process_image_reuses_cached_encoding(tmp_path):
+    png = make_png()
+    cache = EncodeCache(str(tmp_path / 'cache'))
+    for name in ('first.png', 'second.png'):
+        (tmp_path / name).write_bytes(png)
+
+    first = process_image(str(tmp_path / 'first.png'), str(tmp_path), cache)
+    second = process_image(str(tmp_path / 'second.png'), str(tmp_path), cache)
+    assert first and second
+    assert (first.cached, second.cached) == (False, True)
+    assert (second.mime_type, second.width, second.height) == ('image/png', 3, 2)
+    assert second.source_digest == file_digest(str(tmp_path / 'first.png'))
+
+    with open(first.output_path, encoding='utf-8') as f:
+        first_document = f.read()
+    with open(second.output_path, encoding='utf-8') as f:
+        second_document = f.read()
+    assert base64.b64encode(png).decode() in second_document
+    assert second_document == first_document.replace('first', 'second')
+    assert second.output_bytes == os.path.getsize(second.output_path)
@@ -0,0 +1,70 @@
+"""Tests for the chunked Base64 encoder behind process_image."""
+
+import base64
+import io
+
+import pytest
+
+from base64_image_converter import convertIMAGE_script
+from base64_image_converter.convertIMAGE_script import (ENCODE_CHUNK_SIZE, ConversionResult, _encode_stream,
+                                                        base64_encoded_length, process_base64_file,
+                                                        process_image)
+
+from conftest import make_png
+
+
+def test_chunk_size_keeps_base64_blocks_aligned():
+    assert ENCODE_CHUNK_SIZE % 3 == 0
+
+
+@pytest.mark.parametrize('size', list(range(10)) + [ENCODE_CHUNK_SIZE + 1])
+def test_base64_encoded_length(size):
+    assert base64_encoded_length(size) == len(base64.b64encode(bytes(size)))
+
+
+@pytest.mark.parametrize('size', [0, 1, 5, 6, 7, 30, 31])
+def test_encode_stream_matches_one_shot_encoding(monkeypatch, size):
+    monkeypatch.setattr(convertIMAGE_script, 'ENCODE_CHUNK_SIZE', 6)
+    data = bytes(range(size))
+    source = io.BytesIO(data)
+    targets = io.StringIO(), io.StringIO()
+    result = ConversionResult('image.png')
+    assert _encode_stream(source, source.read(6), result, *targets) == size
+    expected = base64.b64encode(data).decode('ascii')
+    assert [target.getvalue() for target in targets] == [expected, expected]
+    assert min(result.codec_ns, result.write_ns, result.read_ns) >= 0
+
+
+@pytest.mark.parametrize('png', [
+    make_png(),
+    make_png(1024, 1600, seed=1),  # spans three encode chunks
+], ids=['small', 'multi-chunk'])
+def test_process_image_round_trip(tmp_path, png):
+    source = tmp_path / 'image.png'
+    source.write_bytes(png)
+    (tmp_path / 'encoded').mkdir()
+    (tmp_path / 'decoded').mkdir()
+    encoded = process_image(str(source), str(tmp_path / 'encoded'), output_format='datauri')
+    assert encoded
+    assert (encoded.mime_type, encoded.input_bytes) == ('image/png', len(png))
+    with open(encoded.output_path, 'rb') as f:
+        document = f.read()
+    assert document.strip() == b'data:image/png;base64,' + base64.b64encode(png)
+    assert encoded.output_bytes == len(document)
+
+    decoded = process_base64_file(encoded.output_path, str(tmp_path / 'decoded'))
+    assert decoded
+    with open(decoded.output_path, 'rb') as f:
+        assert f.read() == png
+
+
+def test_process_image_with_small_chunks(tmp_path, monkeypatch):
+    # Still long enough for the header probe to see the PNG's IHDR chunk
+    monkeypatch.setattr(convertIMAGE_script, 'ENCODE_CHUNK_SIZE', 3 * 20)
+    png = make_png(40, 30, seed=2)
+    source = tmp_path / 'image.png'
+    source.write_bytes(png)
+    encoded = process_image(str(source), str(tmp_path), output_format='datauri')
+    assert (encoded.width, encoded.height) == (40, 30)
+    with open(encoded.output_path, 'rb') as f:
+        assert base64.b64encode(png) in f.read()
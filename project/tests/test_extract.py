@@ -0,0 +1,60 @@
+"""Tests for decoding the first or every data URI image embedded in a document."""
+
+import base64
+import os
+
+from base64_image_converter.convertIMAGE_script import process_base64_file
+
+from conftest import make_png
+
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg" width="4" height="4"/>'
+
+
+def data_uri(image, mime_type='image/png'):
+    return b'data:' + mime_type.encode() + b';base64,' + base64.b64encode(image)
+
+
+def write_page(path, images):
+    path.write_bytes(b'<html>' + b''.join(b'<img src="' + data_uri(*image) + b'">\n' for image in images)
+                     + b'</html>')
+    return str(path)
+
+
+def test_extract_all_numbers_outputs_in_document_order(tmp_path):
+    images = [(make_png(1, 1),), (SVG, 'image/svg+xml'), (make_png(2, 2),), (b'\x00\x01', 'image/x-unknown')]
+    page = write_page(tmp_path / 'page.html', images)
+    output_dir = tmp_path / 'out'
+    output_dir.mkdir()
+
+    result = process_base64_file(page, str(output_dir), extract_all=True)
+    assert result
+    names = ['page_001.png', 'page_002.svg', 'page_003.png', 'page_004.png']
+    assert [os.path.basename(path) for path in result.output_paths] == names
+    assert sorted(os.listdir(output_dir)) == names
+    for path, image in zip(result.output_paths, images):
+        with open(path, 'rb') as f:
+            assert f.read() == image[0]
+
+
+def test_first_image_is_named_after_the_document(tmp_path):
+    page = write_page(tmp_path / 'page.html', [(SVG, 'image/svg+xml'), (make_png(),)])
+    result = process_base64_file(page, str(tmp_path))
+    assert [os.path.basename(path) for path in result.output_paths] == ['page.svg']
+    assert sorted(os.listdir(tmp_path)) == ['page.html', 'page.svg']
+
+
+def test_extract_all_numbers_past_999(tmp_path):
+    page = write_page(tmp_path / 'many.html', [(make_png(),)] * 1001)
+    output_dir = tmp_path / 'out'
+    output_dir.mkdir()
+    result = process_base64_file(page, str(output_dir), extract_all=True)
+    assert len(result.output_paths) == 1001
+    assert [os.path.basename(path) for path in result.output_paths[-2:]] == ['many_1000.png', 'many_1001.png']
+
+
+def test_document_without_images(tmp_path):
+    page = tmp_path / 'empty.html'
+    page.write_text('<p>no images</p>')
+    result = process_base64_file(str(page), str(tmp_path), extract_all=True)
+    assert not result
+    assert result.error == 'no base64 data found'
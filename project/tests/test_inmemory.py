@@ -0,0 +1,59 @@
+"""Tests for the in-memory and pipe converters and their failure reporting."""
+
+import base64
+
+import pytest
+
+from base64_image_converter.convertIMAGE_script import decode_document, decode_pipe, encode_bytes
+
+from conftest import make_png
+
+
+def data_uri(image, mime_type='image/png'):
+    return f'data:{mime_type};base64,{base64.b64encode(image).decode()}'
+
+
+def test_encode_bytes_round_trip():
+    png = make_png()
+    result = encode_bytes(png, 'logo.png', 'datauri')
+    assert result
+    assert result.output_paths == ['logo.txt']
+    assert (result.mime_type, result.width, result.height) == ('image/png', 3, 2)
+    assert result.output_data[0].endswith(base64.b64encode(png))
+
+    decoded = decode_document(b'<img src="' + result.output_data[0] + b'">', 'logo.html')
+    assert decoded.output_paths == ['logo.png']
+    assert decoded.output_data == [png]
+
+
+def test_decode_document_extracts_every_image():
+    document = f'<img src="{data_uri(make_png(1))}"> <img src="{data_uri(b"GIF89a" + bytes(7), "image/gif")}">'
+    result = decode_document(document.encode(), 'page.html', extract_all=True, validate=False)
+    assert result.output_paths == ['page_001.png', 'page_002.gif']
+    assert result.width == 1
+
+
+@pytest.mark.parametrize('document, error', [
+    (b'<p>no images here</p>', 'no base64 data found'),
+    (b'<img src="data:image/png;base64,iVBORw0K=GgoA">', 'padding'),
+    (f'<img src="{data_uri(make_png()[:-8])}">'.encode(), 'truncated PNG'),
+])
+def test_decode_document_reports_failures_on_the_result(document, error):
+    result = decode_document(document, 'page.html')
+    assert not result
+    assert error in result.error
+    assert result.output_paths == [] and result.output_data == []
+
+
+def test_decode_pipe_reports_failures_and_removes_output(tmp_path):
+    source = tmp_path / 'page.html'
+    target = tmp_path / 'image.png'
+    source.write_text(f'<img src="{data_uri(make_png()[:-8])}">')
+    result = decode_pipe(str(source), str(target))
+    assert not result
+    assert 'truncated PNG' in result.error
+    assert not target.exists()
+
+    source.write_text(f'<img src="{data_uri(make_png())}">')
+    assert decode_pipe(str(source), str(target))
+    assert target.read_bytes() == make_png()
@@ -0,0 +1,158 @@
+"""Tests for the incremental-run manifest and hashing sources during conversion."""
+
+import base64
+import hashlib
+import io
+import os
+
+import pytest
+
+from base64_image_converter.convertIMAGE_script import (
+    DECODE_CHUNK_SIZE, _manifest_options, make_work_item, parse_arguments, process_file, run_batch,
+)
+from base64_image_converter.manifest import ConversionManifest, HashingReader, file_digest
+
+from conftest import make_png
+
+
+# A 1x1 RGB image
+PNG = make_png(1, 1, color_type=2)
+
+
+def test_hashing_reader_hashes_sequential_reads():
+    data = os.urandom(10000)
+    reader = HashingReader(io.BytesIO(data), len(data))
+    while reader.read(333):
+        pass
+    assert reader.hexdigest() == hashlib.sha256(data).hexdigest()
+
+
+def test_hashing_reader_ignores_lookahead_after_seek():
+    data = os.urandom(10000)
+    reader = HashingReader(io.BytesIO(data), len(data))
+    first = reader.read(100)
+    reader.seek(5000)
+    reader.read(50)  # A header probe looking further ahead
+    reader.seek(len(first))
+    assert reader.tell() == 100
+    reader.read()
+    assert reader.hexdigest() == hashlib.sha256(data).hexdigest()
+
+
+def test_hashing_reader_rereads_count_once():
+    data = os.urandom(1000)
+    reader = HashingReader(io.BytesIO(data), len(data))
+    reader.read(600)
+    reader.seek(0)
+    reader.read()
+    assert reader.hexdigest() == hashlib.sha256(data).hexdigest()
+
+
+def test_hashing_reader_partial_read_has_no_digest():
+    reader = HashingReader(io.BytesIO(bytes(100)), 100)
+    reader.read(99)
+    assert reader.hexdigest() is None
+
+
+@pytest.mark.parametrize('extract_all', [False, True])
+def test_conversions_hash_their_source(tmp_path, extract_all):
+    image = tmp_path / 'pixel.png'
+    image.write_bytes(PNG)
+    result = process_file(str(image), str(tmp_path), hash_source=True)
+    assert result.source_digest == file_digest(str(image))
+
+    document = tmp_path / 'page.html'
+    uri = 'data:image/png;base64,' + base64.b64encode(PNG).decode()
+    document.write_text(f'<img src="{uri}"><img src="{uri}">' + ' ' * DECODE_CHUNK_SIZE)
+    result = process_file(str(document), str(tmp_path), extract_all=extract_all, hash_source=True)
+    assert result
+    if extract_all:
+        assert result.source_digest == file_digest(str(document))
+    else:
+        # Decoding stopped after the first image, before the end of the file
+        assert result.source_digest is None
+
+
+def test_conversions_skip_hashing_by_default(tmp_path):
+    image = tmp_path / 'pixel.png'
+    image.write_bytes(PNG)
+    assert process_file(str(image), str(tmp_path)).source_digest is None
+
+
+@pytest.fixture
+def sources(tmp_path):
+    source_dir = tmp_path / 'in'
+    source_dir.mkdir()
+    (source_dir / 'a.png').write_bytes(PNG)
+    uri = 'data:image/png;base64,' + base64.b64encode(PNG).decode()
+    (source_dir / 'b.html').write_text(f'<img src="{uri}">')
+    return [str(source_dir / 'a.png'), str(source_dir / 'b.html')]
+
+
+def _run(sources, output_dir, manifest_path, options=None):
+    manifest = ConversionManifest.load(str(manifest_path), options)
+    return run_batch([make_work_item(path) for path in sources], str(output_dir), manifest=manifest)
+
+
+def test_manifest_records_digests_and_skips_unchanged(tmp_path, sources):
+    manifest_path = tmp_path / 'manifest.json'
+    summary = _run(sources, tmp_path / 'out', manifest_path)
+    assert (summary.successful, summary.skipped) == (2, 0)
+    manifest = ConversionManifest.load(str(manifest_path))
+    for path in sources:
+        assert manifest.entries[os.path.abspath(path)]['sha256'] == file_digest(path)
+
+    assert _run(sources, tmp_path / 'out', manifest_path).skipped == 2
+
+
+def test_manifest_reconverts_changed_and_touched_sources(tmp_path, sources):
+    manifest_path = tmp_path / 'manifest.json'
+    _run(sources, tmp_path / 'out', manifest_path)
+
+    # A new mtime with the same content is resolved by the content hash
+    os.utime(sources[0], ns=(1, 1))
+    # Same size, different content
+    with open(sources[1], 'r+') as f:
+        text = f.read()
+        f.seek(0)
+        f.write(text.replace('<img', '<IMG'))
+    summary = _run(sources, tmp_path / 'out', manifest_path)
+    assert (summary.successful, summary.skipped) == (1, 1)
+
+
+def test_manifest_reconverts_when_outputs_are_missing(tmp_path, sources):
+    manifest_path = tmp_path / 'manifest.json'
+    _run(sources, tmp_path / 'out', manifest_path)
+    os.remove(tmp_path / 'out' / 'a.txt')
+    assert _run(sources, tmp_path / 'out', manifest_path).successful == 1
+
+
+def test_manifest_reconverts_when_options_change(tmp_path, sources):
+    manifest_path = tmp_path / 'manifest.json'
+    _run(sources, tmp_path / 'out', manifest_path, {'output_format': 'html'})
+    assert _run(sources, tmp_path / 'out', manifest_path, {'output_format': 'html'}).skipped == 2
+    summary = _run(sources, tmp_path / 'out', manifest_path, {'output_format': 'html', 'extract_all': True})
+    assert summary.skipped == 0
+
+
+def test_manifest_prune_removes_outputs_of_deleted_sources(tmp_path, sources):
+    manifest_path = tmp_path / 'manifest.json'
+    _run(sources, tmp_path / 'out', manifest_path)
+    os.remove(sources[0])
+    manifest = ConversionManifest.load(str(manifest_path))
+    assert manifest.prune() == [str(tmp_path / 'out' / 'a.txt')]
+    assert not (tmp_path / 'out' / 'a.txt').exists()
+
+
+@pytest.mark.parametrize('flags, option', [
+    (['-a'], {'extract_all': True}),
+    (['-d', 'decode'], {'direction': 'decode'}),
+    (['--no-validate'], {'validate': False}),
+    (['--optimize'], {'optimize': True}),
+    (['-f', 'json'], {'output_format': 'json'}),
+])
+def test_manifest_options_cover_output_changing_flags(flags, option):
+    defaults = _manifest_options(parse_arguments(['--incremental']))
+    options = _manifest_options(parse_arguments(['--incremental'] + flags))
+    assert options == dict(defaults, **option)
+    assert options != defaults
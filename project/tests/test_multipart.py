@@ -0,0 +1,111 @@
+"""Tests for the incremental multipart/form-data parser."""
+
+import pytest
+
+from base64_image_converter.multipart import MAX_HEADER_SIZE, MultipartError, MultipartParser
+
+from conftest import random_bytes
+
+BOUNDARY = 'xYzZY'
+
+
+def build_body(parts, boundary=BOUNDARY, preamble=b'', epilogue=b''):
+    """Encode [(name, filename, content_type, data)] as multipart/form-data."""
+    body = preamble
+    for name, filename, content_type, data in parts:
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+        body += f'--{boundary}\r\nContent-Disposition: {disposition}\r\n'.encode()
+        if content_type:
+            body += f'Content-Type: {content_type}\r\n'.encode()
+        body += b'\r\n' + data + b'\r\n'
+    return body + f'--{boundary}--\r\n'.encode() + epilogue
+
+
+def parse(body, chunk_size=None, boundary=BOUNDARY):
+    """Feed a body in chunks and return [(PartInfo, data)]."""
+    parser = MultipartParser(boundary)
+    chunk_size = chunk_size or len(body)
+    parts = []
+    for start in range(0, len(body), chunk_size):
+        for event, value in parser.feed(body[start:start + chunk_size]):
+            if event == 'start':
+                parts.append([value, b''])
+            elif event == 'data':
+                parts[-1][1] += value
+            else:
+                assert value is None
+    parser.finish()
+    return parts
+
+
+PARTS = [
+    ('files', 'a.png', 'image/png', random_bytes(5000)),
+    ('files', 'page.html', 'text/html', b'<img src="data:image/png;base64,AAAA">'),
+    ('mode', None, None, b'auto'),
+    ('files', 'empty.txt', 'text/plain', b''),
+    # Contents that almost contain the delimiter
+    ('files', 'tricky.bin', None, b'\r\n--xYzZ\r\n-xYzZY\r\n--xYz' + b'\r\n' * 3),
+]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 7, 64, 4096, None])
+def test_parses_parts_at_every_chunk_size(chunk_size):
+    body = build_body(PARTS, preamble=b'ignored preamble\r\n', epilogue=b'ignored epilogue')
+    parts = parse(body, chunk_size)
+    assert [(info.name, info.filename, data) for info, data in parts] == \
+        [(name, filename, data) for name, filename, _, data in PARTS]
+    assert [info.content_type for info, _ in parts] == \
+        ['image/png', 'text/html', 'text/plain', 'text/plain', 'text/plain']
+
+
+def test_body_may_start_without_preamble_and_accept_bytes_boundary():
+    body = build_body(PARTS[:1])
+    assert body.startswith(b'--' + BOUNDARY.encode())
+    assert parse(body, boundary=BOUNDARY.encode())[0][1] == PARTS[0][3]
+
+
+def test_part_without_headers():
+    body = f'--{BOUNDARY}\r\n\r\nplain\r\n--{BOUNDARY}--'.encode()
+    (info, data), = parse(body)
+    assert (info.name, info.filename, info.content_type, data) == (None, None, 'text/plain', b'plain')
+
+
+def test_boundary_line_may_end_with_whitespace():
+    body = f'--{BOUNDARY} \t\r\n\r\nplain\r\n--{BOUNDARY}--'.encode()
+    assert parse(body)[0][1] == b'plain'
+
+
+def test_part_data_is_streamed_with_bounded_look_ahead():
+    parser = MultipartParser(BOUNDARY)
+    parser.feed(f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="f"\r\n\r\n'.encode())
+    for _ in range(10):
+        events = parser.feed(b'x' * 10000)
+        assert sum(len(value) for event, value in events if event == 'data') >= 10000 - len(BOUNDARY) - 4
+        assert len(parser._buffer) < len(BOUNDARY) + 4
+
+
+def test_missing_boundary_is_rejected():
+    with pytest.raises(MultipartError):
+        MultipartParser('')
+
+
+@pytest.mark.parametrize('body', [
+    b'',
+    f'--{BOUNDARY}\r\n\r\ntruncated'.encode(),
+    f'--{BOUNDARY}\r\n\r\ndata\r\n--{BOUNDARY}\r\n'.encode(),
+    b'no boundary at all',
+])
+def test_truncated_body_is_rejected(body):
+    with pytest.raises(MultipartError, match='closing boundary'):
+        parse(body or b' ')
+
+
+@pytest.mark.parametrize('body, message', [
+    (f'--{BOUNDARY}junk\r\n\r\n'.encode(), 'boundary line'),
+    (f'--{BOUNDARY}\r\n'.encode() + b'X-Long: ' + b'a' * MAX_HEADER_SIZE, 'too large'),
+])
+def test_malformed_body_is_rejected(body, message):
+    with pytest.raises(MultipartError, match=message):
+        MultipartParser(BOUNDARY).feed(body)
@@ -0,0 +1,80 @@
+"""Tests for lossless optimization: metadata stripping and EXIF orientation."""
+
+import io
+import struct
+import zlib
+
+import pytest
+
+from base64_image_converter.optimize import optimize_image
+
+from conftest import make_png, png_chunk
+
+
+def exif(orientation, byte_order='MM'):
+    """TIFF-structured EXIF data holding only the Orientation tag."""
+    fmt = '>' if byte_order == 'MM' else '<'
+    entry = struct.pack(fmt + 'HHIHH', 0x0112, 3, 1, orientation, 0)
+    return byte_order.encode() + struct.pack(fmt + 'HIH', 42, 8, 1) + entry + struct.pack(fmt + 'I', 0)
+
+
+PIXELS = bytes(range(256)) * 16  # 16 rows of a 255-pixel grayscale image, filter bytes included
+
+
+def make_test_png(*extra_chunks):
+    return make_png(255, 16, scanlines=PIXELS, extra_chunks=extra_chunks)
+
+
+def png_chunks(png):
+    chunks, offset = [], 8
+    while offset < len(png):
+        length, chunk_type = struct.unpack_from('>I4s', png, offset)
+        data = png[offset + 8:offset + 8 + length]
+        assert struct.unpack_from('>I', png, offset + 8 + length)[0] == zlib.crc32(chunk_type + data)
+        chunks.append((chunk_type, data))
+        offset += 12 + length
+    return chunks
+
+
+def optimize(image):
+    target = io.BytesIO()
+    assert optimize_image(io.BytesIO(image), target)
+    return target.getvalue()
+
+
+def test_png_metadata_is_dropped_and_pixels_kept():
+    optimized = optimize(make_test_png(png_chunk(b'tEXt', b'Comment\x00hello'), png_chunk(b'eXIf', exif(1))))
+    chunks = png_chunks(optimized)
+    assert [chunk_type for chunk_type, _ in chunks] == [b'IHDR', b'IDAT', b'IEND']
+    assert zlib.decompress(b''.join(data for chunk_type, data in chunks if chunk_type == b'IDAT')) == PIXELS
+
+
+@pytest.mark.parametrize('data', [exif(6), exif(8, 'II'), b'Exif\x00\x00' + exif(3)])
+def test_png_exif_with_orientation_is_kept(data):
+    chunks = png_chunks(optimize(make_test_png(png_chunk(b'eXIf', data))))
+    assert (b'eXIf', data) in chunks
+
+
+@pytest.mark.parametrize('data', [exif(1), b'not exif', b''])
+def test_png_exif_without_orientation_is_dropped(data):
+    chunks = png_chunks(optimize(make_test_png(png_chunk(b'eXIf', data))))
+    assert b'eXIf' not in [chunk_type for chunk_type, _ in chunks]
+
+
+def _segment(code, payload):
+    return b'\xff' + bytes((code,)) + struct.pack('>H', len(payload) + 2) + payload
+
+
+def make_jpeg(*segments):
+    scan = _segment(0xDA, b'\x01\x01\x00\x00\x3f\x00') + b'\x12\x34\xff\x00\x56'
+    return b'\xff\xd8' + b''.join(segments) + _segment(0xDB, bytes(65)) + scan + b'\xff\xd9'
+
+
+@pytest.mark.parametrize('orientation, kept', [(1, False), (6, True)])
+def test_jpeg_exif_is_kept_only_with_orientation(orientation, kept):
+    app1 = _segment(0xE1, b'Exif\x00\x00' + exif(orientation))
+    comment = _segment(0xFE, b'made by hand')
+    optimized = optimize(make_jpeg(app1, comment))
+    assert (app1 in optimized) == kept
+    assert comment not in optimized
+    assert optimized.endswith(make_jpeg()[-20:])
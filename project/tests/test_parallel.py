@@ -0,0 +1,71 @@
+"""Tests for converting batches across worker processes."""
+
+import os
+import re
+
+import pytest
+
+from base64_image_converter import convertIMAGE_script
+from base64_image_converter.convertIMAGE_script import _run_parallel, make_work_item, run_batch
+
+from conftest import make_png
+
+
+@pytest.fixture
+def images(tmp_path):
+    """Twelve small PNGs of different widths, plus an undecodable text file."""
+    source_dir = tmp_path / 'in'
+    source_dir.mkdir()
+    paths = []
+    for index in range(12):
+        path = source_dir / f'image{index:02d}.png'
+        path.write_bytes(make_png(index + 1, 1))
+        paths.append(str(path))
+    broken = source_dir / 'broken.txt'
+    broken.write_text('no images here')
+    paths.insert(5, str(broken))
+    return paths
+
+
+@pytest.mark.parametrize('quiet', [False, True])
+def test_parallel_results_are_reported_in_input_order(tmp_path, capsys, images, quiet):
+    results = []
+    summary = run_batch(images, str(tmp_path / 'out'), workers=3, quiet=quiet, total=len(images),
+                        on_result=results.append, output_format='json')
+    assert (summary.successful, summary.failed) == (12, 1)
+    assert [result.input_path for result in results] == images
+    assert [result.width for result in results if result] == list(range(1, 13))
+    assert sorted(os.listdir(tmp_path / 'out')) == sorted(f'image{index:02d}.json' for index in range(12))
+
+    progress = re.findall(r'^\[(\d+)/13\] .*: (\S+)$', capsys.readouterr().out, re.MULTILINE)
+    expected = [(str(index), os.path.basename(path)) for index, path in enumerate(images, 1)]
+    assert progress == ([expected[5]] if quiet else expected)
+
+
+def test_parallel_run_matches_a_serial_run(tmp_path, images):
+    for workers in (1, 4):
+        run_batch(images, str(tmp_path / str(workers)), workers=workers, quiet=True, output_format='json')
+    serial = sorted(os.listdir(tmp_path / '1'))
+    assert sorted(os.listdir(tmp_path / '4')) == serial
+    for name in serial:
+        assert (tmp_path / '1' / name).read_text() == (tmp_path / '4' / name).read_text()
+
+
+def test_in_flight_tasks_are_bounded(tmp_path, images, monkeypatch):
+    monkeypatch.setattr(convertIMAGE_script, 'MAX_IN_FLIGHT_PER_WORKER', 2)
+    workers = 2
+    dispatched = []
+    completed = []
+
+    def items():
+        # Work items are only pulled from the generator as slots free up
+        for path in images:
+            dispatched.append(path)
+            yield make_work_item(path)
+
+    def complete(item, result, digest):
+        assert len(dispatched) - len(completed) <= workers * 2
+        completed.append(item.path)
+
+    _run_parallel(items(), lambda item: str(tmp_path), workers, {}, False, lambda *args: None, complete)
+    assert completed == images
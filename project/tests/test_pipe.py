@@ -0,0 +1,90 @@
+"""Tests for the 'encode' and 'decode' pipe commands on stdin and stdout."""
+
+import base64
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from base64_image_converter.convertIMAGE_script import encode_pipe
+
+from conftest import make_png
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PNG = make_png(40, 30, seed=3)
+
+
+def run(*argv, stdin=None, input=None):
+    """Run the converter's command line; returns (exit status, stdout bytes, stderr text)."""
+    script = 'import sys\nfrom base64_image_converter.convertIMAGE_script import main\nsys.exit(main())\n'
+    process = subprocess.run([sys.executable, '-c', script] + list(argv), cwd=PROJECT_DIR, stdin=stdin,
+                             input=input, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return process.returncode, process.stdout, process.stderr.decode('utf-8')
+
+
+def test_encode_stdin_to_stdout():
+    status, stdout, stderr = run('encode', '-', '-', '--format', 'datauri', input=PNG)
+    assert status == 0
+    assert stdout == b'data:image/png;base64,' + base64.b64encode(PNG)
+    assert "Encoded '<stdin>' → '<stdout>' (image/png" in stderr
+
+
+def test_encode_spools_piped_input_for_formats_showing_the_size():
+    status, stdout, _ = run('encode', '--format', 'json', '--name', 'logo.png', input=PNG)
+    assert status == 0
+    record = json.loads(stdout)
+    assert (record['source'], record['size']) == ('logo.png', len(PNG))
+    assert (record['width'], record['height']) == (40, 30)
+    assert record['src'] == 'data:image/png;base64,' + base64.b64encode(PNG).decode()
+
+
+def test_encode_stdin_redirected_from_a_file(tmp_path):
+    source = tmp_path / 'logo.png'
+    source.write_bytes(PNG)
+    with open(source, 'rb') as stdin:
+        status, stdout, stderr = run('encode', '-q', '--format', 'json', stdin=stdin)
+    assert (status, stderr) == (0, '')
+    assert json.loads(stdout)['size'] == len(PNG)
+
+
+def test_decode_stdin_to_stdout():
+    document = b'<p>logo</p><img src="data:image/png;base64,' + base64.b64encode(PNG) + b'">'
+    status, stdout, stderr = run('decode', '-', '-', input=document)
+    assert status == 0
+    assert stdout == PNG
+    assert "Decoded '<stdin>' → '<stdout>' (image/png" in stderr
+
+
+def test_encode_then_decode_files(tmp_path):
+    (tmp_path / 'logo.png').write_bytes(PNG)
+    assert run('encode', str(tmp_path / 'logo.png'), str(tmp_path / 'logo.txt'), '-q')[:2] == (0, b'')
+    assert run('decode', str(tmp_path / 'logo.txt'), str(tmp_path / 'copy.png'), '-q') == (0, b'', '')
+    assert (tmp_path / 'copy.png').read_bytes() == PNG
+
+
+def test_decode_without_an_image_fails(tmp_path):
+    status, stdout, stderr = run('decode', '-', str(tmp_path / 'out.png'), input=b'<p>no images</p>')
+    assert (status, stdout) == (1, b'')
+    assert 'no base64 data found' in stderr
+    assert not (tmp_path / 'out.png').exists()
+
+
+def test_missing_source_fails(tmp_path):
+    status, stdout, stderr = run('encode', str(tmp_path / 'missing.png'))
+    assert (status, stdout) == (1, b'')
+    assert 'Failed to encode' in stderr
+
+
+@pytest.mark.parametrize('output_format', ['raw', 'html'])
+def test_encode_pipe_to_a_file(tmp_path, output_format):
+    (tmp_path / 'logo.png').write_bytes(PNG)
+    target = str(tmp_path / 'logo.out')
+    result = encode_pipe(str(tmp_path / 'logo.png'), target, output_format)
+    assert result
+    assert (result.output_paths, result.input_bytes) == ([target], len(PNG))
+    assert result.output_bytes == os.path.getsize(target)
+    with open(target, 'rb') as f:
+        assert base64.b64encode(PNG) in f.read()
@@ -0,0 +1,101 @@
+"""Tests for format sniffing and dimension probing from image headers."""
+
+import io
+import struct
+
+import pytest
+
+from base64_image_converter.convertIMAGE_script import probe_image, try_read_dimensions_from_header
+
+from conftest import make_png
+
+
+def riff(chunk_type, payload):
+    chunk = chunk_type + struct.pack('<I', len(payload)) + payload
+    return b'RIFF' + struct.pack('<I', 4 + len(chunk)) + b'WEBP' + chunk
+
+
+def webp_lossy(width, height):
+    frame = b'\x10\x02\x00' + b'\x9d\x01\x2a' + struct.pack('<HH', width, height)
+    return riff(b'VP8 ', frame + bytes(8))
+
+
+def webp_lossless(width, height):
+    bits = (width - 1) | (height - 1) << 14
+    return riff(b'VP8L', b'\x2f' + struct.pack('<I', bits) + bytes(8))
+
+
+def webp_extended(width, height):
+    payload = bytes(4) + (width - 1).to_bytes(3, 'little') + (height - 1).to_bytes(3, 'little')
+    return riff(b'VP8X', payload)
+
+
+def tiff(width, height, byte_order='II', long_width=False, padding=0):
+    """Baseline TIFF header and first IFD, with the IFD after optional padding."""
+    fmt = '<' if byte_order == 'II' else '>'
+    entries = [
+        struct.pack(fmt + 'HHI', 254, 4, 1) + struct.pack(fmt + 'I', 0),
+        (struct.pack(fmt + 'HHII', 256, 4, 1, width) if long_width
+         else struct.pack(fmt + 'HHIHH', 256, 3, 1, width, 0)),
+        struct.pack(fmt + 'HHIHH', 257, 3, 1, height, 0),
+    ]
+    ifd = struct.pack(fmt + 'H', len(entries)) + b''.join(entries) + struct.pack(fmt + 'I', 0)
+    magic = b'II*\x00' if byte_order == 'II' else b'MM\x00*'
+    return magic + struct.pack(fmt + 'I', 8 + padding) + bytes(padding) + ifd
+
+
+def ico(width, height):
+    entry = bytes((width % 256, height % 256, 0, 0)) + struct.pack('<HHII', 1, 32, 40, 22)
+    return b'\x00\x00\x01\x00' + struct.pack('<H', 1) + entry + bytes(40)
+
+
+@pytest.mark.parametrize('image, expected', [
+    (make_png(7, 5), ('image/png', 7, 5)),
+    (b'GIF89a' + struct.pack('<HH', 9, 4) + bytes(7), ('image/gif', 9, 4)),
+    (webp_lossy(300, 200), ('image/webp', 300, 200)),
+    (webp_lossless(1, 16384), ('image/webp', 1, 16384)),
+    (webp_extended(5000, 3), ('image/webp', 5000, 3)),
+    (riff(b'ALPH', bytes(10)), ('image/webp', None, None)),
+    (tiff(640, 480), ('image/tiff', 640, 480)),
+    (tiff(70000, 2, byte_order='MM', long_width=True), ('image/tiff', 70000, 2)),
+    (ico(48, 32), ('image/x-icon', 48, 32)),
+    (ico(256, 256), ('image/x-icon', 256, 256)),
+    (b'<svg xmlns="http://www.w3.org/2000/svg" width="120" height="80px"/>', ('image/svg+xml', 120, 80)),
+    (b'\xef\xbb\xbf<?xml version="1.0"?>\n<!-- logo -->\n<svg viewBox="0, 0, 24.4 16">',
+     ('image/svg+xml', 24, 16)),
+    (b'<svg width="100%" height="50%" viewBox="0 0 10 20"></svg>', ('image/svg+xml', 10, 20)),
+    (b'<svg></svg>', ('image/svg+xml', None, None)),
+    (b'<html><svg width="1" height="1"></svg></html>', (None, None, None)),
+    (b'plain text', (None, None, None)),
+    (b'', (None, None, None)),
+], ids=['png', 'gif', 'webp-lossy', 'webp-lossless', 'webp-extended', 'webp-unknown-chunk', 'tiff',
+        'tiff-big-endian', 'ico', 'ico-256', 'svg', 'svg-viewbox', 'svg-relative-size', 'svg-no-size',
+        'html', 'text', 'empty'])
+def test_probe_image(image, expected):
+    assert probe_image(image) == expected
+    assert probe_image(memoryview(image)) == expected
+
+
+@pytest.mark.parametrize('image, expected', [
+    (webp_lossy(300, 200), ('image/webp', None, None)),
+    (tiff(640, 480), ('image/tiff', None, None)),
+    (ico(48, 32), ('image/x-icon', 48, 32)),
+])
+def test_probe_image_with_truncated_header(image, expected):
+    assert probe_image(image[:12]) == expected
+
+
+def test_tiff_ifd_beyond_the_header_is_read_from_the_file():
+    image = tiff(800, 600, padding=100)
+    assert probe_image(image[:64]) == ('image/tiff', None, None)
+    source = io.BytesIO(image)
+    source.seek(64)
+    assert probe_image(image[:64], source) == ('image/tiff', 800, 600)
+    assert source.tell() == 64
+
+
+def test_try_read_dimensions_from_header_sniffs_the_contents(tmp_path):
+    misnamed = tmp_path / 'icon.png'
+    misnamed.write_bytes(ico(16, 16))
+    assert try_read_dimensions_from_header(str(misnamed)) == (16, 16)
+    assert try_read_dimensions_from_header(str(tmp_path / 'missing.png')) == (None, None)
@@ -0,0 +1,118 @@
+"""Tests for the --profile report and --profile-stats output."""
+
+import json
+import os
+import pstats
+import subprocess
+import sys
+
+import pytest
+
+from base64_image_converter.convertIMAGE_script import ConversionResult, main
+from base64_image_converter.profiling import STAGES, BatchProfiler, percentile
+
+from conftest import make_png
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize('percent, expected', [(0, 1), (50, 5), (90, 9), (99, 10), (100, 10)])
+def test_percentile_uses_nearest_rank(percent, expected):
+    assert percentile(list(range(1, 11)), percent) == expected
+
+
+def test_percentile_of_nothing():
+    assert percentile([], 50) is None
+
+
+def result(name, total_ms, input_bytes=1000, output_bytes=1400, cached=False):
+    """A successful result whose time is split between reading and encoding."""
+    converted = ConversionResult(name, [name + '.txt'], 'image/png', input_bytes, output_bytes, cached=cached)
+    converted.read_ns = total_ms * 250000
+    converted.codec_ns = total_ms * 750000
+    return converted
+
+
+def test_report_contents():
+    profiler = BatchProfiler(trace_memory=False, slowest_count=2)
+    profiler.start()
+    for index, total_ms in enumerate([4, 1, 3, 2], 1):
+        profiler.add(result(f'{index}.png', total_ms, cached=index == 4))
+    profiler.add(ConversionResult('broken.txt', error='no base64 data found'))
+    profiler.stop()
+    report = profiler.report(workers=2, output_format='html')
+
+    assert report['run']['workers'] == 2 and report['run']['output_format'] == 'html'
+    assert report['files'] == {'converted': 4, 'failed': 1, 'cached': 1}
+    assert report['throughput']['input_bytes'] == 4000
+    assert report['throughput']['output_bytes'] == 5600
+    assert set(report['stages']) == {name for name, _ in STAGES}
+    assert report['stages']['total'] == {'p50_ms': 2.0, 'p90_ms': 4.0, 'p99_ms': 4.0, 'max_ms': 4.0,
+                                         'sum_ms': 10.0}
+    assert report['stages']['codec']['share'] == 0.75
+    assert report['stages']['read']['share'] == 0.25
+    assert report['stages']['write'] == {'p50_ms': 0.0, 'p90_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0,
+                                         'sum_ms': 0.0, 'share': 0.0}
+    assert [entry['input_path'] for entry in report['slowest']] == ['1.png', '3.png']
+    assert report['slowest'][0]['codec_ms'] == 3.0
+    assert report['memory']['tracemalloc_peak_bytes'] is None
+
+
+def test_report_without_results():
+    profiler = BatchProfiler(trace_memory=False)
+    profiler.start()
+    profiler.stop()
+    report = profiler.report()
+    assert report['files'] == {'converted': 0, 'failed': 0, 'cached': 0}
+    assert report['stages']['total']['p50_ms'] is None
+    assert report['slowest'] == []
+
+
+def test_memory_is_traced_when_enabled():
+    profiler = BatchProfiler()
+    profiler.start()
+    data = [bytes(1000) for _ in range(100)]
+    profiler.stop()
+    assert len(data) == 100
+    assert profiler.report()['memory']['tracemalloc_peak_bytes'] >= 100000
+
+
+def test_cli_writes_report_and_stats(tmp_path):
+    for index in range(3):
+        (tmp_path / f'{index}.png').write_bytes(make_png(index + 1, 1))
+    report_path = tmp_path / 'profile.json'
+    stats_path = tmp_path / 'profile.pstats'
+    assert main([str(tmp_path / f'{index}.png') for index in range(3)]
+                + ['-o', str(tmp_path / 'out'), '-q', '--profile', str(report_path),
+                   '--profile-stats', str(stats_path)]) == 0
+
+    report = json.loads(report_path.read_text())
+    assert report['files'] == {'converted': 3, 'failed': 0, 'cached': 0}
+    assert report['run']['workers'] == 1
+    assert report['throughput']['input_bytes'] == sum(len(make_png(index + 1, 1)) for index in range(3))
+    assert report['stages']['total']['sum_ms'] > 0
+    assert len(report['slowest']) == 3
+
+    stats = pstats.Stats(str(stats_path))
+    assert any(function == 'process_image' for _, _, function in stats.stats)
+
+
+def test_cli_report_to_stdout(tmp_path, capsys):
+    (tmp_path / 'logo.png').write_bytes(make_png())
+    assert main([str(tmp_path / 'logo.png'), '-o', str(tmp_path), '-q', '--profile', '-']) == 0
+    assert json.loads(capsys.readouterr().out)['files']['converted'] == 1
+
+
+def test_cli_report_without_perf_counter_ns(tmp_path):
+    # Python 3.6 has no time.perf_counter_ns
+    (tmp_path / 'logo.png').write_bytes(make_png())
+    report_path = tmp_path / 'profile.json'
+    script = ('import sys, time\n'
+              'del time.perf_counter_ns\n'
+              'from base64_image_converter.convertIMAGE_script import main\n'
+              'sys.exit(main(sys.argv[1:]))\n')
+    subprocess.run([sys.executable, '-c', script, str(tmp_path / 'logo.png'), '-o', str(tmp_path / 'out'),
+                    '-q', '--profile', str(report_path)], cwd=PROJECT_DIR, check=True)
+    report = json.loads(report_path.read_text())
+    assert report['files']['converted'] == 1
+    assert report['wall_time_s'] > 0
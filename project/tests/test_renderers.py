@@ -0,0 +1,119 @@
+"""Tests for the output renderers and the documents process_image writes with them."""
+
+import base64
+import json
+import os
+
+import pytest
+
+from base64_image_converter.convertIMAGE_script import process_image
+from base64_image_converter.renderers import OUTPUT_FORMATS, OutputRenderer, get_renderer
+
+from conftest import make_png
+
+
+def fields(filename='logo.png', width=3, height=2, size=300):
+    base_name, extension = os.path.splitext(filename)
+    return {
+        'filename': filename,
+        'base_name': base_name,
+        'extension': extension,
+        'image_path': '/images/' + filename,
+        'output_filename': base_name + '.txt',
+        'output_path': '/out/' + base_name + '.txt',
+        'mime_type': 'image/png',
+        'image_size': size,
+        'image_file_size': f'{size} bytes',
+        'payload_length': 4 * ((size + 2) // 3),
+        'width': width,
+        'height': height,
+    }
+
+
+def test_renderers_are_compiled_once():
+    assert get_renderer('css') is get_renderer('css')
+    assert get_renderer().name == 'html'
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError, match='unknown output format'):
+        get_renderer('xml')
+
+
+@pytest.mark.parametrize('template, message', [
+    ('no payload here', 'no {payload} field'),
+    ('{payload}{filename!r}', 'unsupported template conversion'),
+])
+def test_invalid_templates_are_rejected(template, message):
+    with pytest.raises(ValueError, match=message):
+        OutputRenderer('bad', '.txt', template)
+
+
+@pytest.mark.parametrize('name, extension, needs_size', [
+    ('html', '.txt', True),
+    ('raw', '.b64', False),
+    ('datauri', '.txt', False),
+    ('css', '.css', False),
+    ('json', '.json', True),
+])
+def test_format_properties(name, extension, needs_size):
+    renderer = get_renderer(name)
+    assert (renderer.extension, renderer.needs_size) == (extension, needs_size)
+
+
+def test_raw_and_datauri_wrap_only_the_payload():
+    assert get_renderer('raw').render(fields()) == ('', '')
+    assert get_renderer('datauri').render(fields()) == ('data:image/png;base64,', '')
+
+
+def test_html_document():
+    head, tail = get_renderer('html').render(fields())
+    assert head.startswith('<!DOCTYPE html>')
+    assert '<title>logo.png</title>' in head
+    assert 'Image file location: /images/logo.png' in head
+    assert 'Base64 individual string length: 400' in head
+    assert head.endswith('src="data:image/png;base64,')
+    assert 'alt="logo.png"' in tail and 'width="3"' in tail and 'height="2"' in tail
+    assert tail.rstrip().endswith('</html>')
+
+    head, tail = get_renderer('html').render(fields(width=None, height=None))
+    assert 'dimensions' not in head and 'width=' not in tail
+
+
+@pytest.mark.parametrize('filename, selector', [
+    ('logo.png', '.logo {'),
+    ('my logo (2).png', '.my-logo--2- {'),
+    ('2x.png', '.img-2x {'),
+])
+def test_css_rule(filename, selector):
+    head, tail = get_renderer('css').render(fields(filename))
+    assert head == selector + '\n    background-image: url("data:image/png;base64,'
+    assert tail == '");\n    width: 3px;\n    height: 2px;\n}\n'
+
+
+def test_css_rule_without_dimensions():
+    _, tail = get_renderer('css').render(fields(width=None, height=None))
+    assert tail == '");\n}\n'
+
+
+def test_json_record():
+    head, tail = get_renderer('json').render(fields('say "hi".png', width=None))
+    record = json.loads(head + 'QUJD' + tail)
+    assert record == {'source': 'say "hi".png', 'mime_type': 'image/png', 'size': 300, 'width': None,
+                      'height': 2, 'length': 400, 'src': 'data:image/png;base64,QUJD'}
+
+
+@pytest.mark.parametrize('name', sorted(OUTPUT_FORMATS))
+def test_process_image_writes_each_format(tmp_path, name):
+    png = make_png()
+    source = tmp_path / 'logo.png'
+    source.write_bytes(png)
+    result = process_image(str(source), str(tmp_path), output_format=name)
+    assert result
+    assert result.output_path == str(tmp_path / ('logo' + OUTPUT_FORMATS[name][0]))
+    with open(result.output_path, encoding='utf-8') as f:
+        document = f.read()
+    assert base64.b64encode(png).decode() in document
+    assert result.output_bytes == len(document.encode('utf-8'))
+    if name == 'json':
+        assert json.loads(document)['width'] == 3
@@ -0,0 +1,149 @@
+"""Tests for the streaming image validators in base64_image_converter.validate."""
+
+import base64
+import os
+import struct
+
+import pytest
+
+from base64_image_converter.convertIMAGE_script import process_base64_file
+from base64_image_converter.validate import ImageValidationError, ImageValidator
+
+from conftest import make_png
+
+
+def _segment(code, payload):
+    return b'\xff' + bytes((code,)) + struct.pack('>H', len(payload) + 2) + payload
+
+
+def make_jpeg(scans=1, thumbnail=False):
+    """Build a structurally valid JPEG (not decodable, but correctly framed)."""
+    parts = [b'\xff\xd8', _segment(0xE0, b'JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00')]
+    if thumbnail:
+        # An EXIF thumbnail is a whole JPEG, SOS and EOI included, inside APP1
+        thumb = b'\xff\xd8' + _segment(0xDA, b'\x01\x01\x00\x00\x3f\x00') + b'\x12\x34\xff\xd9'
+        parts.append(_segment(0xE1, b'Exif\x00\x00' + thumb))
+    parts.append(_segment(0xDB, bytes(65)))
+    parts.append(_segment(0xC2, struct.pack('>BHHB', 8, 2, 2, 1) + b'\x01\x11\x00'))
+    for scan in range(scans):
+        parts.append(_segment(0xC4, b'\x00' + bytes(16)))
+        parts.append(_segment(0xDA, b'\x01\x01\x00\x00\x3f\x00'))
+        # Scan data with a stuffed 0xFF byte, a restart marker and fill bytes
+        parts.append(bytes(range(1, 200)) + b'\xff\x00\x10\xff\xd0\x20' * (scan + 1) + b'\xff\xff')
+    parts.append(b'\xff\xd9')
+    return b''.join(parts)
+
+
+def make_gif(local_table=False):
+    """Build a small GIF89a with an extension, an image and the trailer."""
+    screen = b'GIF89a' + struct.pack('<HHBBB', 2, 2, 0x80, 0, 0) + bytes(6)  # 2-color table
+    extension = b'\x21\xf9\x04\x00\x00\x00\x00\x00'  # Graphic control extension
+    flags = 0x81 if local_table else 0x00
+    image = b'\x2c' + struct.pack('<HHHHB', 0, 0, 2, 2, flags) + (bytes(12) if local_table else b'')
+    image += b'\x02' + b'\x03\x3b\x3b\x3b' + b'\x02\x21\x2c' + b'\x00'  # Sub-blocks holding ';' bytes
+    return screen + extension + image + b'\x3b'
+
+
+def validate(data, chunk_size=None):
+    """Feed data to a validator in pieces and return the detected format."""
+    validator = ImageValidator()
+    step = chunk_size or max(1, len(data))
+    for start in range(0, len(data), step):
+        validator.feed(data[start:start + step])
+    validator.finish()
+    return validator.image_format
+
+
+CHUNK_SIZES = [1, 2, 3, 7, 64, None]
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('image, image_format', [
+    (make_jpeg(), 'jpeg'),
+    (make_jpeg(scans=3), 'jpeg'),
+    (make_jpeg(thumbnail=True), 'jpeg'),
+    (make_gif(), 'gif'),
+    (make_gif(local_table=True), 'gif'),
+    (make_png(1, 1, color_type=2), 'png'),
+])
+def test_valid_images_pass(image, image_format, chunk_size):
+    assert validate(image, chunk_size) == image_format
+
+
+@pytest.mark.parametrize('padding', [b'\x00\x00', b'\r\n', b'\xff\xff\xff', bytes(4096)])
+@pytest.mark.parametrize('image', [make_jpeg(), make_gif(), make_png(1, 1, color_type=2)])
+def test_trailing_padding_is_ignored(image, padding):
+    validate(image + padding)
+    validate(image + padding, chunk_size=1)
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('image, cut, message', [
+    (make_jpeg(), 2, 'truncated JPEG'),
+    (make_jpeg(), 10, 'truncated JPEG'),
+    (make_jpeg(), 250, 'truncated JPEG'),
+    (make_jpeg(scans=2), 250, 'truncated JPEG'),
+    (make_gif(), 1, 'truncated GIF'),
+    (make_gif(), 8, 'truncated GIF'),
+    (make_gif(), 20, 'truncated GIF'),
+    (make_png(1, 1, color_type=2), 1, 'truncated PNG'),
+    (make_png(1, 1, color_type=2), 20, 'truncated PNG'),
+])
+def test_truncated_images_fail(image, cut, message, chunk_size):
+    with pytest.raises(ImageValidationError, match=message):
+        validate(image[:-cut], chunk_size)
+
+
+def test_thumbnail_end_marker_does_not_complete_a_truncated_jpeg():
+    image = make_jpeg(thumbnail=True)
+    main_scan = image.rindex(b'\xff\xda')
+    with pytest.raises(ImageValidationError, match='end-of-image'):
+        validate(image[:main_scan + 20])
+
+
+def test_jpeg_end_marker_before_any_scan_fails():
+    with pytest.raises(ImageValidationError, match='before any scan'):
+        validate(b'\xff\xd8' + _segment(0xE0, bytes(14)) + b'\xff\xd9')
+
+
+def test_jpeg_garbage_between_segments_fails():
+    image = make_jpeg()
+    position = image.index(b'\xff\xdb')
+    with pytest.raises(ImageValidationError, match='expected a marker'):
+        validate(image[:position] + b'\x00' + image[position:])
+
+
+def test_gif_unknown_block_fails():
+    image = make_gif()
+    with pytest.raises(ImageValidationError, match='unknown block type'):
+        validate(image[:-1] + b'\x99' + image[-1:])
+
+
+def test_png_crc_mismatch_fails():
+    image = bytearray(make_png(1, 1, color_type=2))
+    image[30] ^= 0xFF  # Inside IHDR data
+    with pytest.raises(ImageValidationError, match='CRC mismatch in IHDR'):
+        validate(bytes(image))
+
+
+def test_unknown_formats_are_not_checked():
+    assert validate(b'BM' + bytes(100)) is None
+    assert validate(b'RIFF') is None
+
+
+@pytest.mark.parametrize('extract_all', [False, True])
+def test_failed_decode_leaves_no_outputs(tmp_path, extract_all):
+    corrupt = bytearray(make_png(1, 1, color_type=2))
+    corrupt[30] ^= 0xFF
+    images = [make_png(1, 1, color_type=2), make_png(2, 1, color_type=2), bytes(corrupt)]
+    page = tmp_path / 'page.html'
+    page.write_bytes(b''.join(b'<img src="data:image/png;base64,' + base64.b64encode(image) + b'">'
+                              for image in (images if extract_all else images[2:])))
+    output_dir = tmp_path / 'out'
+    output_dir.mkdir()
+
+    result = process_base64_file(str(page), str(output_dir), extract_all, validate=True)
+    assert not result
+    assert 'CRC mismatch' in result.error
+    assert result.output_paths == []
+    assert os.listdir(output_dir) == []
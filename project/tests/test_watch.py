@@ -0,0 +1,173 @@
+"""Tests for watch mode: settling, forgetting removed files and cache trimming."""
+
+import base64
+import os
+import time
+
+import pytest
+
+from base64_image_converter.convertIMAGE_script import watch_inputs
+from base64_image_converter.encode_cache import EncodeCache
+from base64_image_converter.manifest import ConversionManifest
+from base64_image_converter.watch import Change, InotifyWatcher, PollingWatcher
+
+from conftest import make_png
+
+# Upper bound for any single watch test, in seconds
+TIMEOUT = 20
+
+
+def _inotify_available():
+    try:
+        InotifyWatcher([os.getcwd()]).close()
+    except OSError:
+        return False
+    return True
+
+
+WATCHERS = [False, pytest.param(True, marks=pytest.mark.skipif(not _inotify_available(),
+                                                               reason="inotify not available"))]
+
+
+def run_watch_steps(tmp_path, steps, use_inotify, **options):
+    """
+    Run watch_inputs until every step has passed.
+
+    Each step is a function called between watch iterations; it returns
+    True once its condition holds, and the next step starts after it.
+    """
+    watched = tmp_path / 'in'
+    watched.mkdir(exist_ok=True)
+    output_dir = tmp_path / 'out'
+    manifest = ConversionManifest(str(output_dir / 'manifest.json'))
+    pending = list(steps)
+    deadline = time.monotonic() + TIMEOUT
+
+    def should_stop():
+        assert time.monotonic() < deadline, f"watch step {len(steps) - len(pending)} timed out"
+        while pending and pending[0]():
+            pending.pop(0)
+        return not pending
+
+    return watch_inputs([str(watched)], str(output_dir), manifest, settle_time=0.05, poll_interval=0.01,
+                        use_inotify=use_inotify, should_stop=should_stop, quiet=True, **options)
+
+
+def pause(seconds):
+    """Step that lets the watch run for a while without blocking it."""
+    started = []
+
+    def step():
+        started.append(time.monotonic())
+        return started[-1] - started[0] >= seconds
+    return step
+
+
+@pytest.mark.parametrize('use_inotify', WATCHERS)
+def test_removed_file_is_forgotten_and_converted_when_it_returns(tmp_path, use_inotify):
+    source = tmp_path / 'in' / 'a.png'
+    output = tmp_path / 'out' / 'a.txt'
+    stamp = {}
+
+    def add():
+        source.write_bytes(make_png(4, 1))
+        stamp['mtime_ns'] = source.stat().st_mtime_ns
+        return True
+
+    def remove():
+        output.unlink()
+        source.unlink()
+        return True
+
+    def restore():
+        # Identical size and mtime: only a forgotten file is looked at again
+        source.write_bytes(make_png(4, 1))
+        os.utime(source, ns=(stamp['mtime_ns'], stamp['mtime_ns']))
+        return True
+
+    summary = run_watch_steps(tmp_path, [
+        lambda: True, add, output.exists, remove, pause(0.2), restore, output.exists,
+    ], use_inotify)
+    assert (summary.successful, summary.failed) == (2, 0)
+
+
+@pytest.mark.parametrize('use_inotify', WATCHERS)
+def test_cache_is_trimmed_while_watching(tmp_path, use_inotify):
+    cache = EncodeCache(str(tmp_path / 'cache'), max_bytes=1)
+    outputs = [tmp_path / 'out' / f'{name}.txt' for name in 'ab']
+
+    def cache_entries():
+        return [name for _, _, names in os.walk(str(tmp_path / 'cache')) for name in names
+                if name.endswith('.b64')]
+
+    def add():
+        for width, output in enumerate(outputs, 1):
+            (tmp_path / 'in' / f'{output.stem}.png').write_bytes(make_png(width, 1))
+        return True
+
+    summary = run_watch_steps(tmp_path, [
+        lambda: True, add, lambda: all(output.exists() for output in outputs),
+        lambda: not cache_entries(),
+    ], use_inotify, cache=cache)
+    assert summary.successful == 2
+
+
+@pytest.mark.parametrize('use_inotify', WATCHERS)
+def test_file_rewritten_in_place_is_converted_again(tmp_path, use_inotify):
+    source = tmp_path / 'in' / 'a.png'
+    output = tmp_path / 'out' / 'a.txt'
+
+    def add():
+        source.write_bytes(make_png(4, 1))
+        return True
+
+    def rewrite():
+        with open(source, 'r+b') as f:
+            f.truncate()
+            f.write(make_png(5, 1))
+        return True
+
+    def rewritten_output():
+        return output.exists() and base64.b64encode(make_png(5, 1)).decode() in output.read_text()
+
+    summary = run_watch_steps(tmp_path, [
+        lambda: True, add, output.exists, rewrite, rewritten_output,
+    ], use_inotify)
+    assert (summary.successful, summary.failed) == (2, 0)
+
+
+def set_mtime(path, seconds):
+    mtime_ns = int(seconds) * 10 ** 9
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_polling_reports_files_rewritten_in_place(tmp_path):
+    source = tmp_path / 'a.png'
+    source.write_bytes(make_png(4, 1))
+    set_mtime(tmp_path, time.time() - 60)
+    watcher = PollingWatcher([str(tmp_path)], interval=0)
+    assert watcher.wait(0) == {Change(str(tmp_path), '', True)}
+    assert watcher.wait(0) == set()
+
+    with open(source, 'r+b') as f:
+        f.write(make_png(5, 1))
+    assert watcher.wait(0) == {Change(str(tmp_path), 'a.png', False)}
+    assert watcher.wait(0) == set()
+
+    source.unlink()
+    set_mtime(tmp_path, time.time() - 60)  # As if the directory's mtime had not moved
+    assert watcher.wait(0) == {Change(str(tmp_path), 'a.png', False)}
+
+
+def test_polling_relists_directories_changed_within_their_mtime_granularity(tmp_path):
+    tick = time.time()
+    set_mtime(tmp_path, tick)
+    watcher = PollingWatcher([str(tmp_path)], interval=0)
+    assert watcher.wait(0) == {Change(str(tmp_path), '', True)}
+    assert watcher.wait(0) == set()
+
+    # Created in the same tick of a coarse clock: the directory's mtime stays the same
+    (tmp_path / 'b.png').write_bytes(make_png())
+    set_mtime(tmp_path, tick)
+    assert watcher.wait(0) == {Change(str(tmp_path), '', True)}
+    assert watcher.wait(0) == set()
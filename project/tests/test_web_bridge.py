@@ -0,0 +1,391 @@
+"""Tests for the web server: conversions, uploads, downloads and batch conversions."""
+
+import base64
+import contextlib
+import http.client
+import io
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+import zipfile
+
+import pytest
+
+from base64_image_converter.convertIMAGE_script import _PoolExecutor, create_process_pool
+from base64_image_converter.download_store import SPILL_SIZE
+from base64_image_converter.web_bridge import (BATCH_SUMMARY_MEMBER, RETRY_AFTER_SECONDS, BatchConversions,
+                                               ConversionHandler, ConversionPool, ConversionServer,
+                                               ServerBusyError, _init_worker, etag_matches, parse_byte_range)
+
+from conftest import make_png, random_bytes
+
+
+@pytest.fixture(scope='module')
+def server():
+    httpd = ConversionServer(('127.0.0.1', 0), ConversionHandler, workers=1, queue_depth=1)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+    thread.join()
+
+
+def request(server, method, path, body=None, headers=None):
+    """Send one request and return (status, headers, body)."""
+    connection = http.client.HTTPConnection(*server.server_address, timeout=60)
+    try:
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, response.headers, response.read()
+    finally:
+        connection.close()
+
+
+@contextlib.contextmanager
+def busy(server):
+    """Hold every place in the server's pool."""
+    with contextlib.ExitStack() as stack:
+        for _ in range(server.pool.workers + server.pool.queue_depth):
+            stack.enter_context(server.pool.reserve())
+        yield
+
+
+def test_pool_refuses_work_beyond_workers_and_queue_depth():
+    pool = ConversionPool(workers=1, queue_depth=1)
+    try:
+        with pool.reserve(), pool.reserve():
+            assert pool.stats() == {'workers': 1, 'queueDepth': 1, 'pending': 2}
+            with pytest.raises(ServerBusyError):
+                with pool.reserve():
+                    pass
+        with pool.reserve():
+            assert pool.run(len, 'abc') == 3
+        assert pool.stats()['pending'] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_python36_pool_runs_spawned_initialized_workers(monkeypatch):
+    # ProcessPoolExecutor has no initializer or mp_context before Python 3.7
+    with monkeypatch.context() as patch:
+        patch.setattr(sys, 'version_info', (3, 6, 15))
+        executor = create_process_pool(2, initializer=_init_worker,
+                                       mp_context=multiprocessing.get_context('spawn'))
+    assert isinstance(executor, _PoolExecutor)
+    with executor:
+        assert executor.submit(len, 'abc').result(timeout=60) == 3
+        assert executor.submit(signal.getsignal, signal.SIGINT).result(timeout=60) == signal.SIG_IGN
+        failed = executor.submit(divmod, 1, 0)
+        with pytest.raises(ZeroDivisionError):
+            failed.result(timeout=60)
+        assert not failed.cancel()
+
+
+def convert(server, file_name, data, mode='auto'):
+    body = json.dumps({'fileName': file_name, 'conversionMode': mode,
+                       'fileData': 'data:application/octet-stream;base64,' + base64.b64encode(data).decode()})
+    status, _, response = request(server, 'POST', '/convert', body, {'Content-Type': 'application/json'})
+    return status, json.loads(response)
+
+
+def test_convert_runs_in_a_worker(server):
+    png = make_png()
+    status, response = convert(server, 'logo.png', png)
+    assert (status, response['success'], response['outputFile']) == (200, True, 'logo.txt')
+    status, _, document = request(server, 'GET', response['downloadUrl'])
+    assert status == 200
+    assert base64.b64encode(png) in document
+
+    page = b'<img src="data:image/png;base64,' + base64.b64encode(png) + b'">'
+    status, response = convert(server, 'page.html', page)
+    assert (status, response['outputFile']) == (200, 'page.png')
+    assert request(server, 'GET', response['downloadUrl'])[2] == png
+
+
+def test_convert_reports_failures(server):
+    assert convert(server, 'notes.doc', b'text')[1] == {'success': False,
+                                                       'error': 'Unsupported file type: notes.doc'}
+    status, response = convert(server, 'page.html', b'<p>no images</p>')
+    assert (status, response['success']) == (200, False)
+    assert 'no base64 data found' in response['error']
+
+
+def test_busy_server_answers_503(server):
+    with busy(server):
+        status, headers, response = request(server, 'POST', '/convert', json.dumps({
+            'fileName': 'logo.png', 'fileData': base64.b64encode(make_png()).decode()}))
+        assert status == 503
+        assert headers['Retry-After'] == str(RETRY_AFTER_SECONDS)
+        assert json.loads(response)['success'] is False
+        status, _, response = request(server, 'GET', '/status')
+        assert json.loads(response)['conversions']['pending'] == server.pool.workers + server.pool.queue_depth
+    assert convert(server, 'logo.png', make_png())[1]['success'] is True
+
+
+def upload(server, data, query):
+    status, headers, response = request(server, 'POST', '/upload?' + query, data)
+    return status, headers, json.loads(response)
+
+
+@pytest.mark.parametrize('size', [1000, 3 * 1024 * 1024])
+def test_upload_encodes_a_raw_body(server, size):
+    data = random_bytes(size)
+    status, _, response = upload(server, data, 'name=scans%2Fphoto.bin&mode=to-base64')
+    assert (status, response['success'], response['outputFile']) == (200, True, 'photo.txt')
+    status, _, document = request(server, 'GET', response['downloadUrl'])
+    assert status == 200
+    assert base64.b64encode(data) in document
+    assert b'<title>photo.bin</title>' in document
+
+
+def test_upload_decodes_a_document(server):
+    png = make_png(5, 4)
+    page = b'<img src="data:image/png;base64,' + base64.b64encode(png) + b'">'
+    status, _, response = upload(server, page, 'name=page.html')
+    assert (status, response['outputFile']) == (200, 'page.png')
+    assert request(server, 'GET', response['downloadUrl'])[2] == png
+    # The handler removes the spooled upload just after it replies
+    deadline = time.monotonic() + 5
+    while os.listdir(server.work_dir) != ['downloads'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert os.listdir(server.work_dir) == ['downloads']
+
+
+@pytest.mark.parametrize('query, status, error', [
+    ('mode=auto', 400, 'needs a name parameter'),
+    ('name=notes.doc', 200, 'Unsupported file type: notes.doc'),
+    ('name=page.html', 200, 'no base64 data found'),
+])
+def test_upload_failures(server, query, status, error):
+    response_status, _, response = upload(server, b'<p>no images</p>', query)
+    assert (response_status, response['success']) == (status, False)
+    assert error in response['error']
+
+
+def test_upload_to_a_busy_server(server):
+    with busy(server):
+        status, headers, response = upload(server, make_png(), 'name=logo.png')
+    assert (status, response['success']) == (503, False)
+    assert headers['Retry-After'] == str(RETRY_AFTER_SECONDS)
+
+
+@pytest.mark.parametrize('header, size, expected', [
+    ('bytes=0-99', 1000, (0, 99)),
+    ('bytes=100-', 1000, (100, 999)),
+    ('bytes=900-5000', 1000, (900, 999)),
+    ('bytes=-100', 1000, (900, 999)),
+    ('bytes=-5000', 1000, (0, 999)),
+    (' Bytes = 5-5 ', 1000, (5, 5)),
+    ('bytes=0-0,5-9', 1000, None),
+    ('items=0-9', 1000, None),
+    ('bytes=9-0', 1000, None),
+    ('bytes=a-b', 1000, None),
+    ('bytes=-', 1000, None),
+    ('bytes=10', 1000, None),
+])
+def test_parse_byte_range(header, size, expected):
+    assert parse_byte_range(header, size) == expected
+
+
+@pytest.mark.parametrize('header, size', [
+    ('bytes=1000-', 1000),
+    ('bytes=1000-2000', 1000),
+    ('bytes=-0', 1000),
+    ('bytes=-10', 0),
+])
+def test_parse_byte_range_outside_the_file(header, size):
+    with pytest.raises(ValueError):
+        parse_byte_range(header, size)
+
+
+@pytest.mark.parametrize('header, matches', [
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"x", "abc"', True),
+    ('*', True),
+    (' * ', True),
+    ('"abcd"', False),
+    ('abc', False),
+    ('', False),
+])
+def test_etag_matches(header, matches):
+    assert etag_matches(header, '"abc"') is matches
+    assert etag_matches(header, 'W/"abc"') is matches
+
+
+@pytest.fixture(params=['memory', 'spilled'])
+def download(server, request):
+    """Store a result in memory or on disk; yields (download ID, contents)."""
+    size = 1000 if request.param == 'memory' else SPILL_SIZE + 1000
+    data = random_bytes(size, seed=size)
+    download_id = server.downloads.add_bytes(data, 'logo.txt')
+    assert (server.downloads.get(download_id).data is None) == (request.param == 'spilled')
+    yield download_id, data
+
+
+def test_download_whole_file(server, download):
+    download_id, data = download
+    status, headers, body = request(server, 'GET', f'/download/{download_id}')
+    assert status == 200
+    assert body == data
+    assert headers['Content-Length'] == str(len(data))
+    assert headers['ETag'] == f'"{download_id}"'
+    assert headers['Accept-Ranges'] == 'bytes'
+    assert headers['Content-Disposition'] == 'attachment; filename="logo.txt"'
+
+
+@pytest.mark.parametrize('header, first, last', [
+    ('bytes=10-19', 10, 19),
+    ('bytes=500-', 500, None),
+    ('bytes=-7', -7, None),
+])
+def test_download_byte_range(server, download, header, first, last):
+    download_id, data = download
+    status, headers, body = request(server, 'GET', f'/download/{download_id}', headers={'Range': header})
+    expected = data[first:last + 1 if last is not None else None]
+    assert status == 206
+    assert body == expected
+    start = first if first >= 0 else len(data) + first
+    assert headers['Content-Range'] == f'bytes {start}-{start + len(expected) - 1}/{len(data)}'
+
+
+def test_download_range_outside_the_file(server, download):
+    download_id, data = download
+    status, headers, body = request(server, 'GET', f'/download/{download_id}',
+                                    headers={'Range': f'bytes={len(data)}-'})
+    assert status == 416
+    assert headers['Content-Range'] == f'bytes */{len(data)}'
+    assert body == b''
+
+
+def test_download_if_none_match(server, download):
+    download_id, _ = download
+    status, headers, body = request(server, 'GET', f'/download/{download_id}',
+                                    headers={'If-None-Match': f'"other", W/"{download_id}"'})
+    assert status == 304
+    assert headers['ETag'] == f'"{download_id}"'
+    assert body == b''
+
+
+@pytest.mark.parametrize('matches', [True, False])
+def test_download_if_range(server, download, matches):
+    download_id, data = download
+    etag = f'"{download_id}"' if matches else '"stale"'
+    status, _, body = request(server, 'GET', f'/download/{download_id}',
+                              headers={'Range': 'bytes=0-9', 'If-Range': etag})
+    if matches:
+        assert (status, body) == (206, data[:10])
+    else:
+        assert (status, body) == (200, data)
+
+
+def test_download_unknown_id(server):
+    status, _, _ = request(server, 'GET', '/download/unknown')
+    assert status == 404
+
+
+def multipart(files, boundary='batchboundary'):
+    """Encode [(filename, data)] as a multipart/form-data body."""
+    body = b''
+    for filename, data in files:
+        body += (f'--{boundary}\r\nContent-Disposition: form-data; name="files"; '
+                 f'filename="{filename}"\r\n\r\n').encode() + data + b'\r\n'
+    return body + f'--{boundary}--\r\n'.encode(), f'multipart/form-data; boundary={boundary}'
+
+
+def test_batch_returns_a_zip_of_outputs(server):
+    png = make_png()
+    page = b'<img src="data:image/png;base64,' + base64.b64encode(png) + b'">'
+    body, content_type = multipart([('a.png', png), ('page.html', page), ('notes.doc', b'text'),
+                                    ('sub/a.png', png)])
+    status, headers, archive = request(server, 'POST', '/convert/batch?mode=auto', body,
+                                       {'Content-Type': content_type})
+    assert status == 200
+    assert headers['Content-Type'] == 'application/zip'
+
+    with zipfile.ZipFile(io.BytesIO(archive)) as zip_file:
+        names = zip_file.namelist()
+        assert names[-1] == BATCH_SUMMARY_MEMBER
+        summary = json.loads(zip_file.read(BATCH_SUMMARY_MEMBER))
+        files = {entry['inputFile']: entry for entry in summary['files']}
+        assert [entry['inputFile'] for entry in summary['files']] == ['a.png', 'page.html', 'notes.doc', 'a.png']
+        assert (summary['successful'], summary['failed']) == (3, 1)
+        assert files['notes.doc'] == {'inputFile': 'notes.doc', 'inputBytes': 4, 'success': False,
+                                      'error': 'Unsupported file type: notes.doc'}
+
+        outputs = [entry['outputFile'] for entry in summary['files'] if entry['success']]
+        assert sorted(outputs) == sorted(set(outputs)) == sorted(names[:-1])
+        assert zip_file.read(files['page.html']['outputFile']) == png
+        for entry in summary['files']:
+            if entry['inputFile'] == 'a.png':
+                assert entry['inputBytes'] == len(png)
+                assert base64.b64encode(png) in zip_file.read(entry['outputFile'])
+
+
+@pytest.mark.parametrize('body, content_type', [
+    (b'', 'application/json'),
+    (b'--b--\r\n', 'multipart/form-data; boundary=b'),
+    (b'--b\r\n\r\ntruncated', 'multipart/form-data; boundary=b'),
+])
+def test_batch_rejects_bad_uploads(server, body, content_type):
+    status, _, response = request(server, 'POST', '/convert/batch', body, {'Content-Type': content_type})
+    assert status == 400
+    assert json.loads(response)['success'] is False
+
+
+def test_batch_takes_a_pool_place_per_running_conversion():
+    pool = ConversionPool(workers=2, queue_depth=1)
+    try:
+        with pool.reserve():
+            conversions = BatchConversions(pool)
+            assert conversions.submit(0, time.sleep, 0.5) == []
+            assert conversions.submit(1, time.sleep, 0.5) == []
+            assert pool.stats()['pending'] == 2
+            # At most pool.workers conversions of a batch run at once
+            finished = conversions.submit(2, len, 'abc')
+            assert [index for index, _ in finished] in ([0], [1])
+            assert pool.stats()['pending'] == len(conversions.pending) == 2
+            outcomes = dict(finished + list(conversions.as_completed()))
+            assert sorted(outcomes) == [0, 1, 2] and outcomes[2] == 3
+            assert pool.stats()['pending'] == 1
+            conversions.close()
+        assert pool.stats()['pending'] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_batch_waits_for_its_own_conversions_when_the_pool_is_full():
+    pool = ConversionPool(workers=2, queue_depth=0)
+    try:
+        with pool.reserve(), pool.reserve():
+            conversions = BatchConversions(pool)
+            for index in range(3):
+                conversions.submit(index, time.sleep, 0.1)
+                # Only the batch's own place is free, so its conversions run one at a time
+                assert len(conversions.pending) == 1
+                assert pool.stats()['pending'] == 2
+            assert [index for index, _ in conversions.as_completed()] == [2]
+            conversions.close()
+        assert pool.stats()['pending'] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_abandoned_batch_gives_back_its_places():
+    pool = ConversionPool(workers=2, queue_depth=2)
+    try:
+        with pool.reserve():
+            conversions = BatchConversions(pool)
+            for index in range(2):
+                conversions.submit(index, time.sleep, 0.2)
+            assert pool.stats()['pending'] == 2
+            conversions.close()
+            assert conversions.pending == {}
+            assert pool.stats()['pending'] == 1
+    finally:
+        pool.shutdown()